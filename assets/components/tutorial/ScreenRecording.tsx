@@ -1,4 +1,4 @@
-import { AbsoluteFill, Video, useCurrentFrame, interpolate, staticFile, Img } from "remotion";
+import { AbsoluteFill, Video, OffthreadVideo, useCurrentFrame, interpolate, staticFile, Img } from "remotion";
 import { motion } from "framer-motion";
 import { useState, useEffect } from "react";
 import { loadCaptions } from "../../lib/transcript";
@@ -7,11 +7,24 @@ import type { TranscriptionResult } from "../../lib/types";
 interface ScreenRecordingProps {
   screenRecordingUrl: string;
   avatarImage: string; // 画中画头像图片
+  captionsUrl?: string; // 字幕文件路径（相对于 public 目录）
+  showCaptions?: boolean; // false 时不渲染字幕层（由 export-subtitles.py 用 FFmpeg 烧录）
+  pipMode?: PipMode; // 画中画渲染方式（见 prepare-pip.py）
 }
 
+// live: 逐帧渲染遮罩/边框/光晕；asset: 使用 prepare-pip.py 预合成的素材；baked: 已合成进录屏，不再渲染
+export type PipMode = "live" | "asset" | "baked";
+
+// prepare-pip.py 输出画布：160px 头像 + 四周 48px 光晕/阴影留白
+const PIP_ASSET_SIZE = 256;
+const PIP_ASSET_PAD = 48;
+
 export const ScreenRecording: React.FC<ScreenRecordingProps> = ({
   screenRecordingUrl,
   avatarImage,
+  captionsUrl = "assets/captions.json",
+  showCaptions = true,
+  pipMode = "live",
 }) => {
   const frame = useCurrentFrame();
 
@@ -20,16 +33,18 @@ export const ScreenRecording: React.FC<ScreenRecordingProps> = ({
 
   // 加载字幕数据（从 JSON 文件加载，支持浏览器预览）
   useEffect(() => {
+    if (!showCaptions) return; // 字幕交给 FFmpeg 时无需加载
+
     const loadCaptionsData = async () => {
       // 加载预生成的字幕文件
       console.log("🎬 ScreenRecording: 开始加载字幕...");
-      const result = await loadCaptions("assets/captions.json");
+      const result = await loadCaptions(captionsUrl);
       console.log(`🎬 ScreenRecording: 字幕数据 =`, result);
       setCaptions(result);
     };
 
     loadCaptionsData();
-  }, []); // 只在组件挂载时加载一次
+  }, [showCaptions, captionsUrl]); // 挂载或字幕路径变化时加载
 
   // 画中画头像动画
   const avatarScale = interpolate(frame, [0, 30], [0, 1], { extrapolateRight: "clamp" });
@@ -57,6 +72,19 @@ export const ScreenRecording: React.FC<ScreenRecordingProps> = ({
     { extrapolateRight: 'clamp', extrapolateLeft: 'clamp' }
   );
 
+  // 绿色在线指示器样式（两种画中画模式共用，位置不同）
+  const indicatorStyle: React.CSSProperties = {
+    position: "absolute",
+    width: 14,
+    height: 14,
+    borderRadius: "50%",
+    backgroundColor: "#22c55e", // 绿色
+    opacity: indicatorOpacity,
+    border: "2px solid #fff",
+    boxShadow: "0 2px 8px rgba(34, 197, 94, 0.5)",
+    zIndex: 2,
+  };
+
   // 获取当前帧应该显示的字幕
   const getCurrentCaption = () => {
     const currentTime = frame / 30; // 转换为秒
@@ -107,84 +135,99 @@ export const ScreenRecording: React.FC<ScreenRecordingProps> = ({
       </div>
 
       {/* 右下角圆形头像画中画 */}
-      <div
-        style={{
-          position: "absolute",
-          bottom: 32,
-          right: 32,
-          opacity: avatarOpacity,
-          transform: `scale(${avatarScale})`,
-        }}
-      >
-        {/* 呼吸边框效果 */}
+      {pipMode === "live" && (
         <div
           style={{
             position: "absolute",
-            inset: -6,
-            borderRadius: "50%",
-            background: "linear-gradient(135deg, #FF6B9D, #C44CD9, #6B9DFF)",
-            filter: "blur(8px)",
-            opacity: 0.6 * pulseScale,
-          }}
-        />
-
-        {/* 头像图片容器 */}
-        <div
-          style={{
-            position: "relative",
-            width: 160,
-            height: 160,
-            borderRadius: "50%",
-            overflow: "hidden",
-            border: "4px solid #fff",
-            boxShadow: "0 8px 32px rgba(0, 0, 0, 0.3)",
+            bottom: 32,
+            right: 32,
+            opacity: avatarOpacity,
+            transform: `scale(${avatarScale})`,
           }}
         >
-          <motion.div
-            animate={{
-              rotate: [0, 1, -1, 0],
-            }}
-            transition={{
-              duration: 4,
-              repeat: Infinity,
-              ease: "linear",
+          {/* 呼吸边框效果 */}
+          <div
+            style={{
+              position: "absolute",
+              inset: -6,
+              borderRadius: "50%",
+              background: "linear-gradient(135deg, #FF6B9D, #C44CD9, #6B9DFF)",
+              filter: "blur(8px)",
+              opacity: 0.6 * pulseScale,
             }}
+          />
+
+          {/* 头像图片容器 */}
+          <div
             style={{
-              width: "100%",
-              height: "100%",
+              position: "relative",
+              width: 160,
+              height: 160,
+              borderRadius: "50%",
+              overflow: "hidden",
+              border: "4px solid #fff",
+              boxShadow: "0 8px 32px rgba(0, 0, 0, 0.3)",
             }}
           >
-            <Img
-              src={staticFile(avatarImage)}
+            <motion.div
+              animate={{
+                rotate: [0, 1, -1, 0],
+              }}
+              transition={{
+                duration: 4,
+                repeat: Infinity,
+                ease: "linear",
+              }}
               style={{
                 width: "100%",
                 height: "100%",
-                objectFit: "cover",
               }}
-            />
-          </motion.div>
+            >
+              <Img
+                src={staticFile(avatarImage)}
+                style={{
+                  width: "100%",
+                  height: "100%",
+                  objectFit: "cover",
+                }}
+              />
+            </motion.div>
+          </div>
+
+          {/* 绿色在线指示器 - 右下角小绿点（在边框线上） */}
+          <div style={{ ...indicatorStyle, bottom: 18, right: 18 }} />
         </div>
+      )}
 
-        {/* 绿色在线指示器 - 右下角小绿点（在边框线上） */}
+      {/* 预合成画中画：遮罩、边框、光晕和阴影已由 prepare-pip.py 烘焙，每帧只绘制一张图 */}
+      {pipMode === "asset" && (
         <div
           style={{
             position: "absolute",
-            bottom: 18,
-            right: 18,
-            width: 14,
-            height: 14,
-            borderRadius: "50%",
-            backgroundColor: "#22c55e", // 绿色
-            opacity: indicatorOpacity,
-            border: "2px solid #fff",
-            boxShadow: "0 2px 8px rgba(34, 197, 94, 0.5)",
-            zIndex: 2,
+            bottom: 32 - PIP_ASSET_PAD,
+            right: 32 - PIP_ASSET_PAD,
+            width: PIP_ASSET_SIZE,
+            height: PIP_ASSET_SIZE,
+            opacity: avatarOpacity,
+            transform: `scale(${avatarScale})`,
           }}
-        />
-      </div>
+        >
+          {/\.(webm|mov)$/i.test(avatarImage) ? (
+            <OffthreadVideo
+              src={staticFile(avatarImage)}
+              transparent
+              muted
+              style={{ width: "100%", height: "100%" }}
+            />
+          ) : (
+            <Img src={staticFile(avatarImage)} style={{ width: "100%", height: "100%" }} />
+          )}
+          <div style={{ ...indicatorStyle, bottom: 18 + PIP_ASSET_PAD, right: 18 + PIP_ASSET_PAD }} />
+        </div>
+      )}
 
       {/* 自动字幕显示 - 支持浏览器预览和渲染 */}
-      {captions.length > 0 ? (
+      {!showCaptions ? null : captions.length > 0 ? (
         <div
           style={{
             position: "absolute",
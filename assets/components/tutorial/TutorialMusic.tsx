@@ -0,0 +1,36 @@
+import { Audio, continueRender, delayRender, staticFile } from "remotion";
+import { useEffect, useState } from "react";
+import { getGain, loadGainTable } from "../../lib/gain";
+import type { GainTable } from "../../lib/types";
+
+interface TutorialMusicProps {
+  musicUrl: string; // 教程背景音乐（可用 duck-music.py --output 预混的压低版本）
+  gainTableUrl?: string; // 逐帧增益表（duck-music.py --gain-table），与原始音乐配合使用
+  volume?: number; // 整体音量（默认 0.3）
+}
+
+// 教程场景背景音乐：放在 screen-recording 的 Sequence 内，第 0 帧 = 字幕时间 0
+export const TutorialMusic: React.FC<TutorialMusicProps> = ({
+  musicUrl,
+  gainTableUrl,
+  volume = 0.3,
+}) => {
+  const [table, setTable] = useState<GainTable | null>(null);
+  // 增益表加载完成前暂停渲染，否则开头几帧会以未压低的音量混入
+  const [handle] = useState(() => (gainTableUrl ? delayRender("Loading music gain table") : null));
+
+  useEffect(() => {
+    if (!gainTableUrl || handle === null) return;
+    loadGainTable(gainTableUrl).then((result) => {
+      setTable(result);
+      continueRender(handle);
+    });
+  }, [gainTableUrl, handle]);
+
+  return (
+    <Audio
+      src={staticFile(musicUrl)}
+      volume={(f) => volume * getGain(table, f)}
+    />
+  );
+};
@@ -4,6 +4,7 @@ import { OpeningScene } from "./OpeningScene";
 import { ScreenRecording } from "./ScreenRecording";
 import { VisualHammer } from "./VisualHammer";
 import { BilibiliSubscribe } from "./BilibiliSubscribe";
+import { TutorialMusic } from "./TutorialMusic";
 
 export const tutorialVideoSchema = z.object({
   // 真人出镜视频路径（开场用）
@@ -18,8 +19,12 @@ export const tutorialVideoSchema = z.object({
   avatarMode: z.enum(["auto", "local", "fal"]).optional(),
   // Logo图片路径
   logoImageUrl: z.string().optional(),
-  // 音乐文件路径
+  // 音乐文件路径（品牌场景）
   musicUrl: z.string().optional(),
+  // 教程场景背景音乐（duck-music.py 预混的压低版本，或配合增益表的原始音乐）
+  tutorialMusicUrl: z.string().optional(),
+  // 教程场景音乐逐帧增益表（duck-music.py --gain-table）
+  tutorialMusicGainUrl: z.string().optional(),
   // 主标题
   title: z.string().default("我的教程视频"),
   // 副标题
@@ -28,6 +33,12 @@ export const tutorialVideoSchema = z.object({
   brandNameCn: z.string().optional(),
   // 品牌英文名称（可选）
   brandNameEn: z.string().optional(),
+  // 字幕文件路径（相对于 public 目录）
+  captionsUrl: z.string().default("assets/captions.json"),
+  // 是否由 React 渲染字幕层（false：渲染后用 export-subtitles.py 烧录或添加字幕轨）
+  showCaptions: z.boolean().default(true),
+  // 画中画渲染方式：'live' 逐帧渲染 | 'asset' 预合成素材 | 'baked' 已合成进录屏（见 prepare-pip.py）
+  pipMode: z.enum(["live", "asset", "baked"]).default("live"),
 
   // 以下字段由 calculateMetadata 自动计算，无需手动设置
   introDuration: z.number().optional(),
@@ -46,10 +57,15 @@ export const TutorialVideo: React.FC<TutorialVideoProps> = ({
   avatarMode = "auto",
   logoImageUrl,
   musicUrl,
+  tutorialMusicUrl,
+  tutorialMusicGainUrl,
   title,
   subtitle,
   brandNameCn,
   brandNameEn,
+  captionsUrl = "assets/captions.json",
+  showCaptions = true,
+  pipMode = "live",
   // 从 calculateMetadata 接收的时长参数
   introDuration,
   brandDuration = 150, // 默认5秒 @ 30fps
@@ -98,7 +114,14 @@ export const TutorialVideo: React.FC<TutorialVideoProps> = ({
         <ScreenRecording
           screenRecordingUrl={screenRecordingUrl}
           avatarImage={avatarImage || ""}
+          captionsUrl={captionsUrl}
+          showCaptions={showCaptions}
+          pipMode={pipMode}
         />
+        {/* 背景音乐在讲解时压低（第 0 帧 = 字幕时间 0） */}
+        {tutorialMusicUrl && (
+          <TutorialMusic musicUrl={tutorialMusicUrl} gainTableUrl={tutorialMusicGainUrl} />
+        )}
       </Sequence>
 
       {/* 4. B站风格关注动画 */}
@@ -10,6 +10,16 @@ export const RemotionRoot: React.FC = () => {
         // 使用 calculateMetadata 自动计算视频时长
         // 无需手动运行 get-video-duration.py 脚本！
         calculateMetadata={async ({ props }) => {
+          // 批量生产时（batch-render.py）时长已由 ffprobe 算好并随 props 传入，无需在浏览器中探测
+          if (props.introDuration && props.tutorialDuration) {
+            const brandDuration = props.brandDuration || 5 * 30;
+            const subscribeDuration = props.subscribeDuration || 5 * 30;
+            return {
+              durationInFrames: props.introDuration + brandDuration + props.tutorialDuration + subscribeDuration,
+              props: { ...props, brandDuration, subscribeDuration },
+            };
+          }
+
           // 动态获取视频时长
           const getVideoDuration = (src: string): Promise<number> => {
             return new Promise((resolve, reject) => {
@@ -0,0 +1,74 @@
+import { staticFile } from "remotion";
+import type { AudioEnvelope } from "./types";
+
+/**
+ * 加载预计算的音频包络（scripts/audio-envelope.py 生成）
+ * 渲染时无需在浏览器中解码音频，只需按帧索引
+ * @param filePath - 包络 JSON 路径（相对于 public 目录）
+ * @returns 音频包络，加载失败时返回 null
+ */
+export async function loadEnvelope(
+  filePath: string
+): Promise<AudioEnvelope | null> {
+  try {
+    const response = await fetch(staticFile(filePath));
+    if (!response.ok) {
+      throw new Error(`Failed to load envelope: ${response.statusText}`);
+    }
+    const data = await response.json();
+
+    // 支持两种格式：
+    // 1. JSON: { rms: [...], peak: [...] }
+    // 2. 二进制: { data: "xxx.envelope.bin", scale: "db", db_range: [-60, 0] }，Uint8 数组 [rms..., peak...]
+    //    0 表示静音，1-255 在 db_range 内按 dB 均匀分布（旧文件为 scale: 255 的线性量化）
+    if (data.data) {
+      const dir = filePath.substring(0, filePath.lastIndexOf("/") + 1);
+      const binResponse = await fetch(staticFile(dir + data.data));
+      if (!binResponse.ok) {
+        throw new Error(`Failed to load envelope data: ${binResponse.statusText}`);
+      }
+      const bytes = new Uint8Array(await binResponse.arrayBuffer());
+      const toValues = (arr: Uint8Array) => {
+        if (data.scale === "db") {
+          const [floorDb, ceilingDb] = data.db_range;
+          return Array.from(arr, (v) =>
+            v === 0 ? 0 : Math.pow(10, (floorDb + ((v - 1) / 254) * (ceilingDb - floorDb)) / 20)
+          );
+        }
+        const scale = data.scale || 255;
+        return Array.from(arr, (v) => v / scale);
+      };
+      return {
+        ...data,
+        rms: toValues(bytes.subarray(0, data.frames)),
+        peak: toValues(bytes.subarray(data.frames, data.frames * 2)),
+      };
+    }
+
+    return data;
+  } catch (error) {
+    console.error("Error loading envelope:", error);
+    return null;
+  }
+}
+
+/**
+ * 获取指定帧的包络值（0-1）
+ * @param envelope - 音频包络
+ * @param frame - 当前帧
+ * @param kind - "rms" 或 "peak"
+ */
+export function getEnvelopeValue(
+  envelope: AudioEnvelope | null,
+  frame: number,
+  kind: "rms" | "peak" = "rms"
+): number {
+  if (!envelope) {
+    return 0;
+  }
+  const values = envelope[kind];
+  if (frame < 0 || frame >= values.length) {
+    return 0;
+  }
+  return values[Math.floor(frame)];
+}
@@ -0,0 +1,35 @@
+import { staticFile } from "remotion";
+import type { GainTable } from "./types";
+
+/**
+ * 加载预计算的音乐增益表（scripts/duck-music.py --gain-table 生成）
+ * 第 0 帧对应教程场景开始（字幕时间 0）
+ * @param filePath - 增益表 JSON 路径（相对于 public 目录）
+ * @returns 增益表，加载失败时返回 null
+ */
+export async function loadGainTable(
+  filePath: string
+): Promise<GainTable | null> {
+  try {
+    const response = await fetch(staticFile(filePath));
+    if (!response.ok) {
+      throw new Error(`Failed to load gain table: ${response.statusText}`);
+    }
+    return await response.json();
+  } catch (error) {
+    console.error("Error loading gain table:", error);
+    return null;
+  }
+}
+
+/**
+ * 获取指定帧的线性增益（0-1），超出表格范围时不压低（返回 1）
+ * @param table - 增益表
+ * @param frame - 当前帧（相对于教程场景）
+ */
+export function getGain(table: GainTable | null, frame: number): number {
+  if (!table || frame < 0 || frame >= table.gain.length) {
+    return 1;
+  }
+  return table.gain[Math.floor(frame)];
+}
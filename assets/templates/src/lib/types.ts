@@ -13,3 +13,24 @@ export interface TranscriptionResult {
 export interface CaptionResponse {
   captions: TranscriptionResult[];
 }
+
+/**
+ * 逐帧音频包络（由 scripts/audio-envelope.py 预计算）
+ */
+export interface AudioEnvelope {
+  source: string;
+  fps: number;
+  frames: number;
+  duration: number;
+  rms: number[];
+  peak: number[];
+}
+
+/**
+ * 逐帧音乐增益表（由 scripts/duck-music.py --gain-table 预计算）
+ */
+export interface GainTable {
+  fps: number;
+  frames: number;
+  gain: number[];
+}
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Re-time caption boundaries against the audio without re-running Whisper.
+
+Whisper segment boundaries often drift by a few hundred milliseconds:
+captions appear before the speaker starts or linger after they stop.
+This script streams the audio once, block by block, and computes a
+10 ms energy envelope with NumPy, so memory does not grow with the
+recording length. From it, an adaptive threshold yields a voice-activity mask.
+Each caption's start is snapped to the nearest speech onset and its end
+to the nearest speech offset within --window seconds. Word timestamps
+are kept inside the new bounds, and captions never overlap their
+neighbours. Text and words are untouched, so this is much faster than
+transcription and safe to re-run.
+
+Boundaries inside continuous speech (no pause between sentences) have
+no onset nearby and are left as they are.
+
+Requirements:
+    pip install numpy
+    FFmpeg must be installed and in PATH
+
+Usage:
+    python align-captions.py public/assets/screen-recording.mp4 [--captions public/assets/captions.json]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from instrumentation import count
+from media_utils import check_ffmpeg, frame_envelope, load_captions, require_numpy, save_captions, stream_audio
+
+SAMPLE_RATE = 16000
+
+# Envelope resolution: 100 frames per second (10 ms hops)
+ENVELOPE_RATE = 100
+
+# Audio is decoded this many seconds at a time (a whole number of envelope frames)
+BLOCK_SECONDS = 10.0
+
+PRE_EMPHASIS = 0.97
+
+# Shortest caption the aligner may produce
+MIN_CAPTION_SECONDS = 0.2
+
+
+def speech_envelope(media_path: str):
+    """
+    Per-10ms RMS level in dBFS, after pre-emphasis to damp hum and rumble.
+
+    The audio is streamed in BLOCK_SECONDS blocks; the last sample of each
+    block is carried over so pre-emphasis is continuous across blocks.
+
+    Returns:
+        Tuple of (levels array, audio seconds)
+    """
+    np = require_numpy()
+    levels = []
+    previous = 0.0
+    total = 0
+    for block in stream_audio(media_path, BLOCK_SECONDS, sample_rate=SAMPLE_RATE):
+        emphasized = block.copy()
+        emphasized[1:] -= PRE_EMPHASIS * block[:-1]
+        emphasized[0] -= PRE_EMPHASIS * previous
+        previous = float(block[-1])
+        total += len(block)
+        rms, _ = frame_envelope(emphasized, SAMPLE_RATE, ENVELOPE_RATE)
+        levels.append(20.0 * np.log10(rms + 1e-10))
+    levels = np.concatenate(levels) if levels else np.zeros(0, dtype=np.float32)
+    return levels, total / SAMPLE_RATE
+
+
+def fill_short_runs(mask, value: bool, max_length: int):
+    """Flip runs of `value` shorter than max_length frames (not touching the ends)."""
+    np = require_numpy()
+    padded = np.concatenate(([not value], mask == value, [not value]))
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    result = mask.copy()
+    for start, end in zip(edges[0::2], edges[1::2]):
+        if end - start < max_length and start > 0 and end < len(mask):
+            result[start:end] = not value
+    return result
+
+
+def voice_activity(levels, margin_db: float, min_pause: float, min_speech: float):
+    """
+    Boolean speech mask from the envelope.
+
+    The threshold adapts to the recording: margin_db above the noise floor
+    (10th percentile), but at least a fifth of the way to the speech level
+    (90th percentile). Pauses shorter than min_pause are bridged and
+    blips shorter than min_speech dropped.
+    """
+    np = require_numpy()
+    if len(levels) == 0:
+        return np.zeros(0, dtype=bool)
+    floor, loud = np.percentile(levels, [10, 90])
+    threshold = max(floor + margin_db, floor + 0.2 * (loud - floor))
+    mask = levels > threshold
+    mask = fill_short_runs(mask, False, round(min_pause * ENVELOPE_RATE))
+    mask = fill_short_runs(mask, True, round(min_speech * ENVELOPE_RATE))
+    return mask
+
+
+def speech_edges(mask):
+    """Onset and offset times (seconds) of the speech runs in a mask."""
+    np = require_numpy()
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    return edges[0::2] / ENVELOPE_RATE, edges[1::2] / ENVELOPE_RATE
+
+
+def nearest(times, target: float, window: float):
+    """Closest time to target within window, or None."""
+    np = require_numpy()
+    if len(times) == 0:
+        return None
+    index = np.searchsorted(times, target)
+    candidates = [times[i] for i in (index - 1, index) if 0 <= i < len(times)]
+    best = min(candidates, key=lambda t: abs(t - target))
+    return float(best) if abs(best - target) <= window else None
+
+
+def align_segments(segments, onsets, offsets, window: float, lead: float, tail: float):
+    """
+    Snap caption boundaries to speech onsets and offsets.
+
+    Word timing is preferred as the starting guess when present: the
+    first word's start and the last word's end are usually closer to the
+    speech than the segment bounds.
+
+    Returns:
+        Tuple of (new segments, stats dictionary)
+    """
+    aligned = []
+    start_shifts = []
+    end_shifts = []
+    for index, seg in enumerate(segments):
+        seg = dict(seg)
+        words = [dict(word) for word in seg.get("words", [])]
+        old_start, old_end = seg["start"], seg["end"]
+        guess_start = words[0]["start"] if words else old_start
+        guess_end = words[-1]["end"] if words else old_end
+
+        previous_end = aligned[-1]["end"] if aligned else 0.0
+        next_start = segments[index + 1]["start"] if index + 1 < len(segments) else float("inf")
+
+        onset = nearest(onsets, guess_start, window)
+        start = max(previous_end, onset - lead) if onset is not None else old_start
+        offset = nearest(offsets, guess_end, window)
+        end = min(next_start, offset + tail) if offset is not None else old_end
+
+        if end - start < MIN_CAPTION_SECONDS:
+            start, end = old_start, old_end
+        start = max(start, previous_end)
+
+        if (round(start, 3), round(end, 3)) != (old_start, old_end):
+            seg["start"], seg["end"] = round(start, 3), round(end, 3)
+            seg["aligned"] = True
+            start_shifts.append(abs(seg["start"] - old_start))
+            end_shifts.append(abs(seg["end"] - old_end))
+            if words:
+                # Keep words inside the caption and in order
+                words[0]["start"] = seg["start"]
+                words[-1]["end"] = seg["end"]
+                cursor = seg["start"]
+                for word in words:
+                    word["start"] = round(min(max(word["start"], cursor), seg["end"]), 3)
+                    word["end"] = round(min(max(word["end"], word["start"]), seg["end"]), 3)
+                    cursor = word["end"]
+                seg["words"] = words
+        aligned.append(seg)
+
+    count("captions_aligned", len(start_shifts))
+    shifts = start_shifts + end_shifts
+    stats = {
+        "segments": len(segments),
+        "aligned": len(start_shifts),
+        "mean_shift_ms": round(1000 * sum(shifts) / len(shifts)) if shifts else 0,
+        "max_shift_ms": round(1000 * max(shifts)) if shifts else 0,
+    }
+    return aligned, stats
+
+
+def align_captions(
+    media_path: str,
+    captions: dict,
+    window: float = 0.5,
+    lead: float = 0.05,
+    tail: float = 0.1,
+    margin_db: float = 10.0,
+    min_pause: float = 0.12,
+    min_speech: float = 0.08
+):
+    """
+    Stream the audio once and re-time every caption.
+
+    Args:
+        media_path: Audio or video the captions were generated from
+        captions: Captions data with "segments"
+        window: Maximum boundary move in seconds
+        lead: Seconds a caption appears before its speech onset
+        tail: Seconds a caption stays after its speech offset
+        margin_db: Minimum level above the noise floor counted as speech
+        min_pause: Shorter pauses are treated as continuous speech
+        min_speech: Shorter bursts are treated as noise
+
+    Returns:
+        Tuple of (aligned captions, stats dictionary)
+    """
+    started = time.perf_counter()
+    print(f"🎵 Decoding audio from: {media_path}")
+    levels, audio_seconds = speech_envelope(media_path)
+    mask = voice_activity(levels, margin_db, min_pause, min_speech)
+    onsets, offsets = speech_edges(mask)
+
+    segments, stats = align_segments(captions.get("segments", []), onsets, offsets, window, lead, tail)
+
+    elapsed = time.perf_counter() - started
+    stats.update({
+        "speech_runs": len(onsets),
+        "audio_seconds": round(audio_seconds, 2),
+        "seconds": round(elapsed, 2),
+        "realtime_factor": round(audio_seconds / max(elapsed, 1e-6), 1),
+    })
+    return {**captions, "segments": segments}, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Snap caption boundaries to speech onsets and offsets in the audio",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Re-time captions.json next to the recording, in place
+  python align-captions.py public/assets/screen-recording.mp4
+
+  # Write to a new file and allow larger corrections
+  python align-captions.py host.mp4 --captions captions.json --window 0.8 -o captions-aligned.json
+
+  # Noisy room: require more level above the noise floor
+  python align-captions.py public/assets/screen-recording.mp4 --margin-db 15
+        """
+    )
+
+    parser.add_argument(
+        "media",
+        help="Audio or video the captions were generated from"
+    )
+
+    parser.add_argument(
+        "--captions",
+        help="Captions file (default: captions.json next to the media)"
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Output path (default: overwrite the captions file)"
+    )
+
+    parser.add_argument(
+        "--window",
+        type=float,
+        default=0.5,
+        help="Maximum boundary move in seconds (default: 0.5)"
+    )
+
+    parser.add_argument(
+        "--lead",
+        type=float,
+        default=0.05,
+        help="Show captions this many seconds before speech starts (default: 0.05)"
+    )
+
+    parser.add_argument(
+        "--tail",
+        type=float,
+        default=0.1,
+        help="Keep captions this many seconds after speech stops (default: 0.1)"
+    )
+
+    parser.add_argument(
+        "--margin-db",
+        type=float,
+        default=10.0,
+        help="Level above the noise floor that counts as speech (default: 10)"
+    )
+
+    parser.add_argument(
+        "--min-pause",
+        type=float,
+        default=0.12,
+        help="Pauses shorter than this are not boundaries (default: 0.12)"
+    )
+
+    args = parser.parse_args()
+
+    # Check FFmpeg installation
+    if not check_ffmpeg():
+        print("❌ Error: FFmpeg not found.")
+        print("Install FFmpeg: https://ffmpeg.org/download.html")
+        sys.exit(1)
+
+    media = Path(args.media)
+    captions_path = Path(args.captions) if args.captions else media.with_name("captions.json")
+    for path in (media, captions_path):
+        if not path.exists():
+            print(f"❌ Error: File not found: {path}")
+            sys.exit(1)
+
+    output = Path(args.output) if args.output else captions_path
+
+    try:
+        captions, stats = align_captions(
+            str(media),
+            load_captions(str(captions_path)),
+            window=args.window,
+            lead=args.lead,
+            tail=args.tail,
+            margin_db=args.margin_db,
+            min_pause=args.min_pause
+        )
+        save_captions(captions, str(output))
+
+        print(f"🎯 Re-timed {stats['aligned']} of {stats['segments']} captions "
+              f"({stats['speech_runs']} speech runs found)")
+        print(f"   Mean boundary shift {stats['mean_shift_ms']} ms, largest {stats['max_shift_ms']} ms")
+        print(f"⚡ {stats['audio_seconds']}s of audio in {stats['seconds']}s ({stats['realtime_factor']}x real time)")
+        print(f"💾 Captions saved to: {output}")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Content-addressed asset store shared by tutorial projects.
+
+Source files (recordings, logo, avatar, music) are stored once by their
+SHA-256 and linked into each project's public/assets instead of copied:
+reflink (copy-on-write clone) where the filesystem supports it, else a
+hard link, else a plain copy. Stored objects are read-only, so a tool
+that tries to overwrite a hard-linked asset in place fails instead of
+silently changing every project that shares it.
+
+Sources are re-hashed only when their size or mtime changed since the
+last sync, and project files that already hold the right content are
+left alone, so re-running a sync is nearly free.
+"""
+
+import ctypes
+import hashlib
+import json
+import os
+import shutil
+import stat
+import sys
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from instrumentation import count
+
+DEFAULT_STORE = Path(os.environ.get(
+    "ASSET_STORE",
+    Path.home() / ".cache" / "remotion-tutorial-video" / "store"
+))
+
+# Per-project record of what each asset was synced from
+PROJECT_MANIFEST = ".assets.json"
+
+HASH_BLOCK = 1024 * 1024
+
+# Linux FICLONE ioctl: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(HASH_BLOCK)
+            if not block:
+                break
+            digest.update(block)
+            count("bytes_hashed", len(block))
+    return digest.hexdigest()
+
+
+def reflink(source: Path, target: Path) -> bool:
+    """Clone source to target sharing data blocks; False if unsupported."""
+    if sys.platform.startswith("linux"):
+        import fcntl
+        try:
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return True
+        except OSError:
+            target.unlink(missing_ok=True)
+            return False
+    if sys.platform == "darwin":
+        try:
+            libc = ctypes.CDLL("libc.dylib", use_errno=True)
+            return libc.clonefile(os.fsencode(source), os.fsencode(target), 0) == 0
+        except (OSError, AttributeError):
+            return False
+    return False
+
+
+def place_file(source: Path, target: Path, allow_hardlink: bool = True) -> str:
+    """
+    Make target hold source's content as cheaply as possible.
+
+    The new file is created next to target and renamed over it, so an
+    existing target is replaced atomically.
+
+    Returns:
+        The method used: "reflink", "hardlink" or "copy"
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    temp.unlink(missing_ok=True)
+
+    if reflink(source, temp):
+        method = "reflink"
+    else:
+        method = "copy"
+        if allow_hardlink:
+            try:
+                os.link(source, temp)
+                method = "hardlink"
+            except OSError:
+                pass
+        if method == "copy":
+            shutil.copyfile(source, temp)
+            count("bytes_copied", os.path.getsize(temp))
+
+    os.replace(temp, target)
+    return method
+
+
+class AssetStore:
+    """Objects under <root>/objects/<aa>/<sha256> plus an index of hashed sources."""
+
+    def __init__(self, root: Path = DEFAULT_STORE):
+        self.root = Path(root)
+        self.index_path = self.root / "index.json"
+        self.index: Dict[str, dict] = {}
+        if self.index_path.exists():
+            try:
+                with self.index_path.open('r', encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError):
+                self.index = {}
+
+    def object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+
+    def ingest(self, source: Path) -> Tuple[str, bool]:
+        """
+        Add a source file to the store.
+
+        Returns:
+            Tuple of (sha256, whether the file had to be hashed)
+        """
+        source = Path(source).resolve()
+        st = source.stat()
+        key = str(source)
+
+        entry = self.index.get(key)
+        if (entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+                and self.object_path(entry["sha256"]).exists()):
+            return entry["sha256"], False
+
+        digest = file_digest(source)
+        obj = self.object_path(digest)
+        if not obj.exists():
+            # Never hard-link the user's original: editing it would change the store
+            place_file(source, obj, allow_hardlink=False)
+            os.chmod(obj, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+        self.index[key] = {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        return digest, True
+
+    def save_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp = self.index_path.with_name(f".{self.index_path.name}.{os.getpid()}.tmp")
+        temp.write_text(json.dumps(self.index, ensure_ascii=False, indent=2), encoding='utf-8')
+        os.replace(temp, self.index_path)
+
+
+def load_project_manifest(assets_dir: Path) -> Dict[str, dict]:
+    path = assets_dir / PROJECT_MANIFEST
+    if not path.exists():
+        return {}
+    try:
+        with path.open('r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_project_manifest(assets_dir: Path, manifest: Dict[str, dict]):
+    path = assets_dir / PROJECT_MANIFEST
+    temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+    os.replace(temp, path)
+
+
+def is_current(target: Path, digest: str, recorded: Optional[dict], obj: Path) -> bool:
+    """True if target already holds the object's content."""
+    if not target.exists():
+        return False
+    if os.path.samefile(target, obj):
+        return True
+    st = target.stat()
+    return bool(recorded and recorded.get("sha256") == digest
+                and recorded.get("size") == st.st_size and recorded.get("mtime_ns") == st.st_mtime_ns)
+
+
+def sync_assets(
+    sources: Dict[str, Path],
+    assets_dir: Path,
+    store: AssetStore,
+    verify: bool = False
+) -> Dict[str, dict]:
+    """
+    Link source files into a project's assets directory through the store.
+
+    Args:
+        sources: Mapping of asset file name (e.g. "screen-recording.mp4") to source path
+        assets_dir: The project's public/assets directory
+        store: Shared asset store
+        verify: Re-hash sources and linked files even when size and mtime match
+
+    Returns:
+        Mapping of asset name to {"sha256", "action", "size"}
+    """
+    assets_dir = Path(assets_dir)
+    assets_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_project_manifest(assets_dir)
+    report = {}
+
+    try:
+        for name, source in sources.items():
+            if verify:
+                store.index.pop(str(Path(source).resolve()), None)
+            digest, hashed = store.ingest(Path(source))
+            obj = store.object_path(digest)
+            target = assets_dir / name
+
+            current = is_current(target, digest, manifest.get(name), obj)
+            if current and verify and not os.path.samefile(target, obj):
+                current = file_digest(target) == digest
+
+            if current:
+                action = "unchanged"
+            else:
+                action = place_file(obj, target)
+
+            st = target.stat()
+            manifest[name] = {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                              "source": str(Path(source).resolve())}
+            report[name] = {"sha256": digest, "action": action, "size": st.st_size, "hashed": hashed}
+    finally:
+        store.save_index()
+        save_project_manifest(assets_dir, manifest)
+
+    return report
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Precompute per-frame audio envelopes for the Remotion renderer.
+
+Audio-reactive visuals (level meters, pulsing avatars, music ducking)
+otherwise need the browser to decode audio at render time. This script
+decodes each audio source once and writes per-frame RMS/peak envelopes
+at the composition frame rate, so components can simply index by frame.
+
+Output (per source, next to the other assets):
+    <name>.envelope.json  - metadata, plus the arrays in JSON format
+    <name>.envelope.bin   - Uint8 arrays [rms..., peak...] in bin format,
+                            quantized in dB (BIN_DB_RANGE) so quiet passages
+                            keep their resolution; the range is in the JSON
+
+Requirements:
+    pip install numpy
+    FFmpeg must be installed and in PATH
+
+Usage:
+    python audio-envelope.py <audio-or-video> [...] [--output-dir public/assets] [--fps 30] [--format json]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from media_utils import check_ffmpeg, decode_audio, frame_envelope, require_numpy
+
+# dBFS range mapped onto the Uint8 codes 1..255 in bin format; 0 is silence
+BIN_DB_RANGE = (-60.0, 0.0)
+
+
+def write_envelope(
+    source: str,
+    output_dir: str,
+    fps: int = 30,
+    sample_rate: int = 48000,
+    fmt: str = "json"
+) -> dict:
+    """
+    Decode one source and write its per-frame envelope.
+
+    Args:
+        source: Path to audio or video file
+        output_dir: Directory for envelope files (usually public/assets)
+        fps: Composition frame rate
+        sample_rate: Decode sample rate in Hz
+        fmt: "json" for float arrays, "bin" for dB-quantized Uint8 arrays
+
+    Returns:
+        Envelope metadata dictionary
+    """
+    np = require_numpy()
+
+    print(f"🎵 Decoding audio from: {source}")
+    samples = decode_audio(source, sample_rate=sample_rate)
+    rms, peak = frame_envelope(samples, sample_rate, fps)
+
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = Path(source).stem
+
+    meta = {
+        "source": Path(source).name,
+        "fps": fps,
+        "frames": int(len(rms)),
+        "duration": round(len(samples) / sample_rate, 3),
+        "format": fmt,
+    }
+
+    if fmt == "bin":
+        bin_path = out_dir / f"{stem}.envelope.bin"
+        floor_db, ceiling_db = BIN_DB_RANGE
+        levels = 20.0 * np.log10(np.concatenate((rms, peak)) + 1e-10)
+        # Even steps in dB: 0.001-0.01 RMS gets ~42 codes instead of 2, speech twice as many
+        codes = 1 + (levels - floor_db) / (ceiling_db - floor_db) * 254
+        quantized = np.where(levels < floor_db, 0, np.clip(np.round(codes), 1, 255)).astype(np.uint8)
+        bin_path.write_bytes(quantized.tobytes())
+        meta["data"] = bin_path.name
+        meta["scale"] = "db"
+        meta["db_range"] = list(BIN_DB_RANGE)
+    else:
+        meta["rms"] = np.round(rms, 4).tolist()
+        meta["peak"] = np.round(peak, 4).tolist()
+
+    json_path = out_dir / f"{stem}.envelope.json"
+    with json_path.open('w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, separators=(",", ":"))
+
+    print(f"💾 Saved {meta['frames']} frames @ {fps}fps to: {json_path}")
+    return meta
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute per-frame audio envelopes for Remotion",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Envelopes for music and narration
+  python audio-envelope.py public/assets/music.mp3 public/assets/screen-recording.mp4
+
+  # Compact binary output
+  python audio-envelope.py public/assets/music.mp3 --format bin
+
+In Remotion (src/lib/envelope.ts):
+  const envelope = await loadEnvelope("assets/music.envelope.json");
+  const level = getEnvelopeValue(envelope, frame, "rms");
+        """
+    )
+
+    parser.add_argument(
+        "sources",
+        nargs="+",
+        help="Audio or video files to analyze"
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        "-o",
+        default="public/assets",
+        help="Directory for envelope files (default: public/assets)"
+    )
+
+    parser.add_argument(
+        "--fps",
+        type=int,
+        default=30,
+        help="Composition frame rate (default: 30)"
+    )
+
+    parser.add_argument(
+        "--sample-rate",
+        type=int,
+        default=48000,
+        help="Decode sample rate in Hz (default: 48000)"
+    )
+
+    parser.add_argument(
+        "--format",
+        "-f",
+        choices=["json", "bin"],
+        default="json",
+        help="Envelope storage format (default: json)"
+    )
+
+    args = parser.parse_args()
+
+    # Check FFmpeg installation
+    if not check_ffmpeg():
+        print("❌ Error: FFmpeg not found.")
+        print("Install FFmpeg: https://ffmpeg.org/download.html")
+        sys.exit(1)
+
+    for source in args.sources:
+        if not Path(source).exists():
+            print(f"❌ Error: File not found: {source}")
+            sys.exit(1)
+
+    try:
+        for source in args.sources:
+            write_envelope(
+                source,
+                args.output_dir,
+                fps=args.fps,
+                sample_rate=args.sample_rate,
+                fmt=args.format
+            )
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+Produce a series of tutorials from one manifest with a shared Remotion bundle.
+
+Each tutorial otherwise means editing defaultProps in Root.tsx and
+running one `npx remotion render`, which re-bundles the project every
+time. This script reads a CSV or JSON manifest of per-episode props and
+asset paths and validates every episode against the props table in
+assets/TEMPLATE_PARAMETERS.md before any work starts. It bundles the
+project once and links each episode's assets into the bundle through
+the shared asset store. Scene durations are probed with ffprobe, and
+the episodes are rendered from the same bundle, several at a time.
+
+Progress is stored next to the outputs. A re-run skips episodes whose
+props and asset contents are unchanged and whose video exists, so an
+interrupted batch resumes where it stopped.
+
+Requirements:
+    Node.js and the Remotion project's npm dependencies
+    FFmpeg must be installed and in PATH
+
+Usage:
+    python batch-render.py episodes.csv [--project .] [--output-dir out/episodes] [--jobs 2]
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from asset_store import DEFAULT_STORE, AssetStore, sync_assets
+from instrumentation import run_subprocess
+from media_utils import check_ffmpeg, probe_duration
+
+TEMPLATE_PARAMETERS = Path(__file__).resolve().parent.parent / "assets" / "TEMPLATE_PARAMETERS.md"
+PROPS_HEADING = "### 组件 Props"
+
+COMPOSITION = "TutorialVideo"
+RENDER_FPS = 30
+BRAND_SCENE_SECONDS = 5
+SUBSCRIBE_SCENE_SECONDS = 5
+
+# Manifest columns that are not template props
+EPISODE_FIELDS = {"id", "output"}
+
+PROGRESS_FILE = ".batch-progress.json"
+
+# Project files that change the bundle
+BUNDLE_SOURCES = ["src", "remotion.config.ts", "package.json", "package-lock.json"]
+
+
+def load_template_parameters(path: Path = TEMPLATE_PARAMETERS) -> Dict[str, dict]:
+    """
+    Parse the props table of TEMPLATE_PARAMETERS.md.
+
+    Returns:
+        Mapping of prop name to {"type", "choices", "default"}
+    """
+    text = path.read_text(encoding="utf-8")
+    if PROPS_HEADING not in text:
+        raise RuntimeError(f"No '{PROPS_HEADING}' table in {path}")
+    section = text.split(PROPS_HEADING, 1)[1].split("\n#", 1)[0]
+
+    parameters = {}
+    for line in section.splitlines():
+        cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+        if len(cells) < 3 or not cells[0].startswith("`"):
+            continue
+        name, kind, default = cells[0].strip("`"), cells[1], cells[2]
+        choices = None
+        match = re.fullmatch(r"enum\((.*)\)", kind)
+        if match:
+            kind, choices = "enum", [c.strip() for c in match.group(1).split(",")]
+        parameters[name] = {"type": kind, "choices": choices, "default": default or None}
+    return parameters
+
+
+def load_manifest(path: Path) -> List[dict]:
+    """
+    Read episodes from a CSV (one row per episode, one column per prop)
+    or JSON file (a list of episodes, or {"defaults": {...}, "episodes": [...]}).
+    """
+    if path.suffix.lower() == ".csv":
+        with path.open("r", encoding="utf-8-sig", newline="") as f:
+            return [{k.strip(): v.strip() for k, v in row.items() if k and v and v.strip()}
+                    for row in csv.DictReader(f)]
+
+    with path.open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return data
+    defaults = data.get("defaults", {})
+    return [{**defaults, **episode} for episode in data.get("episodes", [])]
+
+
+def coerce_value(value, spec: dict):
+    """Convert a manifest value (CSV cells are strings) to the prop's type."""
+    kind = spec["type"]
+    if kind == "boolean":
+        if isinstance(value, bool):
+            return value
+        lowered = str(value).lower()
+        if lowered in ("true", "1", "yes"):
+            return True
+        if lowered in ("false", "0", "no"):
+            return False
+        raise ValueError(f"expected true/false, got {value!r}")
+    if kind == "enum":
+        if str(value) not in spec["choices"]:
+            raise ValueError(f"expected one of {', '.join(spec['choices'])}, got {value!r}")
+        return str(value)
+    return str(value)
+
+
+def validate_episode(
+    episode: dict,
+    parameters: Dict[str, dict],
+    base_dir: Path,
+    public_dir: Path
+) -> Tuple[dict, Dict[str, Path], List[str]]:
+    """
+    Check one episode against the template props.
+
+    Asset props are resolved against the manifest directory; assets not
+    given fall back to the project's public/ file at the prop's default
+    path when it exists.
+
+    Returns:
+        Tuple of (props without assets, {prop: asset file}, errors)
+    """
+    props, assets, errors = {}, {}, []
+
+    for key, value in episode.items():
+        if key in EPISODE_FIELDS or key.startswith("_") or value in (None, ""):
+            continue
+        spec = parameters.get(key)
+        if spec is None:
+            errors.append(f"unknown prop '{key}' (see TEMPLATE_PARAMETERS.md)")
+            continue
+        if spec["type"] == "computed":
+            errors.append(f"'{key}' is computed from the videos and cannot be set")
+            continue
+        if spec["type"] == "asset":
+            asset = Path(value).expanduser()
+            asset = asset if asset.is_absolute() else base_dir / asset
+            if not asset.is_file():
+                errors.append(f"{key}: file not found: {asset}")
+            assets[key] = asset
+            continue
+        try:
+            props[key] = coerce_value(value, spec)
+        except ValueError as e:
+            errors.append(f"{key}: {e}")
+
+    for key, spec in parameters.items():
+        if spec["type"] == "asset" and key not in assets and spec["default"]:
+            fallback = public_dir / spec["default"]
+            if fallback.is_file():
+                assets[key] = fallback
+
+    for key in ("hostVideoUrl", "screenRecordingUrl"):
+        if key not in assets:
+            errors.append(f"{key} is required (no file given and none in public/)")
+
+    return props, assets, errors
+
+
+def scene_durations(assets: Dict[str, Path]) -> dict:
+    """Scene lengths in frames, computed like Root.tsx's calculateMetadata."""
+    return {
+        "introDuration": math.ceil(probe_duration(str(assets["hostVideoUrl"])) * RENDER_FPS),
+        "brandDuration": BRAND_SCENE_SECONDS * RENDER_FPS,
+        "tutorialDuration": math.ceil(probe_duration(str(assets["screenRecordingUrl"])) * RENDER_FPS),
+        "subscribeDuration": SUBSCRIBE_SCENE_SECONDS * RENDER_FPS,
+    }
+
+
+def project_fingerprint(project: Path) -> str:
+    """Hash of the paths, sizes and mtimes of the files that go into the bundle."""
+    digest = hashlib.sha256()
+    for name in BUNDLE_SOURCES:
+        root = project / name
+        files = sorted(p for p in root.rglob("*") if p.is_file()) if root.is_dir() else [root]
+        for path in files:
+            if path.exists():
+                st = path.stat()
+                digest.update(f"{path.relative_to(project)}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def bundle_project(project: Path, bundle_dir: Path):
+    """
+    Bundle the Remotion project once.
+
+    The bundle is built with an empty public directory: episode assets are
+    linked into bundle/public afterwards instead of copying the project's
+    (possibly multi-GB) public folder into it.
+    """
+    empty_public = bundle_dir.parent / ".empty-public"
+    empty_public.mkdir(parents=True, exist_ok=True)
+    cmd = [
+        "npx", "remotion", "bundle",
+        "--out-dir", str(bundle_dir.resolve()),
+        "--public-dir", str(empty_public.resolve()),
+    ]
+    print(f"📦 Bundling {project} ...")
+    result = run_subprocess(cmd, cwd=project, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Remotion bundle failed: {result.stderr or result.stdout}")
+
+
+class BatchProgress:
+    """Per-episode status in <output-dir>/.batch-progress.json, saved after every change."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.data = {"bundle": None, "episodes": {}}
+        if path.exists():
+            try:
+                with path.open("r", encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except (OSError, ValueError):
+                pass
+        self._lock = threading.Lock()
+
+    def episode(self, episode_id: str) -> dict:
+        return self.data["episodes"].get(episode_id, {})
+
+    def update(self, episode_id: str, **fields):
+        with self._lock:
+            self.data["episodes"].setdefault(episode_id, {}).update(fields)
+            self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        temp.write_text(json.dumps(self.data, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(temp, self.path)
+
+
+def render_episode(bundle_dir: Path, props_path: Path, output: Path, log_path: Path,
+                   concurrency: int, project: Path) -> float:
+    """Render one episode from the shared bundle; returns wall seconds."""
+    cmd = [
+        "npx", "remotion", "render",
+        str(bundle_dir.resolve()), COMPOSITION, str(output.resolve()),
+        f"--props={props_path.resolve()}",
+        f"--concurrency={concurrency}",
+    ]
+    started = time.perf_counter()
+    with log_path.open("w", encoding="utf-8") as log:
+        result = run_subprocess(cmd, cwd=project, stdout=log, stderr=subprocess.STDOUT, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"render failed, see {log_path}")
+    return time.perf_counter() - started
+
+
+def qa_episode(output: Path, frames: int) -> bool:
+    """Run qa-render.py on a finished episode; True when it passes."""
+    script = Path(__file__).resolve().parent / "qa-render.py"
+    result = run_subprocess([sys.executable, str(script), str(output), "--expected-frames", str(frames)],
+                            capture_output=True, text=True)
+    return result.returncode == 0
+
+
+def main():
+    cores = os.cpu_count() or 1
+
+    parser = argparse.ArgumentParser(
+        description="Render a series of tutorials from a manifest with one shared Remotion bundle",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Manifest (CSV, one row per episode; empty cells use the template default):
+  id,title,subtitle,hostVideoUrl,screenRecordingUrl,captionsUrl
+  ep01,第1集 安装,从零开始,raw/ep01-host.mp4,raw/ep01-screen.mp4,raw/ep01-captions.json
+  ep02,第2集 配置,常用选项,raw/ep02-host.mp4,raw/ep02-screen.mp4,raw/ep02-captions.json
+
+Manifest (JSON, shared values under "defaults"):
+  {"defaults": {"brandNameCn": "久久AI记", "logoImageUrl": "brand/logo.jpg"},
+   "episodes": [{"id": "ep01", "title": "第1集", "hostVideoUrl": "raw/ep01-host.mp4", ...}]}
+
+Examples:
+  # Validate only
+  python batch-render.py episodes.csv --validate-only
+
+  # Render two episodes at a time; re-run to resume after an interruption
+  python batch-render.py episodes.csv --output-dir out/episodes --jobs 2 --qa
+
+Props and their types are listed in assets/TEMPLATE_PARAMETERS.md
+("组件 Props"). Asset paths are relative to the manifest file.
+        """
+    )
+
+    parser.add_argument(
+        "manifest",
+        help="Episode manifest (.csv or .json)"
+    )
+
+    parser.add_argument(
+        "--project",
+        "-p",
+        default=".",
+        help="Remotion project directory (default: current directory)"
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        "-o",
+        default="out/episodes",
+        help="Directory for rendered episodes, bundle and progress (default: out/episodes)"
+    )
+
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Episodes rendered at the same time (default: 1)"
+    )
+
+    parser.add_argument(
+        "--render-concurrency",
+        type=int,
+        help="Remotion --concurrency per render (default: half the CPU threads split across jobs)"
+    )
+
+    parser.add_argument(
+        "--store",
+        default=str(DEFAULT_STORE),
+        help=f"Shared asset store (default: $ASSET_STORE or {DEFAULT_STORE})"
+    )
+
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        metavar="ID",
+        help="Only these episode ids"
+    )
+
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-render episodes even if they are up to date"
+    )
+
+    parser.add_argument(
+        "--rebundle",
+        action="store_true",
+        help="Bundle again even if the project has not changed"
+    )
+
+    parser.add_argument(
+        "--qa",
+        action="store_true",
+        help="Run qa-render.py on each finished episode"
+    )
+
+    parser.add_argument(
+        "--validate-only",
+        action="store_true",
+        help="Only validate the manifest"
+    )
+
+    args = parser.parse_args()
+
+    manifest_path = Path(args.manifest)
+    if not manifest_path.exists():
+        print(f"❌ Error: File not found: {args.manifest}")
+        sys.exit(1)
+
+    project = Path(args.project)
+    output_dir = Path(args.output_dir)
+
+    # Validate every episode before doing any work
+    try:
+        parameters = load_template_parameters()
+        episodes = load_manifest(manifest_path)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    jobs, seen, failed_validation = [], set(), False
+    for index, episode in enumerate(episodes, 1):
+        episode_id = str(episode.get("id", "")).strip()
+        label = episode_id or f"row {index}"
+        props, assets, errors = validate_episode(episode, parameters, manifest_path.parent, project / "public")
+        if not re.fullmatch(r"[A-Za-z0-9_-]+", episode_id):
+            errors.insert(0, "id is required (letters, digits, - and _)")
+        elif episode_id in seen:
+            errors.insert(0, f"duplicate id '{episode_id}'")
+        seen.add(episode_id)
+        if errors:
+            failed_validation = True
+            print(f"❌ {label}:")
+            for error in errors:
+                print(f"     {error}")
+        elif not args.only or episode_id in args.only:
+            output = Path(episode["output"]) if episode.get("output") else output_dir / f"{episode_id}.mp4"
+            jobs.append({"id": episode_id, "props": props, "assets": assets, "output": output})
+
+    if failed_validation:
+        print("\n❌ Manifest is invalid, nothing rendered")
+        sys.exit(1)
+    print(f"✅ Manifest valid: {len(episodes)} episodes, {len(jobs)} selected")
+    if args.validate_only or not jobs:
+        return
+
+    if not check_ffmpeg():
+        print("❌ Error: FFmpeg not found.")
+        print("Install FFmpeg: https://ffmpeg.org/download.html")
+        sys.exit(1)
+
+    progress = BatchProgress(output_dir / PROGRESS_FILE)
+    bundle_dir = output_dir / ".bundle"
+    props_dir = output_dir / ".props"
+    logs_dir = output_dir / "logs"
+    for directory in (props_dir, logs_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    try:
+        fingerprint = project_fingerprint(project)
+        if args.rebundle or progress.data.get("bundle") != fingerprint or not (bundle_dir / "index.html").exists():
+            bundle_project(project, bundle_dir)
+            progress.data["bundle"] = fingerprint
+            progress.save()
+        else:
+            print(f"📦 Reusing bundle: {bundle_dir}")
+
+        # Stage assets and props one episode at a time (the store index is not thread-safe)
+        store = AssetStore(Path(args.store))
+        pending = []
+        for job in jobs:
+            episode_dir = Path("episodes") / job["id"]
+            sources = {f"{key}{path.suffix.lower()}": path for key, path in job["assets"].items()}
+            report = sync_assets(sources, bundle_dir / "public" / episode_dir, store)
+
+            props = dict(job["props"])
+            for key, path in job["assets"].items():
+                props[key] = (episode_dir / f"{key}{path.suffix.lower()}").as_posix()
+            props.update(scene_durations(job["assets"]))
+            job["frames"] = sum(props[k] for k in ("introDuration", "brandDuration",
+                                                   "tutorialDuration", "subscribeDuration"))
+
+            key_material = json.dumps({"props": props, "assets": {n: e["sha256"] for n, e in report.items()},
+                                       "bundle": fingerprint}, sort_keys=True)
+            job["key"] = hashlib.sha256(key_material.encode()).hexdigest()
+            job["props_path"] = props_dir / f"{job['id']}.json"
+            job["props_path"].write_text(json.dumps(props, ensure_ascii=False, indent=2), encoding="utf-8")
+
+            state = progress.episode(job["id"])
+            if (not args.force and state.get("status") == "done" and state.get("key") == job["key"]
+                    and job["output"].exists()):
+                print(f"  ✔️  {job['id']} up to date, skipped")
+                continue
+            pending.append(job)
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+    if not pending:
+        print("\n✅ All episodes up to date")
+        return
+
+    workers = max(1, min(args.jobs, len(pending)))
+    concurrency = args.render_concurrency or max(1, cores // 2 // workers)
+    print(f"\n🎬 Rendering {len(pending)} episodes, {workers} at a time (concurrency {concurrency} each)")
+
+    def run(job):
+        progress.update(job["id"], status="rendering", key=job["key"], output=str(job["output"]),
+                        started_at=datetime.now().isoformat(timespec="seconds"), error=None)
+        job["output"].parent.mkdir(parents=True, exist_ok=True)
+        seconds = render_episode(bundle_dir, job["props_path"], job["output"],
+                                 logs_dir / f"{job['id']}.log", concurrency, project)
+        fields = {"status": "done", "seconds": round(seconds, 1), "frames": job["frames"],
+                  "finished_at": datetime.now().isoformat(timespec="seconds")}
+        if args.qa:
+            fields["qa_passed"] = qa_episode(job["output"], job["frames"])
+        progress.update(job["id"], **fields)
+        return seconds
+
+    started = time.perf_counter()
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run, job): job for job in pending}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                seconds = future.result()
+                qa = progress.episode(job["id"]).get("qa_passed")
+                qa_note = "" if qa is None else (", QA passed" if qa else ", ⚠️ QA failed")
+                print(f"  ✅ {job['id']}: {job['frames']} frames in {seconds / 60:.1f} min{qa_note} -> {job['output']}")
+            except Exception as e:
+                failures += 1
+                progress.update(job["id"], status="failed", error=str(e))
+                print(f"  ❌ {job['id']}: {e}")
+
+    elapsed = time.perf_counter() - started
+    print(f"\n{'✅' if not failures else '⚠️ '} {len(pending) - failures}/{len(pending)} episodes rendered "
+          f"in {elapsed / 60:.1f} min")
+    print(f"💾 Progress: {progress.path}")
+    if failures:
+        print("Re-run the same command to retry failed episodes.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
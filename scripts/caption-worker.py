@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Run a long-lived caption worker that keeps Whisper models warm.
+
+Every generate-captions.py run otherwise pays interpreter start, heavy
+imports and model load before doing any work. While this worker is
+running, generate-captions.py submits jobs to it over HTTP on localhost
+and streams progress back; with no worker it transcribes in-process.
+
+Requirements:
+    pip install faster-whisper
+
+Usage:
+    python caption-worker.py [--port 8765] [--concurrency 1] [--queue-size 16] [--preload base]
+"""
+
+import argparse
+import sys
+
+from caption_daemon import DAEMON_TOKEN, serve
+from transcription import FASTER_WHISPER_AVAILABLE
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a persistent caption worker with warm Whisper models",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Start the worker (keep this terminal open)
+  python caption-worker.py
+
+  # Preload the model you use most so the first job is fast too
+  python caption-worker.py --preload base --preload medium
+
+  # Two jobs at once, up to 32 waiting
+  python caption-worker.py --concurrency 2 --queue-size 32
+
+  # In another terminal, generate-captions.py now uses the worker
+  python generate-captions.py video.mp4
+
+  # Check status
+  curl http://127.0.0.1:8765/health
+
+  # Videos in raw/, captions written to the project's public/assets
+  python caption-worker.py --allow-output-root public/assets
+
+  # Reachable from other machines: a token is required
+  CAPTION_DAEMON_TOKEN=s3cret python caption-worker.py --host 0.0.0.0
+
+The client looks for the worker at $CAPTION_DAEMON_URL
+(default: http://127.0.0.1:8765) and sends $CAPTION_DAEMON_TOKEN if set.
+Jobs may only write captions next to their video or under an allowed
+output root (default: the directory the worker was started in).
+        """
+    )
+
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Address to bind (default: 127.0.0.1, localhost only; "
+             "other addresses require a token)"
+    )
+
+    parser.add_argument(
+        "--token",
+        default=DAEMON_TOKEN,
+        help="Shared secret clients must send (default: $CAPTION_DAEMON_TOKEN)"
+    )
+
+    parser.add_argument(
+        "--allow-output-root",
+        action="append",
+        default=[],
+        metavar="DIR",
+        help="Directory jobs may write captions under, besides the video's own "
+             "directory (default: current directory; repeatable)"
+    )
+
+    parser.add_argument(
+        "--port",
+        "-p",
+        type=int,
+        default=8765,
+        help="Port to listen on (default: 8765)"
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        default=1,
+        help="Number of jobs transcribed at the same time (default: 1)"
+    )
+
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=16,
+        help="Maximum number of waiting jobs; more are rejected (default: 16)"
+    )
+
+    parser.add_argument(
+        "--preload",
+        action="append",
+        default=[],
+        metavar="MODEL[/COMPUTE_TYPE]",
+        help="Load a model at startup, e.g. base or medium/int8; without a compute "
+             "type the tuning profile is used (repeatable)"
+    )
+
+    args = parser.parse_args()
+
+    if not FASTER_WHISPER_AVAILABLE:
+        print("Error: faster-whisper not installed.")
+        print("Install with: pip install faster-whisper")
+        sys.exit(1)
+
+    preload = []
+    for spec in args.preload:
+        model_size, _, compute_type = spec.partition("/")
+        preload.append((model_size, compute_type or None))
+
+    try:
+        serve(
+            host=args.host,
+            port=args.port,
+            concurrency=args.concurrency,
+            queue_size=args.queue_size,
+            preload=tuple(preload),
+            token=args.token,
+            output_roots=tuple(args.allow_output_root)
+        )
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
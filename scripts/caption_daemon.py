@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+Persistent caption worker: server and client.
+
+The worker keeps WhisperModel instances warm (one per model size and
+compute type) and accepts transcription jobs over HTTP on localhost, so
+repeated generate-captions.py runs skip interpreter start, heavy imports
+and model load.
+
+API (JSON over HTTP, localhost only):
+    GET  /health             - worker status, loaded models, queue depth
+    POST /jobs               - submit a job, returns {"id": ...} (503 if queue full)
+    GET  /jobs/<id>          - job status and result
+    GET  /jobs/<id>/events   - newline-delimited JSON progress stream
+
+Start the worker with caption-worker.py; generate-captions.py uses the
+client functions here and falls back to in-process transcription when
+no worker is running.
+
+The worker writes captions wherever a job asks, as the user running it,
+so requests are checked before anything is queued:
+    - POST bodies must be Content-Type: application/json (a web page
+      cannot send that cross-origin without a CORS preflight)
+    - requests with an Origin header are refused, and so is any Host
+      other than a loopback name (DNS rebinding) unless a token is set
+    - with a token ($CAPTION_DAEMON_TOKEN or --token), every request
+      needs "Authorization: Bearer <token>"; binding to a non-loopback
+      address requires one
+    - output_path must be an absolute .json path inside the video's
+      directory or an allowed output root (the worker's start directory
+      by default)
+"""
+
+import hmac
+import ipaddress
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from instrumentation import TRACER
+from transcription import LanguageCache
+
+DEFAULT_DAEMON_URL = os.environ.get("CAPTION_DAEMON_URL", "http://127.0.0.1:8765")
+
+# Shared secret sent by clients; required when the worker binds beyond loopback
+DAEMON_TOKEN = os.environ.get("CAPTION_DAEMON_TOKEN") or None
+
+# Fields accepted in a job submission, with defaults
+JOB_FIELDS = {
+    "video_path": None,
+    "output_path": "captions.json",
+    "model_size": "base",
+    "language": "auto",
+    "compute_type": None,  # None: tuning profile or int8
+    "convert_to_simplified": True,
+}
+
+# Finished jobs (and their events) are kept this long for late status queries
+FINISHED_JOB_TTL = 600.0
+MAX_FINISHED_JOBS = 100
+
+
+class WorkerBusy(RuntimeError):
+    """The caption worker's queue is full; the caller should transcribe itself."""
+
+
+class WorkerRefused(RuntimeError):
+    """The caption worker refused the request (token, origin or output path)."""
+
+
+def is_loopback(host: str) -> bool:
+    """True for localhost and loopback addresses (IPv4 or IPv6, bracketed or not)."""
+    host = host.strip("[]").lower()
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def host_name(header: str) -> str:
+    """Host header without the port: "[::1]:8765" -> "::1", "localhost:8765" -> "localhost"."""
+    if header.startswith("["):
+        return header[1:].partition("]")[0]
+    return header.rpartition(":")[0] if header.count(":") == 1 else header
+
+
+def check_output_path(video_path: str, output_path: str, roots) -> Optional[str]:
+    """
+    Check where a job may write its captions.
+
+    Returns:
+        An error message, or None if output_path is an absolute .json path
+        inside the video's directory or one of roots (symlinks resolved)
+    """
+    if not os.path.isabs(output_path) or not output_path.endswith(".json"):
+        return f"output_path must be an absolute .json path: {output_path}"
+    target = os.path.realpath(output_path)
+    allowed = [os.path.dirname(os.path.realpath(video_path)), *(os.path.realpath(root) for root in roots)]
+    if not any(os.path.commonpath([target, root]) == root for root in allowed):
+        return f"output_path outside the video directory and allowed roots: {output_path}"
+    return None
+
+
+class Job:
+    """One transcription job and its progress events."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, params: dict):
+        self.id = str(next(self._ids))
+        self.params = params
+        self.status = "queued"
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.events = []
+        self._cond = threading.Condition()
+
+    def emit(self, event: dict):
+        """Append a progress event and wake up streaming clients."""
+        with self._cond:
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def finish(self, status: str, event: dict):
+        """Set the final status and emit the terminal event in one step, so streams never miss it."""
+        with self._cond:
+            self.finished = time.time()
+            self.status = status
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def stream(self) -> Iterator[dict]:
+        """Yield events as they arrive until the job finishes."""
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self.events) and self.status not in ("done", "failed"):
+                    self._cond.wait(timeout=1.0)
+                pending = self.events[index:]
+                index = len(self.events)
+                finished = self.status in ("done", "failed")
+            yield from pending
+            if finished and index >= len(self.events):
+                return
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "params": self.params,
+            "segments": len(self.result["segments"]) if self.result else None,
+            "language": self.result["language"] if self.result else None,
+            "error": self.error,
+            "queued_s": round((self.started or time.time()) - self.created, 3),
+            "run_s": round((self.finished or time.time()) - self.started, 3) if self.started else None,
+        }
+
+
+class ModelPool:
+    """
+    Warm WhisperModel instances keyed by (model_size, compute_type).
+
+    Each model comes with a semaphore sized to its num_workers, so a model
+    tuned for several workers (see tune-whisper.py) serves that many jobs
+    in parallel.
+    """
+
+    def __init__(self, concurrent: bool = False):
+        self._models: Dict[Tuple[str, Optional[str]], Tuple[object, threading.BoundedSemaphore]] = {}
+        self._lock = threading.Lock()
+        self.concurrent = concurrent
+
+    def get(self, model_size: str, compute_type: Optional[str]):
+        """Return (model, slots), loading the model on first use."""
+        from transcription import load_model, tuned_settings
+
+        key = (model_size, compute_type)
+        with self._lock:
+            if key not in self._models:
+                workers = tuned_settings(model_size, self.concurrent)["num_workers"]
+                print(f"🎬 Loading model: {model_size} ({compute_type or 'tuned'}, {workers} worker(s))")
+                model = load_model(model_size, compute_type, concurrent=self.concurrent)
+                self._models[key] = (model, threading.BoundedSemaphore(workers))
+            return self._models[key]
+
+    def loaded(self):
+        return [f"{size}/{ctype or 'tuned'}" for size, ctype in self._models]
+
+
+class CaptionWorker:
+    """Bounded job queue served by a fixed number of worker threads."""
+
+    def __init__(self, concurrency: int = 1, queue_size: int = 16):
+        self.jobs: Dict[str, Job] = {}
+        self._jobs_lock = threading.Lock()
+        self.queue: "queue.Queue[Job]" = queue.Queue(maxsize=queue_size)
+        self.models = ModelPool(concurrent=concurrency > 1)
+        # Jobs sent to one worker are usually one batch in one language
+        self.languages = LanguageCache()
+        self.threads = [
+            threading.Thread(target=self._run, name=f"caption-worker-{i}", daemon=True)
+            for i in range(concurrency)
+        ]
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, params: dict) -> Job:
+        """Queue a job; raises queue.Full when the queue is at capacity."""
+        job = Job(params)
+        self.queue.put_nowait(job)
+        with self._jobs_lock:
+            self._prune_jobs()
+            self.jobs[job.id] = job
+        job.emit({"type": "status", "status": "queued", "position": self.queue.qsize()})
+        return job
+
+    def _prune_jobs(self):
+        """Forget finished jobs past FINISHED_JOB_TTL, and the oldest beyond MAX_FINISHED_JOBS."""
+        finished = sorted((job for job in self.jobs.values() if job.finished), key=lambda job: job.finished)
+        expired = time.time() - FINISHED_JOB_TTL
+        excess = len(finished) - MAX_FINISHED_JOBS
+        for index, job in enumerate(finished):
+            if index < excess or job.finished < expired:
+                del self.jobs[job.id]
+
+    def _run(self):
+        from transcription import generate_captions
+
+        while True:
+            job = self.queue.get()
+            job.status = "running"
+            job.started = time.time()
+            job.emit({"type": "status", "status": "running"})
+            params = job.params
+
+            try:
+                model, slots = self.models.get(params["model_size"], params["compute_type"])
+                # At most num_workers transcriptions per model; different models run in parallel
+                with slots:
+                    job.result = generate_captions(
+                        video_path=params["video_path"],
+                        output_path=params["output_path"],
+                        model_size=params["model_size"],
+                        language=params["language"],
+                        compute_type=params["compute_type"],
+                        convert_to_simplified=params["convert_to_simplified"],
+                        model=model,
+                        language_cache=self.languages,
+                        on_segment=lambda caption: job.emit({"type": "segment", **caption}),
+                    )
+                job.finish("done", {
+                    "type": "done",
+                    "output_path": params["output_path"],
+                    "language": job.result["language"],
+                    "segments": len(job.result["segments"]),
+                    "run_s": round(time.time() - job.started, 3),
+                })
+            except Exception as e:
+                job.error = str(e)
+                job.finish("failed", {"type": "error", "message": str(e)})
+            finally:
+                self.queue.task_done()
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "pid": os.getpid(),
+            "models": self.models.loaded(),
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "workers": len(self.threads),
+            "running": sum(1 for job in list(self.jobs.values()) if job.status == "running"),
+            "jobs_kept": len(self.jobs),
+        }
+
+
+def make_handler(worker: CaptionWorker, token: Optional[str] = None, output_roots=()):
+    """Build a request handler class bound to a worker."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def _refused(self) -> Optional[str]:
+            """Why this request may not talk to the worker, or None."""
+            if self.headers.get("Origin") is not None:
+                return "cross-origin requests are not accepted"
+            if token is not None:
+                supplied = self.headers.get("Authorization", "")
+                if not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+                    return "missing or wrong token"
+            elif not is_loopback(host_name(self.headers.get("Host", ""))):
+                return "Host must be a loopback address"
+            return None
+
+        def _send_json(self, status: int, data: dict):
+            body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            refused = self._refused()
+            if refused:
+                return self._send_json(403, {"error": refused})
+
+            parts = [p for p in self.path.split("/") if p]
+            if parts == ["health"]:
+                return self._send_json(200, worker.health())
+
+            job = worker.jobs.get(parts[1]) if len(parts) >= 2 and parts[0] == "jobs" else None
+            if job is not None:
+                if len(parts) == 2:
+                    return self._send_json(200, job.summary())
+                if parts[2:] == ["events"]:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+                    self.end_headers()
+                    try:
+                        for event in job.stream():
+                            self.wfile.write((json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8"))
+                            self.wfile.flush()
+                    except (BrokenPipeError, ConnectionResetError):
+                        pass
+                    return
+
+            self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            refused = self._refused()
+            if refused:
+                return self._send_json(403, {"error": refused})
+            if self.path.rstrip("/") != "/jobs":
+                return self._send_json(404, {"error": "not found"})
+            if self.headers.get_content_type() != "application/json":
+                return self._send_json(415, {"error": "Content-Type must be application/json"})
+
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except (ValueError, json.JSONDecodeError):
+                return self._send_json(400, {"error": "invalid JSON"})
+            if not isinstance(payload, dict):
+                return self._send_json(400, {"error": "JSON body must be an object"})
+
+            params = {key: payload.get(key, default) for key, default in JOB_FIELDS.items()}
+            for key in ("video_path", "output_path"):
+                if not isinstance(params[key], str):
+                    return self._send_json(400, {"error": f"{key} must be a string"})
+            if not os.path.isabs(params["video_path"]) or not os.path.isfile(params["video_path"]):
+                return self._send_json(400, {"error": f"video not found: {params['video_path']}"})
+            error = check_output_path(params["video_path"], params["output_path"], output_roots)
+            if error:
+                return self._send_json(403, {"error": error})
+
+            try:
+                job = worker.submit(params)
+            except queue.Full:
+                return self._send_json(503, {"error": "queue full", "queue_capacity": worker.queue.maxsize})
+
+            self._send_json(202, {"id": job.id, "status": job.status})
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, concurrency: int = 1,
+          queue_size: int = 16, preload: Tuple[Tuple[str, str], ...] = (),
+          token: Optional[str] = DAEMON_TOKEN, output_roots: Tuple[str, ...] = ()):
+    """
+    Run the caption worker until interrupted.
+
+    Raises:
+        ValueError: If host is not a loopback address and no token is set
+    """
+    if not is_loopback(host) and not token:
+        raise ValueError(f"refusing to listen on {host} without a token (set --token or $CAPTION_DAEMON_TOKEN)")
+    output_roots = tuple(os.path.abspath(root) for root in output_roots or (os.getcwd(),))
+    # Nobody writes a trace from the worker: keep counters but not one span event per job forever
+    TRACER.keep_events = False
+    worker = CaptionWorker(concurrency=concurrency, queue_size=queue_size)
+    for model_size, compute_type in preload:
+        worker.models.get(model_size, compute_type)
+    worker.start()
+
+    server = ThreadingHTTPServer((host, port), make_handler(worker, token, output_roots))
+    server.daemon_threads = True
+    print(f"🚀 Caption worker listening on http://{host}:{port} "
+          f"({concurrency} worker(s), queue {queue_size})")
+    print(f"   Writing captions only next to the video or under: {', '.join(output_roots)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Caption worker stopped")
+    finally:
+        server.server_close()
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+def _request(url: str, data: Optional[dict] = None, timeout: float = 10.0):
+    body = json.dumps(data).encode("utf-8") if data is not None else None
+    headers = {"Content-Type": "application/json"}
+    if DAEMON_TOKEN:
+        headers["Authorization"] = f"Bearer {DAEMON_TOKEN}"
+    req = urllib.request.Request(url, data=body, headers=headers)
+    return urllib.request.urlopen(req, timeout=timeout)
+
+
+def daemon_available(url: str = DEFAULT_DAEMON_URL, timeout: float = 0.3) -> bool:
+    """Return True if a caption worker answers /health at url."""
+    try:
+        with _request(f"{url}/health", timeout=timeout) as response:
+            return json.load(response).get("status") == "ok"
+    except (urllib.error.URLError, OSError, ValueError):
+        return False
+
+
+def submit_job(
+    params: dict,
+    url: str = DEFAULT_DAEMON_URL,
+    on_event: Optional[Callable[[dict], None]] = None
+) -> dict:
+    """
+    Submit a job to the caption worker and stream its progress.
+
+    Paths are made absolute because the worker may run in another directory.
+
+    Args:
+        params: Job fields (see JOB_FIELDS)
+        url: Worker base URL
+        on_event: Callback invoked with each progress event
+
+    Returns:
+        The final "done" event
+
+    Raises:
+        WorkerBusy: If the worker's queue is full
+        WorkerRefused: If the worker refuses the caller or the output path
+        RuntimeError: If the worker rejects the job or the job fails
+    """
+    params = dict(params)
+    for key in ("video_path", "output_path"):
+        params[key] = os.path.abspath(params[key])
+
+    try:
+        with _request(f"{url}/jobs", params) as response:
+            job_id = json.load(response)["id"]
+    except urllib.error.HTTPError as e:
+        message = e.read().decode('utf-8', errors='ignore')
+        if e.code == 503:
+            raise WorkerBusy(f"Caption worker queue full: {message}")
+        if e.code in (401, 403):
+            raise WorkerRefused(f"Caption worker refused job: {message}")
+        raise RuntimeError(f"Caption worker rejected job: {message}")
+
+    with _request(f"{url}/jobs/{job_id}/events", timeout=None) as response:
+        for line in response:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if on_event:
+                on_event(event)
+            if event["type"] == "done":
+                return event
+            if event["type"] == "error":
+                raise RuntimeError(event["message"])
+
+    raise RuntimeError("Caption worker closed the progress stream early")
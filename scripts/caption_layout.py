@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Caption re-flow engine.
+
+Whisper segment lengths follow the model's decoding windows, not the
+caption box on screen. This module re-splits and merges captions from
+their word timestamps so each caption fits a line width and a reading
+speed. It only reads the word data already stored in captions.json, so
+layout rules can be changed and re-applied without re-running the model.
+
+Widths are measured in display columns: CJK (full-width) characters
+count 2, everything else counts 1. A 42-column line therefore holds
+21 Chinese characters or about 42 Latin characters.
+"""
+
+import math
+import unicodedata
+from typing import List, Optional
+
+# Sentence endings always allow a break; soft punctuation is preferred
+# when a caption has to be split mid-sentence.
+SENTENCE_END = set("。！？!?.…")
+SOFT_BREAK = set("，、；：,;:")
+
+
+def display_width(text: str) -> int:
+    """Width of text in display columns (full-width characters count 2)."""
+    return sum(2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1 for ch in text)
+
+
+def caption_words(captions: dict) -> List[dict]:
+    """
+    Flatten all captions into one word list.
+
+    Segments without word timestamps are kept as a single synthetic word
+    spanning the segment, so they still take part in merging. Each word
+    remembers the segment it came from for confidence bookkeeping.
+    """
+    words = []
+    for index, seg in enumerate(captions.get("segments", [])):
+        seg_words = seg.get("words") or [{
+            "start": seg["start"],
+            "end": seg["end"],
+            "word": seg["text"],
+            "probability": seg.get("confidence", 1.0),
+            "synthetic": True,
+        }]
+        for word in seg_words:
+            if word["word"].strip():
+                words.append({**word, "segment": index})
+    return words
+
+
+def _join(words: List[dict]) -> str:
+    # faster-whisper words carry their own leading space for spaced languages
+    return "".join(word["word"] for word in words).strip()
+
+
+def _make_caption(words: List[dict], segments: List[dict]) -> dict:
+    """Build a caption from a run of words, keeping the weakest source scores."""
+    weakest = min(
+        (segments[i] for i in {word["segment"] for word in words}),
+        key=lambda seg: seg.get("confidence", 1.0)
+    )
+    caption = {
+        "id": 0,
+        "start": words[0]["start"],
+        "end": words[-1]["end"],
+        "text": _join(words),
+    }
+    for key in ("confidence", "avg_logprob", "no_speech_prob"):
+        if key in weakest:
+            caption[key] = weakest[key]
+    if any("refined" in segments[word["segment"]] for word in words):
+        caption["refined"] = True
+    # Only real word timings are written back: a segment-long stand-in
+    # would look word-timed to the next reflow, align or recheck run
+    if not any(word.get("synthetic") for word in words):
+        caption["words"] = [{k: v for k, v in word.items() if k != "segment"} for word in words]
+    return caption
+
+
+def reflow_captions(
+    captions: dict,
+    line_width: int = 42,
+    max_lines: int = 1,
+    max_cps: float = 18.0,
+    min_duration: float = 1.0,
+    max_gap: float = 0.8,
+    min_gap: float = 0.05,
+    min_width: Optional[int] = None
+) -> dict:
+    """
+    Re-split and merge captions to fit the caption box and reading speed.
+
+    Words are scanned once, left to right. A caption is closed when the
+    next word would overflow line_width * max_lines columns (splitting at
+    the last soft punctuation past half the width, if any), when the pause
+    before the next word exceeds max_gap, or after a sentence ending once
+    the caption is at least min_width columns. Captions faster than
+    max_cps columns/second, or shorter than min_duration, are then held
+    on screen longer, into the following gap. Both passes are linear in
+    the number of words.
+
+    Args:
+        captions: Captions data with "segments" (and ideally "words")
+        line_width: Caption box width in display columns
+        max_lines: Lines the caption box may wrap to
+        max_cps: Maximum reading speed in display columns per second
+        min_duration: Minimum time a caption stays on screen in seconds
+        max_gap: Pauses longer than this always start a new caption
+        min_gap: Gap kept between captions when extending them
+        min_width: Sentence endings only break captions at least this wide
+                   (default: a third of the caption width)
+
+    Returns:
+        New captions dict with re-flowed segments and the layout used
+    """
+    segments = captions.get("segments", [])
+    words = caption_words(captions)
+    max_width = line_width * max_lines
+    if min_width is None:
+        min_width = max_width // 3
+
+    runs: List[List[dict]] = []
+    current: List[dict] = []
+    width = 0
+
+    for word in words:
+        word_width = display_width(word["word"])
+
+        if current and word["start"] - current[-1]["end"] > max_gap:
+            runs.append(current)
+            current, width = [], 0
+
+        if current and width + word_width > max_width:
+            # Split at the last soft break past half the box, otherwise here
+            split = len(current)
+            running = 0
+            for i, prev in enumerate(current[:-1]):
+                running += display_width(prev["word"])
+                if running >= max_width // 2 and prev["word"].strip()[-1:] in SOFT_BREAK:
+                    split = i + 1
+            runs.append(current[:split])
+            current = current[split:]
+            width = sum(display_width(prev["word"]) for prev in current)
+
+        current.append(word)
+        width += word_width
+
+        if word["word"].strip()[-1:] in SENTENCE_END and width >= min_width:
+            runs.append(current)
+            current, width = [], 0
+
+    if current:
+        runs.append(current)
+
+    reflowed = [_make_caption(run, segments) for run in runs]
+
+    # Hold fast or short captions longer, but never into the next caption
+    for i, caption in enumerate(reflowed):
+        duration = caption["end"] - caption["start"]
+        needed = max(min_duration, display_width(caption["text"]) / max_cps)
+        if duration < needed:
+            limit = reflowed[i + 1]["start"] - min_gap if i + 1 < len(reflowed) else float("inf")
+            # Round up to whole milliseconds so the rounded caption still meets max_cps
+            extended = math.ceil(min(caption["start"] + needed, limit) * 1000) / 1000
+            caption["end"] = max(caption["end"], min(extended, limit))
+        caption["start"] = round(caption["start"], 3)
+        caption["end"] = round(caption["end"], 3)
+        caption["id"] = i + 1
+
+    layout = {
+        "line_width": line_width,
+        "max_lines": max_lines,
+        "max_cps": max_cps,
+        "min_duration": min_duration,
+        "max_gap": max_gap,
+    }
+    return {**captions, "segments": reflowed, "layout": layout}
+
+
+def layout_report(captions: dict, line_width: int, max_lines: int, max_cps: float) -> dict:
+    """Count captions that overflow the box or read too fast."""
+    max_width = line_width * max_lines
+    segments = captions.get("segments", [])
+    too_wide = too_fast = 0
+    widest = 0
+    for seg in segments:
+        width = display_width(seg["text"])
+        widest = max(widest, width)
+        duration = max(seg["end"] - seg["start"], 1e-3)
+        too_wide += width > max_width
+        too_fast += width / duration > max_cps
+    return {"segments": len(segments), "too_wide": too_wide, "too_fast": too_fast, "widest": widest}
@@ -10,20 +10,58 @@ Usage:
 """
 
 import argparse
+import importlib.util
 import io
 import json
+import math
+import os
 import platform
+import re
+import shutil
 import subprocess
 import sys
+import tempfile
+import time
 from pathlib import Path
-from typing import List, Tuple
-
-# Try to import OpenCC for caption checking
-try:
-    import opencc
-    OPENCC_AVAILABLE = True
-except ImportError:
-    OPENCC_AVAILABLE = False
+from typing import List, Optional, Tuple
+
+from instrumentation import add_profile_arguments, profiled_run, run_subprocess, span
+
+# OpenCC is only needed for the caption recommendation, so just check it exists
+OPENCC_AVAILABLE = importlib.util.find_spec("opencc") is not None
+
+# Composition frame rate (Root.tsx)
+RENDER_FPS = 30
+
+# Encoders reported by --capabilities, with what uses them
+FFMPEG_ENCODERS = {
+    "libx264": "Remotion render, prepare-video.py, export-subtitles.py --burn",
+    "aac": "normalize-audio.py, trim-silence.py",
+    "libvpx-vp9": "prepare-pip.py with a video source",
+    "h264_nvenc": "hardware H.264 (NVIDIA)",
+    "h264_videotoolbox": "hardware H.264 (macOS)",
+    "h264_qsv": "hardware H.264 (Intel Quick Sync)",
+    "h264_vaapi": "hardware H.264 (VA-API)",
+}
+REQUIRED_ENCODERS = {"libx264", "aac"}
+
+# Filters the scripts use, with the script that needs them
+FFMPEG_FILTERS = {
+    "subtitles": "export-subtitles.py --burn",
+    "overlay": "prepare-pip.py --bake",
+    "select": "trim-silence.py",
+    "aselect": "trim-silence.py",
+    "blackdetect": "qa-render.py",
+    "freezedetect": "qa-render.py",
+    "silencedetect": "qa-render.py",
+    "ebur128": "qa-render.py",
+}
+
+# Whisper decode cost relative to tiny (from the published relative speeds)
+WHISPER_RELATIVE_COST = {"tiny": 1, "base": 2, "small": 5, "medium": 16, "large": 32}
+
+# normalize-audio.py encodes the audio twice (extract + mux)
+NORMALIZE_PASSES = 2
 
 # Fix encoding for Windows
 if platform.system() == "Windows":
@@ -83,7 +121,7 @@ def check_command(command: str, args: List[str] = ["--version"], name: str = Non
     display_name = name or command
 
     try:
-        result = subprocess.run(
+        result = run_subprocess(
             [command] + args,
             capture_output=True,
             text=True,
@@ -120,7 +158,7 @@ def check_python_module(module_name: str, import_name: str = None) -> Tuple[bool
     import_name = import_name or module_name
 
     try:
-        result = subprocess.run(
+        result = run_subprocess(
             [sys.executable, "-c", f"import {import_name}; print({import_name}.__version__ if hasattr({import_name}, '__version__') else 'installed')"],
             capture_output=True,
             text=True,
@@ -176,7 +214,7 @@ def check_npm_version() -> Tuple[bool, str]:
 
     # Method 2: Check via node (npm is usually installed with node)
     try:
-        result = subprocess.run(
+        result = run_subprocess(
             ["node", "-e", "console.log(require('child_process').execSync('npm --version').toString())"],
             capture_output=True,
             text=True,
@@ -195,7 +233,7 @@ def check_npm_version() -> Tuple[bool, str]:
     if platform.system() == "Windows":
         try:
             # Try to find npm in Node.js installation directory
-            result = subprocess.run(
+            result = run_subprocess(
                 ["where", "npm"],
                 capture_output=True,
                 text=True,
@@ -206,7 +244,7 @@ def check_npm_version() -> Tuple[bool, str]:
             if result.returncode == 0 and result.stdout.strip():
                 # Found npm, get version
                 npm_path = result.stdout.strip().split('\n')[0]
-                result = subprocess.run(
+                result = run_subprocess(
                     [npm_path, "--version"],
                     capture_output=True,
                     text=True,
@@ -237,7 +275,7 @@ def check_faster_whisper() -> Tuple[bool, str]:
 
     # If all fails, try pip list
     try:
-        result = subprocess.run(
+        result = run_subprocess(
             [sys.executable, "-m", "pip", "list", "--format=json"],
             capture_output=True,
             text=True,
@@ -422,6 +460,222 @@ def check_captions(args: argparse.Namespace) -> None:
         print_error(f"Error checking caption file: {e}")
 
 
+def probe_memory() -> Tuple[float, float]:
+    """Total and available RAM in GB (available is None where unknown)."""
+    meminfo = Path("/proc/meminfo")
+    if meminfo.exists():
+        values = {}
+        for line in meminfo.read_text().splitlines():
+            key, _, rest = line.partition(":")
+            values[key] = int(rest.split()[0]) / 1024 / 1024  # kB -> GB
+        return values.get("MemTotal", 0.0), values.get("MemAvailable")
+    if platform.system() == "Darwin":
+        ok, output = check_command("sysctl", ["-n", "hw.memsize"])
+        if ok and output.isdigit():
+            return int(output) / 1024 ** 3, None
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024 ** 3, None
+    except (ValueError, OSError, AttributeError):
+        return 0.0, None
+
+
+def probe_tmpfs() -> List[Tuple[str, float]]:
+    """RAM-backed mount points (tmpfs) usable for frame scratch space, with free GB."""
+    mounts = Path("/proc/mounts")
+    if not mounts.exists():
+        return []
+    found = []
+    for line in mounts.read_text().splitlines():
+        fields = line.split()
+        if (len(fields) >= 3 and fields[2] == "tmpfs" and fields[1] in ("/dev/shm", "/tmp", tempfile.gettempdir())
+                and fields[1] not in dict(found)):
+            try:
+                found.append((fields[1], shutil.disk_usage(fields[1]).free / 1024 ** 3))
+            except OSError:
+                pass
+    return found
+
+
+def probe_ffmpeg_features(kind: str) -> List[str]:
+    """Names listed by `ffmpeg -encoders` or `ffmpeg -filters`."""
+    ok, _ = check_command("ffmpeg", ["-version"])
+    if not ok:
+        return []
+    result = run_subprocess(["ffmpeg", "-hide_banner", f"-{kind}"], capture_output=True, text=True, timeout=10)
+    names = []
+    for line in result.stdout.splitlines():
+        fields = line.split()
+        # Encoder lines start with flags like "V....D", filter lines with "TSC" or "..."
+        if len(fields) >= 2 and re.fullmatch(r"[A-Z.]{3,6}", fields[0]) and fields[1] != "=":
+            names.append(fields[1])
+    return names
+
+
+def benchmark_x264(seconds: float = 3.0) -> Optional[float]:
+    """Encode a synthetic 1080p clip like Remotion does (x264, CRF 18); returns frames per second."""
+    frames = int(seconds * RENDER_FPS)
+    cmd = [
+        "ffmpeg", "-v", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size=1920x1080:rate={RENDER_FPS}",
+        "-frames:v", str(frames),
+        "-c:v", "libx264", "-preset", "medium", "-crf", "18", "-pix_fmt", "yuv420p",
+        "-f", "null", "-"
+    ]
+    started = time.perf_counter()
+    result = run_subprocess(cmd, capture_output=True, text=True, timeout=300)
+    if result.returncode != 0:
+        return None
+    return frames / (time.perf_counter() - started)
+
+
+def benchmark_aac(seconds: float = 30.0) -> Optional[float]:
+    """Encode synthetic stereo audio to AAC; returns audio seconds per wall second."""
+    cmd = [
+        "ffmpeg", "-v", "error",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={seconds}",
+        "-ac", "2", "-c:a", "aac", "-b:a", "192k",
+        "-f", "null", "-"
+    ]
+    started = time.perf_counter()
+    result = run_subprocess(cmd, capture_output=True, text=True, timeout=300)
+    if result.returncode != 0:
+        return None
+    return seconds / (time.perf_counter() - started)
+
+
+def benchmark_transcription(seconds: float = 10.0) -> Optional[float]:
+    """Transcribe a synthetic clip with the tiny model; returns audio seconds per wall second."""
+    from transcription import FASTER_WHISPER_AVAILABLE, load_model, synthetic_clip
+
+    if not FASTER_WHISPER_AVAILABLE:
+        return None
+    clip = synthetic_clip(seconds)
+    model = load_model("tiny")
+    started = time.perf_counter()
+    segments, _ = model.transcribe(clip, beam_size=5, language="en", vad_filter=False)
+    for _ in segments:
+        pass
+    return seconds / (time.perf_counter() - started)
+
+
+def project_durations(args: argparse.Namespace) -> dict:
+    """Durations of the project's source videos (None when missing)."""
+    from media_utils import probe_duration
+
+    durations = {}
+    for name, path in (("host", args.host_video), ("tutorial", args.screen_recording)):
+        durations[name] = round(probe_duration(path), 2) if path and Path(path).exists() else None
+    return durations
+
+
+def check_capabilities(args: argparse.Namespace) -> None:
+    """Report machine capabilities and predict caption, normalize and render time for the project."""
+    from transcription import TRANSCRIBE_OPTIONS, load_tuning_profile
+
+    cores = os.cpu_count() or 1
+    total_ram, available_ram = probe_memory()
+    available = f", {available_ram:.1f} GB available" if available_ram is not None else ""
+    print_info(f"CPU: {cores} threads ({platform.machine()} {platform.processor() or platform.system()})")
+    print_info(f"RAM: {total_ram:.1f} GB{available}")
+
+    tmpfs = probe_tmpfs()
+    if tmpfs:
+        for mount, free in tmpfs:
+            print_success(f"tmpfs: {mount} ({free:.1f} GB free)")
+    else:
+        print_info("tmpfs: none found (frames are written to disk)")
+
+    encoders = set(probe_ffmpeg_features("encoders"))
+    filters = set(probe_ffmpeg_features("filters"))
+    if encoders:
+        for name, purpose in FFMPEG_ENCODERS.items():
+            if name in encoders:
+                print_success(f"Encoder {name}: {purpose}")
+            elif name in REQUIRED_ENCODERS:
+                print_error(f"Encoder {name} missing: {purpose}")
+            elif args.verbose:
+                print_info(f"Encoder {name} not available: {purpose}")
+        missing = [name for name in FFMPEG_FILTERS if name not in filters]
+        if missing:
+            for name in missing:
+                print_warning(f"Filter {name} missing: needed by {FFMPEG_FILTERS[name]}")
+        else:
+            print_success(f"All {len(FFMPEG_FILTERS)} FFmpeg filters used by the scripts are available")
+    else:
+        print_warning("FFmpeg not found: encoder, filter and encode benchmarks skipped")
+
+    print()
+    print(f"{Colors.BOLD}Benchmarking...{Colors.END}")
+    with span("benchmark:x264"):
+        x264_fps = benchmark_x264() if "libx264" in encoders else None
+    with span("benchmark:aac"):
+        aac_speed = benchmark_aac() if "aac" in encoders else None
+    if x264_fps:
+        print_info(f"x264 1080p encode: {x264_fps:.1f} fps")
+    if aac_speed:
+        print_info(f"AAC encode: {aac_speed:.0f}x realtime")
+
+    caption_speed, caption_source = None, None
+    tuning = load_tuning_profile()
+    profile = tuning.get("models", {}).get(args.model, {})
+    # Speeds from older profiles were measured with greedy decoding and overstate caption speed
+    if profile.get("speed") and tuning.get("decode_options") == TRANSCRIBE_OPTIONS:
+        caption_speed, caption_source = profile["speed"], "tuning profile"
+    else:
+        try:
+            with span("benchmark:whisper"):
+                tiny_speed = benchmark_transcription()
+        except Exception as e:
+            # 0.0, not None: the failure is already reported, faster-whisper is installed
+            tiny_speed = 0.0
+            print_warning(f"Transcription benchmark failed: {e}")
+        if tiny_speed is None:
+            print_warning("faster-whisper not installed: caption time not estimated")
+        elif tiny_speed:
+            print_info(f"Whisper tiny: {tiny_speed:.1f}x realtime")
+            caption_speed = tiny_speed / WHISPER_RELATIVE_COST[args.model]
+            caption_source = "tiny benchmark, scaled"
+    if caption_speed:
+        print_info(f"Whisper {args.model}: {caption_speed:.1f}x realtime ({caption_source})")
+
+    durations = project_durations(args)
+    print()
+    print(f"{Colors.BOLD}Estimated processing time...{Colors.END}")
+    if durations["tutorial"] is None:
+        print_warning(f"Screen recording not found: {args.screen_recording}")
+        print_info("Pass --screen-recording (and --host-video) to estimate this project")
+        return
+
+    # Same layout as Root.tsx's calculateMetadata
+    host_seconds = durations["host"] if durations["host"] is not None else 5
+    frames = (math.ceil(host_seconds * RENDER_FPS) + 5 * RENDER_FPS
+              + math.ceil(durations["tutorial"] * RENDER_FPS) + 5 * RENDER_FPS)
+    print_info(f"Project: intro {host_seconds:.1f}s, tutorial {durations['tutorial']:.1f}s, "
+               f"{frames} frames @ {RENDER_FPS}fps")
+
+    estimates = {}
+    if caption_speed:
+        estimates["captions"] = durations["tutorial"] / caption_speed
+    if aac_speed:
+        estimates["normalize"] = NORMALIZE_PASSES * (host_seconds + durations["tutorial"]) / aac_speed
+    if x264_fps:
+        concurrency = max(1, cores // 2)  # Remotion's default concurrency
+        estimates["render"] = frames * args.frame_ms / 1000 / concurrency + frames / x264_fps
+
+    for step, seconds in estimates.items():
+        print_info(f"{step:<10} ~{seconds / 60:5.1f} min")
+    total = sum(estimates.values())
+    print_info(f"{'total':<10} ~{total / 60:5.1f} min")
+    if "render" in estimates:
+        print_info(f"(render assumes {args.frame_ms:g} ms per frame per browser tab; tune with --frame-ms)")
+
+    if args.sla:
+        if total <= args.sla * 60:
+            print_success(f"Within the {args.sla:g} min target")
+        else:
+            print_warning(f"Estimated {total / 60:.1f} min exceeds the {args.sla:g} min target")
+
+
 def generate_install_guide(failed_checks: List[Tuple[str, str]], missing_npm_deps: List[Tuple[str, str, str]] = None):
     """Generate installation guide for missing dependencies."""
     print_header("Installation Guide")
@@ -494,6 +748,10 @@ def main():
 Examples:
   python check-environment.py
   python check-environment.py --verbose
+  python check-environment.py --profile trace.json
+
+  # Probe the machine and estimate processing time for this project
+  python check-environment.py --capabilities --sla 30
 
 This script checks:
   - Node.js 18+
@@ -502,6 +760,9 @@ This script checks:
   - faster-whisper (Python)
   - pydub (Python)
   - Remotion project (optional)
+  - With --capabilities: cores, RAM, tmpfs, FFmpeg encoders/filters,
+    short x264/AAC/Whisper benchmarks and a caption/normalize/render
+    time estimate from the project's source videos
         """
     )
 
@@ -524,8 +785,54 @@ This script checks:
         help="Skip checking caption file for Traditional Chinese"
     )
 
+    parser.add_argument(
+        "--capabilities",
+        action="store_true",
+        help="Probe machine capabilities and estimate processing time (runs short benchmarks)"
+    )
+
+    parser.add_argument(
+        "--host-video",
+        default="public/assets/host-video.mp4",
+        help="Intro video for the estimate (default: public/assets/host-video.mp4)"
+    )
+
+    parser.add_argument(
+        "--screen-recording",
+        default="public/assets/screen-recording.mp4",
+        help="Screen recording for the estimate (default: public/assets/screen-recording.mp4)"
+    )
+
+    parser.add_argument(
+        "--model",
+        choices=list(WHISPER_RELATIVE_COST),
+        default="base",
+        help="Whisper model used for captions (default: base)"
+    )
+
+    parser.add_argument(
+        "--frame-ms",
+        type=float,
+        default=120.0,
+        help="Assumed browser time per rendered frame in ms (default: 120)"
+    )
+
+    parser.add_argument(
+        "--sla",
+        type=float,
+        help="Target total processing time in minutes"
+    )
+
+    add_profile_arguments(parser)
+
     args = parser.parse_args()
 
+    with profiled_run(args):
+        return run_checks(args)
+
+
+def run_checks(args: argparse.Namespace) -> int:
+    """Run all environment checks and print the summary."""
     print_header("Remotion Tutorial Video - Environment Check")
 
     # Track results
@@ -534,7 +841,8 @@ This script checks:
 
     # 1. Check Node.js
     print(f"{Colors.BOLD}Checking Node.js...{Colors.END}")
-    is_installed, version, recommendation = check_node_version()
+    with span("check:node"):
+        is_installed, version, recommendation = check_node_version()
 
     if is_installed:
         print_success(f"Node.js is installed: {version}")
@@ -553,7 +861,8 @@ This script checks:
 
     # 2. Check npm
     print(f"{Colors.BOLD}Checking npm...{Colors.END}")
-    is_installed, version = check_npm_version()
+    with span("check:npm"):
+        is_installed, version = check_npm_version()
 
     if is_installed:
         print_success(f"npm is installed: {version}")
@@ -566,7 +875,8 @@ This script checks:
 
     # 3. Check FFmpeg
     print(f"{Colors.BOLD}Checking FFmpeg...{Colors.END}")
-    is_installed, version = check_ffmpeg_version()
+    with span("check:ffmpeg"):
+        is_installed, version = check_ffmpeg_version()
 
     if is_installed:
         print_success(f"FFmpeg is installed")
@@ -582,7 +892,8 @@ This script checks:
     # 4. Check Python modules
     print(f"{Colors.BOLD}Checking Python dependencies...{Colors.END}")
 
-    is_installed, version = check_faster_whisper()
+    with span("check:faster-whisper"):
+        is_installed, version = check_faster_whisper()
     if is_installed:
         print_success(f"faster-whisper is installed: {version}")
     else:
@@ -590,7 +901,8 @@ This script checks:
         all_checks_passed = False
         failed_checks.append(("faster-whisper", None))
 
-    is_installed, version = check_pydub()
+    with span("check:pydub"):
+        is_installed, version = check_pydub()
     if is_installed:
         print_success(f"pydub is installed: {version}")
     else:
@@ -603,14 +915,16 @@ This script checks:
     # 5. Check caption file (if exists)
     if not args.skip_caption_check:
         print_header("Checking caption file...")
-        check_captions(args)
+        with span("check:captions"):
+            check_captions(args)
     print()
 
     # 6. Check npm dependencies (if in a project)
     missing_npm_deps = []
     if not args.skip_remotion_check:
         print(f"{Colors.BOLD}Checking npm dependencies...{Colors.END}")
-        all_npm_installed, missing_npm_deps = check_npm_dependencies()
+        with span("check:npm-deps"):
+            all_npm_installed, missing_npm_deps = check_npm_dependencies()
 
         if all_npm_installed:
             print_success("All required npm packages are installed")
@@ -625,7 +939,8 @@ This script checks:
     # 7. Check Remotion project (optional)
     if not args.skip_remotion_check:
         print(f"{Colors.BOLD}Checking Remotion project...{Colors.END}")
-        is_remotion, message = check_remotion_project()
+        with span("check:remotion"):
+            is_remotion, message = check_remotion_project()
 
         if is_remotion:
             print_success(message)
@@ -635,6 +950,13 @@ This script checks:
 
     print()
 
+    # 8. Capability probe and time estimate (optional, runs short benchmarks)
+    if args.capabilities:
+        print_header("Machine Capabilities")
+        with span("check:capabilities"):
+            check_capabilities(args)
+        print()
+
     # Summary
     print_header("Summary")
 
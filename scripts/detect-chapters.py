@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Detect section changes in a screen recording and write chapter markers.
+
+The recording is decoded once at low resolution and a low frame rate.
+Each frame becomes a 64-bin color histogram, computed for a whole block
+of frames at once with NumPy. A section change (switching app, slide or
+page) shows up as a large histogram distance between a frame and the
+frame --lag seconds before it. The strongest changes at least
+--min-chapter seconds apart become chapters, and each one is snapped
+to the nearest caption segment start, so a chapter begins with a
+sentence rather than mid-word.
+
+Chapter times are for the final video: the recording plays after the
+intro and brand scenes, so pass --host-video (or --offset) to shift
+them. The ffmetadata file can be muxed into the rendered MP4 without
+re-encoding.
+
+Output (next to the recording unless --output is given):
+    <name>.chapters.json      - chapters with start/end/title and detection scores
+    <name>.chapters.ffmeta    - FFmpeg metadata file with [CHAPTER] entries
+
+Requirements:
+    pip install numpy
+    FFmpeg must be installed and in PATH
+
+Usage:
+    python detect-chapters.py public/assets/screen-recording.mp4 --host-video public/assets/host.mp4
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+from media_utils import check_ffmpeg, load_captions, probe_duration, require_numpy, stream_video_frames
+
+RENDER_FPS = 30
+
+# Intro is the host video; the brand scene runs 5 seconds before the recording
+BRAND_SCENE_SECONDS = 5
+SUBSCRIBE_SCENE_SECONDS = 5
+
+# 4 levels per RGB channel
+HISTOGRAM_BINS = 64
+
+TITLE_CHARS = 40
+
+
+def color_histograms(block):
+    """Normalized 64-bin RGB histograms of a (frames, height, width, 3) uint8 block."""
+    np = require_numpy()
+    frames = len(block)
+    quantized = block >> 6
+    bins = (quantized[..., 0].astype(np.int32) * 16 + quantized[..., 1] * 4 + quantized[..., 2]).reshape(frames, -1)
+    bins += np.arange(frames, dtype=np.int32)[:, None] * HISTOGRAM_BINS
+    counts = np.bincount(bins.ravel(), minlength=frames * HISTOGRAM_BINS).reshape(frames, HISTOGRAM_BINS)
+    return (counts / bins.shape[1]).astype(np.float32)
+
+
+def change_scores(histograms, lag: int):
+    """
+    Histogram distance (0-1) of each frame to the frame `lag` frames earlier.
+
+    Comparing across a lag rather than frame to frame also catches
+    transitions that fade or slide over several frames.
+    """
+    np = require_numpy()
+    scores = np.zeros(len(histograms), dtype=np.float32)
+    if len(histograms) > lag:
+        scores[lag:] = 0.5 * np.abs(histograms[lag:] - histograms[:-lag]).sum(axis=1)
+    return scores
+
+
+def pick_changes(histograms, fps: float, lag_seconds: float, threshold: float, min_gap_seconds: float):
+    """
+    Select scene changes: strongest first, at least min_gap_seconds apart.
+
+    Returns:
+        List of (seconds, score) sorted by time
+    """
+    np = require_numpy()
+    lag = max(1, round(lag_seconds * fps))
+    scores = change_scores(histograms, lag)
+    steps = change_scores(histograms, 1)
+    min_gap = min_gap_seconds * fps
+
+    picked = []
+    for index in np.argsort(-scores, kind="stable"):
+        if scores[index] < threshold:
+            break
+        if index < min_gap or any(abs(index - other) < min_gap for other, _ in picked):
+            continue
+        picked.append((int(index), float(scores[index])))
+
+    changes = []
+    for index, score in sorted(picked):
+        # Place the cut on the largest single-frame step inside the lag window
+        window = steps[index - lag + 1:index + 1]
+        frame = index - lag + 1 + int(np.argmax(window))
+        changes.append((frame / fps, score))
+    return changes
+
+
+def snap_to_captions(seconds: float, starts, window: float):
+    """Nearest caption segment start within `window` seconds, else the time itself."""
+    if not starts:
+        return seconds, False
+    nearest = min(starts, key=lambda start: abs(start - seconds))
+    if abs(nearest - seconds) <= window:
+        return nearest, True
+    return seconds, False
+
+
+def chapter_title(segments, start: float, end: float, index: int) -> str:
+    """First caption spoken in the chapter, shortened."""
+    for seg in segments:
+        if start <= seg["start"] < end and seg.get("text", "").strip():
+            text = " ".join(seg["text"].split())
+            return text if len(text) <= TITLE_CHARS else text[:TITLE_CHARS - 1].rstrip() + "…"
+    return f"Chapter {index}"
+
+
+def detect_chapters(
+    video_path: str,
+    captions_path: str = None,
+    offset: float = 0.0,
+    total_duration: float = None,
+    fps: float = 5,
+    size=(160, 90),
+    lag_seconds: float = 1.0,
+    threshold: float = 0.3,
+    min_chapter: float = 60.0,
+    snap_window: float = 5.0,
+    intro_title: str = "Intro"
+) -> dict:
+    """
+    Decode the recording once and build chapter markers.
+
+    Args:
+        video_path: Screen recording
+        captions_path: captions.json for the recording (None: no snapping, generic titles)
+        offset: Seconds before the recording starts in the final video
+        total_duration: Final video length (default: offset + recording length)
+        fps: Analysis frame rate
+        size: Analysis resolution (width, height)
+        lag_seconds: Distance over which frames are compared
+        threshold: Minimum histogram distance (0-1) for a chapter change
+        min_chapter: Minimum chapter length in seconds
+        snap_window: Maximum distance to a caption start when snapping
+        intro_title: Title of the chapter before the recording (when offset > 0)
+
+    Returns:
+        The dictionary written to <name>.chapters.json
+    """
+    np = require_numpy()
+
+    started = time.perf_counter()
+    print(f"🎞️  Decoding frames from: {video_path} ({size[0]}x{size[1]} @ {fps}fps)")
+    blocks = [color_histograms(block)
+              for block in stream_video_frames(video_path, size[0], size[1], fps, pix_fmt="rgb24")]
+    histograms = np.concatenate(blocks) if blocks else np.zeros((0, HISTOGRAM_BINS), dtype=np.float32)
+    recording_seconds = len(histograms) / fps
+
+    changes = pick_changes(histograms, fps, lag_seconds, threshold, min_chapter)
+
+    segments = load_captions(captions_path).get("segments", []) if captions_path else []
+    starts = sorted(float(seg["start"]) for seg in segments)
+
+    # Recording-relative chapter starts; the first chapter opens the recording
+    markers = [{"start": 0.0, "score": None, "detected": 0.0, "snapped": False}]
+    for seconds, score in changes:
+        start, snapped = snap_to_captions(seconds, starts, snap_window)
+        if start - markers[-1]["start"] < min_chapter / 2:
+            continue  # Snapping pulled it onto the previous chapter
+        markers.append({"start": start, "score": round(score, 3), "detected": round(seconds, 2),
+                        "snapped": snapped})
+
+    end_of_video = total_duration if total_duration else offset + recording_seconds
+    chapters = []
+    if offset > 0:
+        chapters.append({"start": 0.0, "end": round(offset, 3), "title": intro_title, "score": None,
+                         "snapped": False})
+    for index, marker in enumerate(markers):
+        local_end = markers[index + 1]["start"] if index + 1 < len(markers) else recording_seconds
+        end = offset + local_end if index + 1 < len(markers) else end_of_video
+        chapters.append({
+            "start": round(offset + marker["start"], 3),
+            "end": round(end, 3),
+            "title": chapter_title(segments, marker["start"], local_end, index + 1),
+            "score": marker["score"],
+            "detected": round(offset + marker["detected"], 2),
+            "snapped": marker["snapped"],
+        })
+
+    elapsed = time.perf_counter() - started
+    return {
+        "source": Path(video_path).name,
+        "captions": Path(captions_path).name if captions_path else None,
+        "offset": round(offset, 3),
+        "duration": round(end_of_video, 3),
+        "analysis_fps": fps,
+        "analysis_size": list(size),
+        "threshold": threshold,
+        "chapters": chapters,
+        "stats": {
+            "frames": len(histograms),
+            "changes": len(changes),
+            "snapped": sum(1 for marker in markers if marker["snapped"]),
+            "seconds": round(elapsed, 2),
+            "realtime_factor": round(recording_seconds / max(elapsed, 1e-6), 1),
+        },
+    }
+
+
+def escape_ffmetadata(value: str) -> str:
+    """Escape the characters FFmpeg metadata files treat specially."""
+    for char in ("\\", "=", ";", "#"):
+        value = value.replace(char, "\\" + char)
+    return value.replace("\n", "\\\n")
+
+
+def write_ffmetadata(chapters, output_path: Path):
+    lines = [";FFMETADATA1"]
+    for chapter in chapters:
+        lines += [
+            "",
+            "[CHAPTER]",
+            "TIMEBASE=1/1000",
+            f"START={round(chapter['start'] * 1000)}",
+            f"END={round(chapter['end'] * 1000)}",
+            f"title={escape_ffmetadata(chapter['title'])}",
+        ]
+    output_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def format_timestamp(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+def parse_size(value: str):
+    width, _, height = value.lower().partition("x")
+    try:
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Detect section changes in a screen recording and write chapter markers",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Chapters for the final video (shifted past the intro and brand scenes)
+  python detect-chapters.py public/assets/screen-recording.mp4 --host-video public/assets/host.mp4
+
+  # Recording-relative chapters, fewer and longer
+  python detect-chapters.py public/assets/screen-recording.mp4 --min-chapter 120 --threshold 0.4
+
+  # Mux the chapters into the rendered video (no re-encoding)
+  ffmpeg -i out/tutorial-video.mp4 -i public/assets/screen-recording.chapters.ffmeta \\
+      -map 0 -map_metadata 1 -map_chapters 1 -c copy out/tutorial-video-chapters.mp4
+        """
+    )
+
+    parser.add_argument(
+        "video",
+        help="Screen recording to analyze"
+    )
+
+    parser.add_argument(
+        "--captions",
+        help="Captions for the recording, or 'none' (default: captions.json next to the video)"
+    )
+
+    parser.add_argument(
+        "--host-video",
+        help="Host video; shifts chapters past the intro and brand scenes and adds an intro chapter"
+    )
+
+    parser.add_argument(
+        "--offset",
+        type=float,
+        help="Seconds before the recording starts in the final video (overrides --host-video)"
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Chapters JSON path (default: <video>.chapters.json; the .ffmeta file goes next to it)"
+    )
+
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.3,
+        help="Histogram distance (0-1) that counts as a section change (default: 0.3)"
+    )
+
+    parser.add_argument(
+        "--min-chapter",
+        type=float,
+        default=60.0,
+        help="Minimum chapter length in seconds (default: 60)"
+    )
+
+    parser.add_argument(
+        "--snap-window",
+        type=float,
+        default=5.0,
+        help="Snap to a caption start within this many seconds (default: 5)"
+    )
+
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=5,
+        help="Analysis frame rate (default: 5)"
+    )
+
+    parser.add_argument(
+        "--size",
+        type=parse_size,
+        default=(160, 90),
+        help="Analysis resolution (default: 160x90)"
+    )
+
+    parser.add_argument(
+        "--intro-title",
+        default="Intro",
+        help="Title of the chapter before the recording (default: Intro)"
+    )
+
+    args = parser.parse_args()
+
+    # Check FFmpeg installation
+    if not check_ffmpeg():
+        print("❌ Error: FFmpeg not found.")
+        print("Install FFmpeg: https://ffmpeg.org/download.html")
+        sys.exit(1)
+
+    video = Path(args.video)
+    for path in (args.video, args.host_video):
+        if path and not Path(path).exists():
+            print(f"❌ Error: File not found: {path}")
+            sys.exit(1)
+
+    if args.captions is None:
+        default = video.with_name("captions.json")
+        captions = str(default) if default.exists() else None
+    elif args.captions.lower() == "none":
+        captions = None
+    else:
+        captions = args.captions
+        if not Path(captions).exists():
+            print(f"❌ Error: File not found: {captions}")
+            sys.exit(1)
+
+    output = Path(args.output) if args.output else video.with_name(f"{video.stem}.chapters.json")
+    ffmeta = output.with_name(f"{output.name.removesuffix('.json')}.ffmeta")
+
+    try:
+        offset = args.offset or 0.0
+        total = None
+        if args.host_video:
+            # Same frame math as Root.tsx's calculateMetadata
+            intro_frames = math.ceil(probe_duration(args.host_video) * RENDER_FPS)
+            tutorial_frames = math.ceil(probe_duration(args.video) * RENDER_FPS)
+            if args.offset is None:
+                offset = (intro_frames + BRAND_SCENE_SECONDS * RENDER_FPS) / RENDER_FPS
+            total = offset + (tutorial_frames + SUBSCRIBE_SCENE_SECONDS * RENDER_FPS) / RENDER_FPS
+
+        result = detect_chapters(
+            args.video,
+            captions,
+            offset=offset,
+            total_duration=total,
+            fps=args.fps,
+            size=args.size,
+            threshold=args.threshold,
+            min_chapter=args.min_chapter,
+            snap_window=args.snap_window,
+            intro_title=args.intro_title
+        )
+
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with output.open('w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        write_ffmetadata(result["chapters"], ffmeta)
+
+        stats = result["stats"]
+        print(f"📑 {len(result['chapters'])} chapters ({stats['changes']} section changes, "
+              f"{stats['snapped']} snapped to captions)")
+        for chapter in result["chapters"]:
+            print(f"   {format_timestamp(chapter['start'])}  {chapter['title']}")
+        print(f"⚡ Analyzed {stats['frames']} frames in {stats['seconds']}s ({stats['realtime_factor']}x real time)")
+        print(f"💾 Chapters saved to: {output}")
+        print(f"💾 FFmpeg metadata saved to: {ffmeta}")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
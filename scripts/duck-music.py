@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Duck background music under narration using caption timing.
+
+Lowering music.mp3 while the narrator speaks with per-frame volume
+callbacks in React costs audio math on every rendered frame. This script
+builds a smoothed ducking gain curve from the speech intervals in
+captions.json and either writes a per-frame gain table or pre-mixes a
+ducked music track, so the render does no per-frame audio work.
+
+Because the captions are known ahead of time, the curve starts fading
+down *before* speech begins (look-ahead attack) and recovers after it
+ends (release).
+
+The result is played under the tutorial scene by TutorialMusic.tsx
+(props tutorialMusicUrl and tutorialMusicGainUrl), whose frame 0 is
+caption time 0. Both outputs are sized to that scene: the screen
+recording's length with --video, otherwise the last caption plus the
+release. The pre-mix loops the music to fill it. The brand-scene
+musicUrl is not affected.
+
+Requirements:
+    pip install numpy
+    FFmpeg must be installed and in PATH
+
+Usage:
+    python duck-music.py <music-file> --captions captions.json [--output music-ducked.mp3] [--gain-table music.gain.json]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+from media_utils import (
+    check_ffmpeg,
+    decode_audio,
+    encode_audio,
+    load_captions,
+    probe_duration,
+    require_numpy,
+    speech_intervals,
+)
+
+
+def ducking_curve(
+    intervals: List[Tuple[float, float]],
+    times,
+    duck_db: float = -12.0,
+    attack: float = 0.2,
+    release: float = 0.5
+):
+    """
+    Compute linear gain values at the given times.
+
+    The duck amount is 1 inside speech and ramps linearly to 0 over
+    `attack` seconds before each interval and `release` seconds after it.
+    Fully vectorized: each time is located with a binary search.
+
+    Args:
+        intervals: Sorted, non-overlapping speech intervals in seconds
+        times: NumPy array of sample times in seconds
+        duck_db: Gain applied during speech in dB (negative)
+        attack: Fade-down length before speech in seconds
+        release: Fade-up length after speech in seconds
+
+    Returns:
+        NumPy array of linear gain values, same shape as times
+    """
+    np = require_numpy()
+
+    if not intervals:
+        return np.ones_like(times, dtype=np.float32)
+
+    starts = np.array([start for start, _ in intervals])
+    ends = np.array([end for _, end in intervals])
+
+    # Index of the last interval starting at or before t
+    idx = np.searchsorted(starts, times, side="right") - 1
+    has_prev = idx >= 0
+    prev = np.clip(idx, 0, len(starts) - 1)
+    nxt = np.clip(idx + 1, 0, len(starts) - 1)
+
+    inside = has_prev & (times <= ends[prev])
+    since_end = np.where(has_prev, times - ends[prev], np.inf)
+    until_start = np.where(idx + 1 < len(starts), starts[nxt] - times, np.inf)
+
+    amount = np.maximum(
+        np.clip(1.0 - since_end / max(release, 1e-6), 0.0, 1.0),
+        np.clip(1.0 - until_start / max(attack, 1e-6), 0.0, 1.0),
+    )
+    amount = np.where(inside, 1.0, amount)
+
+    return (10.0 ** (duck_db * amount / 20.0)).astype(np.float32)
+
+
+def write_gain_table(gain, fps: int, output_path: str):
+    """Write a per-frame gain table for use as <Audio volume={...}>."""
+    table = {
+        "fps": fps,
+        "frames": int(len(gain)),
+        "gain": [round(float(g), 4) for g in gain],
+    }
+
+    output_file = Path(output_path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with output_file.open('w', encoding='utf-8') as f:
+        json.dump(table, f, separators=(",", ":"))
+
+    print(f"💾 Gain table ({table['frames']} frames @ {fps}fps) saved to: {output_path}")
+
+
+def premix_ducked_music(
+    music_path: str,
+    intervals: List[Tuple[float, float]],
+    output_path: str,
+    duck_db: float,
+    attack: float,
+    release: float,
+    duration: float,
+    sample_rate: int = 48000
+):
+    """
+    Render a ducked copy of the music track, `duration` seconds long.
+
+    The music is decoded once, looped or cut to the scene length,
+    multiplied by the per-sample gain curve and streamed back to FFmpeg
+    for encoding.
+    """
+    np = require_numpy()
+
+    print(f"🎵 Decoding music: {music_path}")
+    samples = decode_audio(music_path, sample_rate=sample_rate, channels=2)
+    if len(samples) == 0:
+        raise RuntimeError(f"No audio decoded from: {music_path}")
+    samples = np.resize(samples, (int(round(duration * sample_rate)), 2))
+
+    times = np.arange(len(samples), dtype=np.float64) / sample_rate
+    gain = ducking_curve(intervals, times, duck_db, attack, release)
+    ducked = samples * gain[:, None]
+
+    print(f"🎬 Encoding ducked music...")
+    encode_audio(ducked, output_path, sample_rate, ["-b:a", "192k"])
+    print(f"✅ Ducked music saved to: {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Duck background music under narration using caption timing",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Pre-mix a ducked track as long as the tutorial scene
+  python duck-music.py public/assets/music.mp3 --captions public/assets/captions.json \\
+    --video public/assets/screen-recording.mp4 --output public/assets/music-ducked.mp3
+  # then set tutorialMusicUrl: "assets/music-ducked.mp3"
+
+  # Per-frame gain table for the original music
+  python duck-music.py public/assets/music.mp3 --captions public/assets/captions.json \\
+    --video public/assets/screen-recording.mp4 --gain-table public/assets/music.gain.json
+  # then set tutorialMusicUrl: "assets/music.mp3", tutorialMusicGainUrl: "assets/music.gain.json"
+
+  # Captions from a recording that starts 2s into the tutorial scene
+  python duck-music.py music.mp3 --captions captions.json --offset 2 --duck-db -15
+
+Notes:
+  TutorialMusic.tsx plays the music inside the screen-recording Sequence,
+  so frame 0 of the curve is caption time 0 and --offset stays 0 unless
+  the captions are shifted against that scene. The gain table does not
+  loop the music: for music shorter than the scene, use --output.
+        """
+    )
+
+    parser.add_argument(
+        "music",
+        help="Path to background music file"
+    )
+
+    parser.add_argument(
+        "--captions",
+        "-c",
+        required=True,
+        help="Captions JSON from generate-captions.py"
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Path for pre-mixed ducked music (e.g. music-ducked.mp3)"
+    )
+
+    parser.add_argument(
+        "--gain-table",
+        help="Path for per-frame gain table JSON"
+    )
+
+    parser.add_argument(
+        "--duck-db",
+        type=float,
+        default=-12.0,
+        help="Music gain during speech in dB (default: -12.0)"
+    )
+
+    parser.add_argument(
+        "--attack",
+        type=float,
+        default=0.2,
+        help="Fade-down time before speech in seconds (default: 0.2)"
+    )
+
+    parser.add_argument(
+        "--release",
+        type=float,
+        default=0.5,
+        help="Fade-up time after speech in seconds (default: 0.5)"
+    )
+
+    parser.add_argument(
+        "--merge-gap",
+        type=float,
+        default=0.6,
+        help="Keep music ducked across pauses shorter than this (default: 0.6)"
+    )
+
+    parser.add_argument(
+        "--offset",
+        type=float,
+        default=0.0,
+        help="Scene time in seconds where caption time 0 falls (default: 0.0)"
+    )
+
+    parser.add_argument(
+        "--video",
+        help="Screen recording the music plays under; sets the scene length "
+             "(default: last caption end plus --release)"
+    )
+
+    parser.add_argument(
+        "--fps",
+        type=int,
+        default=30,
+        help="Composition frame rate for the gain table (default: 30)"
+    )
+
+    args = parser.parse_args()
+
+    if not args.output and not args.gain_table:
+        stem = Path(args.music).stem
+        args.output = str(Path(args.music).parent / f"{stem}-ducked.mp3")
+
+    # Check FFmpeg installation
+    if not check_ffmpeg():
+        print("❌ Error: FFmpeg not found.")
+        print("Install FFmpeg: https://ffmpeg.org/download.html")
+        sys.exit(1)
+
+    for path in (args.music, args.captions, args.video):
+        if path and not Path(path).exists():
+            print(f"❌ Error: File not found: {path}")
+            sys.exit(1)
+
+    try:
+        np = require_numpy()
+
+        captions = load_captions(args.captions)
+        intervals = [
+            (start + args.offset, end + args.offset)
+            for start, end in speech_intervals(captions, merge_gap=args.merge_gap)
+        ]
+        speech_total = sum(end - start for start, end in intervals)
+        print(f"📝 {len(intervals)} speech spans ({speech_total:.1f}s) from: {args.captions}")
+
+        # Same frame count as calculateMetadata's tutorialDuration
+        if args.video:
+            frames = int(np.ceil(probe_duration(args.video) * args.fps))
+        else:
+            last_end = intervals[-1][1] if intervals else 0.0
+            frames = int(np.ceil((last_end + args.release) * args.fps))
+        duration = frames / args.fps
+        print(f"🎬 Tutorial scene: {duration:.2f}s ({frames} frames @ {args.fps}fps)")
+
+        if args.gain_table:
+            music_duration = probe_duration(args.music)
+            if music_duration < duration:
+                print(f"⚠️  Music ends at {music_duration:.1f}s, before the scene does; "
+                      f"use --output for a looped pre-mix")
+            times = np.arange(frames) / args.fps
+            gain = ducking_curve(intervals, times, args.duck_db, args.attack, args.release)
+            write_gain_table(gain, args.fps, args.gain_table)
+
+        if args.output:
+            premix_ducked_music(
+                args.music,
+                intervals,
+                args.output,
+                args.duck_db,
+                args.attack,
+                args.release,
+                duration
+            )
+
+        print(f"\n🎉 Ducking applied at {args.duck_db} dB under narration")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Export captions.json as SRT, WebVTT and ASS subtitles.
+
+Also applies subtitles to a rendered video in one FFmpeg pass, either
+burned in (subtitles filter, styled like the React caption layer) or as
+a soft subtitle track. Render with showCaptions=false and let FFmpeg
+draw the captions instead of rendering a DOM element on every frame.
+
+Requirements:
+    FFmpeg must be installed and in PATH (only for --burn / --soft)
+
+Usage:
+    python export-subtitles.py captions.json [--format srt vtt ass] [--host-video host-video.mp4]
+    python export-subtitles.py captions.json --burn out/video.mp4 [--video-output out/video-subtitled.mp4]
+"""
+
+import argparse
+import math
+import sys
+from pathlib import Path
+
+from instrumentation import run_subprocess
+from media_utils import check_ffmpeg, load_captions, probe_duration
+from subtitle_formats import FORMATS, escape_filter_path, write_subtitles
+
+# Fixed scene lengths from assets/templates/Root.tsx
+BRAND_SCENE_SECONDS = 5.0
+
+# ISO 639-2 codes for the subtitle track language tag
+TRACK_LANGUAGES = {"zh": "chi", "en": "eng", "ja": "jpn", "ko": "kor", "es": "spa", "fr": "fre", "de": "ger"}
+
+
+def tutorial_offset(host_video: str, fps: int = 30) -> float:
+    """
+    Start of the screen-recording scene in the final video.
+
+    Mirrors calculateMetadata in Root.tsx: the intro lasts
+    ceil(host duration * fps) frames and the brand scene 5 seconds.
+    """
+    intro_frames = math.ceil(probe_duration(host_video) * fps)
+    return round(intro_frames / fps + BRAND_SCENE_SECONDS, 3)
+
+
+def burn_subtitles(video_path: str, ass_path: str, output_path: str, crf: int = 18):
+    """Re-encode the video with the ASS subtitles drawn onto the frames."""
+    print(f"🔥 Burning subtitles into: {video_path}")
+    cmd = [
+        "ffmpeg",
+        "-i", video_path,
+        "-vf", f"subtitles={escape_filter_path(ass_path)}",
+        "-c:v", "libx264",
+        "-preset", "fast",
+        "-crf", str(crf),
+        "-pix_fmt", "yuv420p",
+        "-c:a", "copy",  # Audio untouched
+        "-movflags", "+faststart",
+        "-y",  # Overwrite
+        output_path
+    ]
+    result = run_subprocess(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg burn-in failed: {result.stderr}")
+    print(f"✅ Subtitled video saved to: {output_path}")
+
+
+def add_subtitle_track(video_path: str, subtitle_path: str, output_path: str, language: str = "und"):
+    """Mux subtitles as a soft track without re-encoding audio or video."""
+    print(f"📎 Adding subtitle track to: {video_path}")
+    # MP4/MOV only carry mov_text; Matroska keeps the subtitle format as-is
+    codec = "copy" if Path(output_path).suffix.lower() == ".mkv" else "mov_text"
+    cmd = [
+        "ffmpeg",
+        "-i", video_path,
+        "-i", subtitle_path,
+        "-map", "0",
+        "-map", "1:0",
+        "-c", "copy",
+        "-c:s", codec,
+        "-metadata:s:s:0", f"language={language}",
+        "-y",  # Overwrite
+        output_path
+    ]
+    result = run_subprocess(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg subtitle mux failed: {result.stderr}")
+    print(f"✅ Video with subtitle track saved to: {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export captions as SRT/WebVTT/ASS and optionally apply them with FFmpeg",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # SRT, VTT and ASS next to captions.json (timed to the screen recording)
+  python export-subtitles.py public/assets/captions.json
+
+  # Timed to the final video: shift by intro (host video) + 5s brand scene
+  python export-subtitles.py public/assets/captions.json --host-video public/assets/host-video.mp4
+
+  # Render without the React caption layer, then burn subtitles in with FFmpeg
+  npx remotion render TutorialVideo out/video.mp4 --props='{"showCaptions":false}'
+  python export-subtitles.py public/assets/captions.json \\
+    --host-video public/assets/host-video.mp4 --burn out/video.mp4
+
+  # Soft subtitle track (player can toggle it, no re-encode)
+  python export-subtitles.py public/assets/captions.json \\
+    --host-video public/assets/host-video.mp4 --soft out/video.mp4
+        """
+    )
+
+    parser.add_argument(
+        "captions",
+        help="Captions JSON from generate-captions.py"
+    )
+
+    parser.add_argument(
+        "--format",
+        "-f",
+        nargs="+",
+        choices=sorted(FORMATS),
+        default=["srt", "vtt", "ass"],
+        help="Subtitle formats to write (default: srt vtt ass)"
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        "-o",
+        help="Directory for subtitle files (default: next to the captions file)"
+    )
+
+    offset = parser.add_mutually_exclusive_group()
+    offset.add_argument(
+        "--offset",
+        type=float,
+        default=0.0,
+        help="Seconds added to every timestamp (default: 0.0)"
+    )
+    offset.add_argument(
+        "--host-video",
+        help="Compute the offset as in Root.tsx: intro (host video length) + 5s brand scene"
+    )
+
+    parser.add_argument(
+        "--fps",
+        type=int,
+        default=30,
+        help="Composition frame rate, used with --host-video (default: 30)"
+    )
+
+    apply = parser.add_mutually_exclusive_group()
+    apply.add_argument(
+        "--burn",
+        metavar="VIDEO",
+        help="Burn the ASS subtitles into this rendered video"
+    )
+    apply.add_argument(
+        "--soft",
+        metavar="VIDEO",
+        help="Add the subtitles to this rendered video as a soft track"
+    )
+
+    parser.add_argument(
+        "--video-output",
+        help="Output path for --burn/--soft (default: <video>-subtitled.<ext>)"
+    )
+
+    parser.add_argument(
+        "--crf",
+        type=int,
+        default=18,
+        help="x264 quality for --burn, lower is better (default: 18)"
+    )
+
+    args = parser.parse_args()
+
+    if not Path(args.captions).exists():
+        print(f"❌ Error: Captions file not found: {args.captions}")
+        sys.exit(1)
+
+    video = args.burn or args.soft
+    if video or args.host_video:
+        if not check_ffmpeg():
+            print("❌ Error: FFmpeg not found.")
+            print("Install FFmpeg: https://ffmpeg.org/download.html")
+            sys.exit(1)
+        for path in filter(None, (video, args.host_video)):
+            if not Path(path).exists():
+                print(f"❌ Error: File not found: {path}")
+                sys.exit(1)
+
+    try:
+        captions = load_captions(args.captions)
+        shift = tutorial_offset(args.host_video, args.fps) if args.host_video else args.offset
+        if shift:
+            print(f"⏱️  Shifting subtitles by {shift:.3f}s")
+
+        # --burn needs ASS for styling, --soft needs a text format FFmpeg can mux
+        formats = list(args.format)
+        if args.burn and "ass" not in formats:
+            formats.append("ass")
+        if args.soft and "srt" not in formats:
+            formats.append("srt")
+
+        out_dir = Path(args.output_dir) if args.output_dir else Path(args.captions).parent
+        stem = Path(args.captions).stem
+        written = {}
+        for fmt in formats:
+            path = out_dir / f"{stem}.{fmt}"
+            cues = write_subtitles(captions, str(path), fmt, offset=shift)
+            written[fmt] = str(path)
+            print(f"💾 {fmt.upper():3} ({cues} cues) saved to: {path}")
+
+        if video:
+            video_path = Path(video)
+            video_output = args.video_output or str(
+                video_path.with_name(f"{video_path.stem}-subtitled{video_path.suffix}")
+            )
+            if args.burn:
+                burn_subtitles(video, written["ass"], video_output, crf=args.crf)
+            else:
+                language = TRACK_LANGUAGES.get((captions.get("language") or "")[:2], "und")
+                # Matroska keeps ASS styling; MP4 converts the SRT to mov_text
+                keeps_styling = Path(video_output).suffix.lower() == ".mkv" and "ass" in written
+                add_subtitle_track(video, written["ass" if keeps_styling else "srt"], video_output, language)
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
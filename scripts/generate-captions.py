@@ -5,6 +5,9 @@ Generate captions from video audio using faster-whisper.
 This script extracts audio from a video file and generates
 accurate timestamps for subtitle segments.
 
+If a caption worker (caption-worker.py) is running, the job is sent to it
+so the warm model is reused; otherwise transcription runs in-process.
+
 Requirements:
     pip install faster-whisper
 
@@ -13,123 +16,142 @@ Usage:
 """
 
 import argparse
-import json
+import os
+import platform
+import subprocess
 import sys
+import time
 from pathlib import Path
 
-try:
-    from faster_whisper import WhisperModel
-except ImportError:
-    print("Error: faster-whisper not installed.")
-    print("Install with: pip install faster-whisper")
-    sys.exit(1)
-
-try:
-    import opencc
-    OPENCC_AVAILABLE = True
-except ImportError:
-    OPENCC_AVAILABLE = False
-    print("Warning: opencc not installed. Traditional Chinese will not be converted to Simplified.")
-    print("Install with: pip install opencc-python-reimplemented")
-
-
-def convert_traditional_to_simplified(text: str) -> str:
-    """Convert Traditional Chinese to Simplified Chinese using OpenCC."""
-    if not OPENCC_AVAILABLE:
-        return text
-    try:
-        converter = opencc.OpenCC('t2s')  # Traditional to Simplified
-        return converter.convert(text)
-    except Exception as e:
-        print(f"Warning: OpenCC conversion failed: {e}")
-        return text
-
-
-def generate_captions(
-    video_path: str,
-    output_path: str = "captions.json",
-    model_size: str = "base",
-    language: str = "auto",
-    compute_type: str = "int8",
-    convert_to_simplified: bool = True
-) -> dict:
+from caption_daemon import DEFAULT_DAEMON_URL, WorkerBusy, WorkerRefused, daemon_available, submit_job
+from instrumentation import add_profile_arguments, profiled_run, span
+from media_utils import check_ffmpeg, load_captions, save_captions
+from transcription import (
+    COMPUTE_TYPES,
+    FASTER_WHISPER_AVAILABLE,
+    OPENCC_AVAILABLE,
+    LanguageCache,
+    decode_whisper_audio,
+    generate_captions,
+    generate_captions_windowed,
+    load_model,
+    refine_captions,
+)
+
+
+def print_worker_event(event: dict):
+    """Print caption worker progress in the same style as in-process runs."""
+    if event["type"] == "segment":
+        print(f"  [{event['id']}] {event['start']:.2f}s - {event['end']:.2f}s: {event['text']}")
+    elif event["type"] == "status" and event["status"] == "queued":
+        print(f"⏳ Queued (position {event.get('position', '?')})")
+    elif event["type"] == "status" and event["status"] == "running":
+        print(f"🎵 Transcribing...")
+
+
+def refine_existing(args: argparse.Namespace, started: float):
     """
-    Generate captions from video file.
+    Refine the low-confidence segments of the captions file at args.output.
 
     Args:
-        video_path: Path to video file
-        output_path: Path to output JSON file
-        model_size: Whisper model size (tiny, base, small, medium, large)
-        language: Language code (en, es, zh, fr, etc.) or 'auto' for auto-detect
-        compute_type: Computation type (float16, int8, int8_float16)
-        convert_to_simplified: Convert Traditional Chinese to Simplified (default: True)
-
-    Returns:
-        Dictionary with caption segments
+        args: Parsed command-line arguments
+        started: time.time() when the whole job started (for time-to-final)
     """
-    print(f"🎬 Loading model: {model_size}")
-
-    # Initialize Whisper model
-    model = WhisperModel(
-        model_size,
-        device="cpu",
-        compute_type=compute_type
-    )
-
-    print(f"🎵 Processing audio from: {video_path}")
-
-    # Transcribe audio
-    segments, info = model.transcribe(
-        video_path,
-        language=None if language == "auto" else language,
-        beam_size=5,
-        vad_filter=True,
-        word_timestamps=True
-    )
-
-    # Convert to Remotion caption format
-    captions = []
-    segment_count = 0
-
-    for segment in segments:
-        segment_count += 1
-        text = segment.text.strip()
-
-        # Convert Traditional Chinese to Simplified Chinese if enabled
-        if convert_to_simplified and language and language.startswith('zh'):
-            text = convert_traditional_to_simplified(text)
-
-        caption = {
-            "id": segment_count,
-            "start": round(segment.start, 3),
-            "end": round(segment.end, 3),
-            "text": text,
-            "confidence": min(1.0, segment.no_speech_prob if hasattr(segment, 'no_speech_prob') else 1.0)
-        }
-        captions.append(caption)
-        print(f"  [{segment_count}] {caption['start']:.2f}s - {caption['end']:.2f}s: {caption['text']}")
-
-    # Detect language if auto
-    detected_lang = info.language if language == "auto" else language
-    print(f"\n📝 Detected language: {detected_lang} (probability: {info.language_probability:.2f})")
-    print(f"✅ Generated {len(captions)} caption segments")
-
-    # Prepare output data
-    output_data = {
-        "language": detected_lang,
-        "segments": captions
-    }
-
-    # Write to JSON file
-    output_file = Path(output_path)
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-
-    with output_file.open('w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    if not Path(args.output).exists():
+        raise FileNotFoundError(f"Captions file not found: {args.output}")
+
+    captions = load_captions(args.output)
+    if any("avg_logprob" not in seg for seg in captions.get("segments", [])):
+        print("⚠️  Captions predate real confidence scores; those segments will all be re-checked")
+
+    audio = decode_whisper_audio(args.video)
+
+    print(f"🎬 Loading refinement model: {args.model}")
+    model = load_model(args.model, args.compute_type)
+
+    print(f"🔁 Re-transcribing segments with confidence < {args.refine_threshold} "
+          f"(beam size {args.recheck_beam_size})...")
+    with span("refine"):
+        refined, stats = refine_captions(
+            captions,
+            audio,
+            model,
+            threshold=args.refine_threshold,
+            beam_size=args.recheck_beam_size,
+            convert_to_simplified=not args.no_convert
+        )
 
-    print(f"💾 Saved captions to: {output_path}")
+    # Atomic replace: the preview never reads a half-written file
+    save_captions(refined, args.output)
+
+    share = stats["refined_seconds"] / stats["audio_seconds"] * 100 if stats["audio_seconds"] else 0
+    print(f"✅ Refined {stats['replaced_segments']} segments in {stats['windows']} windows "
+          f"({stats['refined_seconds']:.1f}s of {stats['audio_seconds']:.1f}s audio, {share:.0f}%)")
+    if stats["rejected_windows"]:
+        print(f"   Kept the original captions in {stats['rejected_windows']} windows (recheck scored no better)")
+    print(f"💾 Merged refined captions into: {args.output}")
+    print(f"🏁 Time to final captions: {time.time() - started:.1f}s")
+
+
+def spawn_background_refinement(args: argparse.Namespace, started: float):
+    """Start the refinement pass as a detached process and return immediately."""
+    cmd = [
+        sys.executable, str(Path(__file__).resolve()), args.video,
+        "--output", args.output,
+        "--model", args.model,
+        "--refine-threshold", str(args.refine_threshold),
+        "--recheck-beam-size", str(args.recheck_beam_size),
+        "--recheck",
+        "--started-at", str(started),
+        "--no-daemon",
+    ]
+    if args.compute_type:
+        cmd += ["--compute-type", args.compute_type]
+    if args.no_convert:
+        cmd.append("--no-convert")
+
+    log_path = f"{args.output}.refine.log"
+    popen_kwargs = {}
+    if platform.system() == "Windows":
+        popen_kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        popen_kwargs["start_new_session"] = True
+
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, **popen_kwargs)
+
+    print(f"🔁 Refinement with '{args.model}' running in background (pid {proc.pid})")
+    print(f"   Log: {log_path}")
+
+
+def language_cache(args: argparse.Namespace):
+    """Language cache for --language auto (None when disabled)."""
+    if args.language != "auto" or args.language_cache == "none":
+        return None
+    path = args.language_cache or str(LanguageCache.default_path(args.output))
+    return LanguageCache(path)
+
+
+def run_two_tier(args: argparse.Namespace):
+    """Write fast draft captions, then refine low-confidence segments."""
+    started = time.time()
+
+    with span("draft"):
+        generate_captions(
+            video_path=args.video,
+            output_path=args.output,
+            model_size=args.draft_model,
+            language=args.language,
+            compute_type=args.compute_type,
+            convert_to_simplified=not args.no_convert,
+            language_cache=language_cache(args)
+        )
+    print(f"⚡ Time to first captions: {time.time() - started:.1f}s (draft model: {args.draft_model})")
 
-    return output_data
+    if args.background:
+        spawn_background_refinement(args, started)
+    else:
+        refine_existing(args, started)
 
 
 def main():
@@ -150,9 +172,31 @@ Examples:
   # Specify language (faster and more accurate)
   python generate-captions.py video.mp4 --language zh
 
-  # Auto-detect language
+  # Auto-detect language (default). Detection runs on a 30s probe once per
+  # file; files in the same output directory reuse the cached result
   python generate-captions.py video.mp4 --language auto
 
+  # Draft with tiny right away, then refine low-confidence segments with medium
+  python generate-captions.py video.mp4 --draft-model tiny --model medium
+
+  # Same, but return after the draft and refine in a background process
+  python generate-captions.py video.mp4 --draft-model tiny --model medium --background
+
+  # Fix up an existing file: re-run only low-confidence segments with a bigger model
+  python generate-captions.py video.mp4 --output captions.json --recheck --model medium
+
+  # Multi-hour recording on a small machine: 5 minute windows, stay under 1.5 GB
+  python generate-captions.py workshop.mp4 --window 300 --max-memory 1500
+
+  # Always transcribe in-process, even if a caption worker is running
+  python generate-captions.py video.mp4 --no-daemon
+
+  # Tune threads/compute type for this machine once; later runs pick it up
+  python tune-whisper.py --model base
+
+  # Write a Chrome trace of where the time went
+  python generate-captions.py video.mp4 --profile trace.json
+
 Model sizes (accuracy vs speed):
   tiny    - Fastest, lowest accuracy
   base    - Fast, good accuracy (recommended)
@@ -189,15 +233,30 @@ Language codes:
     parser.add_argument(
         "--language",
         "-l",
-        default="zh",
-        help="Language code (en, es, zh, zh-CN, etc.) or 'auto' to detect (default: zh-CN for Simplified Chinese)"
+        default="auto",
+        help="Language code (en, es, zh, etc.) or 'auto' to detect (default: auto)"
+    )
+
+    parser.add_argument(
+        "--language-cache",
+        metavar="PATH",
+        help="Detected-language cache for --language auto "
+             "(default: one per output directory under ~/.cache/remotion-tutorial-video/languages; "
+             "'none' to disable)"
     )
 
     parser.add_argument(
         "--compute-type",
-        choices=["float16", "int8", "int8_float16"],
-        default="int8",
-        help="Computation type for faster processing (default: int8)"
+        choices=COMPUTE_TYPES,
+        help="Computation type (default: from the tuning profile, else int8)"
+    )
+
+    parser.add_argument(
+        "--tuning-profile",
+        metavar="PATH",
+        help="CPU tuning profile from tune-whisper.py "
+             "(default: $WHISPER_TUNING_PROFILE or ~/.cache/remotion-tutorial-video/whisper-tuning.json; "
+             "'none' to ignore)"
     )
 
     parser.add_argument(
@@ -206,6 +265,78 @@ Language codes:
         help="Disable Traditional Chinese to Simplified Chinese conversion"
     )
 
+    parser.add_argument(
+        "--draft-model",
+        choices=["tiny", "base", "small", "medium", "large"],
+        help="Two-tier mode: write a fast draft with this model first, then refine "
+             "low-confidence segments with --model"
+    )
+
+    parser.add_argument(
+        "--refine-threshold",
+        type=float,
+        default=0.6,
+        help="Two-tier/recheck mode: re-transcribe segments with confidence below this (default: 0.6)"
+    )
+
+    parser.add_argument(
+        "--background",
+        action="store_true",
+        help="Two-tier mode: exit after the draft and refine in a background process"
+    )
+
+    parser.add_argument(
+        "--recheck",
+        action="store_true",
+        help="Re-transcribe only the low-confidence segments of an existing captions "
+             "file (--output) with --model and splice the results back in"
+    )
+
+    parser.add_argument(
+        "--recheck-beam-size",
+        type=int,
+        default=8,
+        help="Beam size for re-transcribed segments (default: 8)"
+    )
+
+    parser.add_argument(
+        "--window",
+        type=float,
+        help="Bounded-memory mode: stream audio and transcribe it in windows of "
+             "this many seconds, writing captions as they are produced"
+    )
+
+    parser.add_argument(
+        "--overlap",
+        type=float,
+        default=15.0,
+        help="Bounded-memory mode: seconds shared by consecutive windows (default: 15)"
+    )
+
+    parser.add_argument(
+        "--max-memory",
+        type=float,
+        metavar="MB",
+        help="Bounded-memory mode: keep resident memory under this many MB "
+             "(sizes and shrinks windows; implies --window 300 if not given)"
+    )
+
+    parser.add_argument("--started-at", type=float, help=argparse.SUPPRESS)
+
+    parser.add_argument(
+        "--daemon-url",
+        default=DEFAULT_DAEMON_URL,
+        help=f"Caption worker URL (default: $CAPTION_DAEMON_URL or {DEFAULT_DAEMON_URL})"
+    )
+
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Do not use a running caption worker; transcribe in-process"
+    )
+
+    add_profile_arguments(parser)
+
     args = parser.parse_args()
 
     # Validate video file exists
@@ -213,19 +344,95 @@ Language codes:
         print(f"❌ Error: Video file not found: {args.video}")
         sys.exit(1)
 
-    try:
-        generate_captions(
-            video_path=args.video,
-            output_path=args.output,
-            model_size=args.model,
-            language=args.language,
-            compute_type=args.compute_type,
-            convert_to_simplified=not args.no_convert
-        )
-    except Exception as e:
-        print(f"\n❌ Error generating captions: {e}")
+    if args.tuning_profile:
+        # Via the environment so a background refinement process uses it too
+        os.environ["WHISPER_TUNING_PROFILE"] = args.tuning_profile
+
+    if args.max_memory and not args.window:
+        args.window = 300.0
+    if args.window and (args.draft_model or args.recheck):
+        print("❌ Error: --window/--max-memory cannot be combined with --draft-model or --recheck")
+        sys.exit(1)
+    if args.window and not check_ffmpeg():
+        print("❌ Error: FFmpeg not found (needed to stream audio with --window).")
+        print("Install FFmpeg: https://ffmpeg.org/download.html")
         sys.exit(1)
 
+    # Thin-client path: hand the job to a warm caption worker if one is running
+    in_process_only = args.draft_model or args.recheck or args.window
+    if not in_process_only and not args.no_daemon and daemon_available(args.daemon_url):
+        print(f"🔌 Using caption worker at {args.daemon_url}")
+        with profiled_run(args):
+            try:
+                done = submit_job(
+                    {
+                        "video_path": args.video,
+                        "output_path": args.output,
+                        "model_size": args.model,
+                        "language": args.language,
+                        "compute_type": args.compute_type,
+                        "convert_to_simplified": not args.no_convert,
+                    },
+                    url=args.daemon_url,
+                    on_event=print_worker_event
+                )
+            except (WorkerBusy, WorkerRefused) as e:
+                # Same as no worker running: do the work here instead of failing
+                print(f"⚠️  {e}; transcribing in-process")
+                done = None
+            except Exception as e:
+                print(f"\n❌ Error generating captions: {e}")
+                sys.exit(1)
+        if done is not None:
+            print(f"\n📝 Language: {done['language']}")
+            print(f"✅ Generated {done['segments']} caption segments in {done['run_s']:.1f}s")
+            print(f"💾 Saved captions to: {done['output_path']}")
+            return
+
+    if not FASTER_WHISPER_AVAILABLE:
+        print("Error: faster-whisper not installed.")
+        print("Install with: pip install faster-whisper")
+        sys.exit(1)
+
+    if not OPENCC_AVAILABLE and not args.no_convert:
+        print("Warning: opencc not installed. Traditional Chinese will not be converted to Simplified.")
+        print("Install with: pip install opencc-python-reimplemented")
+
+    with profiled_run(args):
+        try:
+            if args.recheck:
+                refine_existing(args, args.started_at or time.time())
+                return
+            if args.draft_model:
+                run_two_tier(args)
+                return
+            if args.window:
+                generate_captions_windowed(
+                    video_path=args.video,
+                    output_path=args.output,
+                    model_size=args.model,
+                    language=args.language,
+                    compute_type=args.compute_type,
+                    convert_to_simplified=not args.no_convert,
+                    window=args.window,
+                    overlap=args.overlap,
+                    max_memory_mb=args.max_memory,
+                    language_cache=language_cache(args)
+                )
+                return
+            generate_captions(
+                video_path=args.video,
+                output_path=args.output,
+                model_size=args.model,
+                language=args.language,
+                compute_type=args.compute_type,
+                convert_to_simplified=not args.no_convert,
+                language_cache=language_cache(args)
+            )
+        except Exception as e:
+            print(f"\n❌ Error generating captions: {e}")
+            sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
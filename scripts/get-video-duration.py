@@ -3,15 +3,16 @@
 
 import argparse
 import json
-import subprocess
 from pathlib import Path
 from typing import Optional
 
+from instrumentation import add_profile_arguments, profiled_run, run_subprocess, span
+
 
 def get_duration(video: str, fps: int = 30) -> dict:
     """Get video duration using ffprobe"""
     cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", video]
-    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    result = run_subprocess(cmd, capture_output=True, text=True, check=True)
     seconds = float(json.loads(result.stdout)["format"]["duration"])
     return {"seconds": round(seconds, 2), "frames": int(seconds * fps), "fps": fps}
 
@@ -63,18 +64,21 @@ def main():
     parser.add_argument("videos", nargs="+", help="Video file(s) - host-video.mp4 and/or screen-recording.mp4")
     parser.add_argument("--fps", type=int, default=30, help="Frame rate (default: 30)")
     parser.add_argument("--remotion-config", "-r", action="store_true", help="Print Remotion config")
+    add_profile_arguments(parser)
     args = parser.parse_args()
 
     host = None
     tutorial = None
 
-    for v in args.videos:
-        info = get_duration(v, args.fps)
-        name = Path(v).name.lower()
-        if "host" in name:
-            host = info
-        else:
-            tutorial = info
+    with profiled_run(args):
+        for v in args.videos:
+            with span("probe", file=Path(v).name):
+                info = get_duration(v, args.fps)
+            name = Path(v).name.lower()
+            if "host" in name:
+                host = info
+            else:
+                tutorial = info
 
     if args.remotion_config:
         print_config(host, tutorial, args.fps)
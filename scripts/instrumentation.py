@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Lightweight timing instrumentation shared by the tutorial video scripts.
+
+Provides nested timed spans, counters (audio seconds, bytes read/written,
+subprocess wall time) and a `--profile` flag that writes a Chrome trace
+(open in chrome://tracing or https://ui.perfetto.dev) and optionally wraps
+the run in cProfile.
+
+Usage in a script:
+    from instrumentation import add_profile_arguments, profiled_run, span, count
+
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    with profiled_run(args):
+        with span("decode", file=path):
+            ...
+        count("audio_seconds", 12.5)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class Tracer:
+    """Collects spans and counters for one process."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.events: List[dict] = []
+        # Long-running services turn this off so span events do not pile up
+        self.keep_events = True
+        self.counters: Dict[str, float] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self.origin) * 1_000_000
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str, **args):
+        """Time a block; spans opened inside it are nested under it."""
+        stack = self._stack()
+        stack.append(name)
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            duration = self._now_us() - start
+            stack.pop()
+            event = {
+                "name": name,
+                "ph": "X",
+                "ts": round(start, 1),
+                "dur": round(duration, 1),
+                "pid": os.getpid(),
+                "tid": threading.get_ident() % 100000,
+                "args": {**args, "depth": len(stack)},
+            }
+            if self.keep_events:
+                with self._lock:
+                    self.events.append(event)
+
+    def count(self, name: str, value: float = 1):
+        """Add value to a named counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def run(self, cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+        """subprocess.run() that records a span and subprocess wall time."""
+        start = time.perf_counter()
+        try:
+            with self.span(f"subprocess:{Path(cmd[0]).name}", argv=" ".join(map(str, cmd))[:200]):
+                return subprocess.run(cmd, **kwargs)
+        finally:
+            self.count("subprocess_calls")
+            self.count("subprocess_s", time.perf_counter() - start)
+
+    def totals(self) -> Dict[str, float]:
+        """Total seconds per span name."""
+        totals: Dict[str, float] = {}
+        for event in self.events:
+            totals[event["name"]] = totals.get(event["name"], 0) + event["dur"] / 1_000_000
+        return totals
+
+    def write_chrome_trace(self, path: str):
+        """Write spans and counters in Chrome trace event format."""
+        end = self._now_us()
+        counter_events = [
+            {
+                "name": name,
+                "ph": "C",
+                "ts": round(end, 1),
+                "pid": os.getpid(),
+                "args": {name: value},
+            }
+            for name, value in self.counters.items()
+        ]
+        trace = {
+            "traceEvents": sorted(self.events, key=lambda e: e["ts"]) + counter_events,
+            "displayTimeUnit": "ms",
+            "otherData": {"counters": self.counters, "totals_s": self.totals()},
+        }
+
+        output_file = Path(path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with output_file.open('w', encoding='utf-8') as f:
+            json.dump(trace, f, ensure_ascii=False)
+
+    def print_summary(self):
+        """Print per-span totals and counters."""
+        print("\n⏱️  Timing summary:")
+        for name, seconds in sorted(self.totals().items(), key=lambda kv: -kv[1]):
+            print(f"   {name:<32} {seconds:9.3f}s")
+        for name, value in sorted(self.counters.items()):
+            print(f"   {name:<32} {value:12g}")
+
+
+# Process-wide tracer used by the module-level helpers
+TRACER = Tracer()
+
+
+def span(name: str, **args):
+    """Time a block with the process-wide tracer."""
+    return TRACER.span(name, **args)
+
+
+def count(name: str, value: float = 1):
+    """Add to a counter on the process-wide tracer."""
+    TRACER.count(name, value)
+
+
+def run_subprocess(cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+    """Drop-in for subprocess.run() that records subprocess wall time."""
+    return TRACER.run(cmd, **kwargs)
+
+
+def count_file_bytes(name: str, path: str):
+    """Add the size of a file to a bytes counter, ignoring missing files."""
+    try:
+        count(name, os.path.getsize(path))
+    except OSError:
+        pass
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB (Linux only, else None)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None on Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def add_profile_arguments(parser):
+    """Add --profile and --cprofile options to an argparse parser."""
+    parser.add_argument(
+        "--profile",
+        metavar="TRACE_JSON",
+        help="Write a Chrome trace of timed spans and counters to this file"
+    )
+
+    parser.add_argument(
+        "--cprofile",
+        metavar="PSTATS_FILE",
+        help="Also run under cProfile and dump stats to this file"
+    )
+
+
+@contextmanager
+def profiled_run(args, name: Optional[str] = None):
+    """
+    Wrap a script's main work in a root span and honour --profile/--cprofile.
+
+    The trace is written even if the script exits early via sys.exit().
+    """
+    trace_path = getattr(args, "profile", None)
+    pstats_path = getattr(args, "cprofile", None)
+
+    profiler = None
+    if pstats_path:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        with span(name or Path(sys.argv[0]).stem):
+            yield TRACER
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(pstats_path)
+            print(f"📈 cProfile stats saved to: {pstats_path}")
+        if trace_path:
+            TRACER.write_chrome_trace(trace_path)
+            TRACER.print_summary()
+            print(f"📈 Trace saved to: {trace_path}")
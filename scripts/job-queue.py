@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Submit, run and monitor jobs in a shared SQLite job queue.
+
+The queue file can sit on storage every render node mounts. Workers on
+each node claim jobs under a lease and keep it alive with heartbeats;
+a crashed worker's jobs are picked up again once the lease expires.
+Failed jobs are retried with backoff. Several workers on one machine
+use the same file and code path, so a local run behaves exactly like
+a cluster.
+
+Job kinds:
+    caption       generate-captions.py <argv>
+    normalize     normalize-audio.py <argv>
+    transcode     prepare-video.py <argv>
+    render-chunk  one frame range of a Remotion render (see submit-render)
+    render-audio  the composition's audio track
+    concat        join the chunks and the audio once all of them are done
+
+Requirements:
+    Whatever the submitted jobs need (FFmpeg, faster-whisper, Node.js)
+
+Usage:
+    python job-queue.py submit caption -- public/assets/host.mp4 --model small
+    python job-queue.py submit-render --bundle out/episodes/.bundle --props props.json --output out/ep01.mp4
+    python job-queue.py worker --workers 4
+    python job-queue.py status
+"""
+
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+from pathlib import Path
+
+from job_queue import DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, JOB_KINDS, JobQueue, QueueWorker
+
+DEFAULT_QUEUE = "out/jobs.sqlite"
+
+SCRIPT_KINDS = ["caption", "normalize", "transcode"]
+
+SCENE_PROPS = ["introDuration", "brandDuration", "tutorialDuration", "subscribeDuration"]
+
+
+def composition_frames(props: dict) -> int:
+    """Total frames from the scene durations in the props (as written by batch-render.py)."""
+    missing = [name for name in SCENE_PROPS if not props.get(name)]
+    if missing:
+        raise ValueError(f"Props lack {', '.join(missing)}; pass --frames")
+    return sum(int(props[name]) for name in SCENE_PROPS)
+
+
+def resolve_script_paths(argv):
+    """
+    Make path arguments absolute so every worker finds them, whatever its --workdir.
+
+    An argument (or the value of --opt=value) counts as a path if it exists,
+    or if it contains a directory separator and its parent directory exists
+    (an output file that is not written yet).
+    """
+    def resolve(value: str) -> str:
+        path = Path(value)
+        if path.exists() or (len(path.parts) > 1 and path.parent.is_dir()):
+            return str(path.resolve())
+        return value
+
+    resolved = []
+    for arg in argv:
+        if arg.startswith("-"):
+            option, sep, value = arg.partition("=")
+            resolved.append(f"{option}={resolve(value)}" if sep and value else arg)
+        else:
+            resolved.append(resolve(arg))
+    return resolved
+
+
+def submit_render(queue: JobQueue, bundle: Path, props_path: Path, output: Path, frames: int,
+                  chunk_frames: int, priority: int, max_attempts: int, concurrency: int = None):
+    """
+    Split one render into chunk jobs plus an audio job and a dependent concat job.
+
+    Returns:
+        List of submitted job ids, the concat job last
+    """
+    chunks_dir = output.with_name(f"{output.stem}.chunks")
+    chunks_dir.mkdir(parents=True, exist_ok=True)
+    common = {"bundle": str(bundle.resolve()), "props": str(props_path.resolve())}
+
+    job_ids = []
+    inputs = []
+    for index in range(math.ceil(frames / chunk_frames)):
+        start = index * chunk_frames
+        end = min(frames, start + chunk_frames) - 1
+        chunk = chunks_dir / f"chunk-{index:04d}.mp4"
+        inputs.append(str(chunk.resolve()))
+        job_ids.append(queue.submit("render-chunk", {
+            **common,
+            "frames": [start, end],
+            "output": str(chunk.resolve()),
+            "concurrency": concurrency,
+        }, priority, max_attempts))
+
+    audio = chunks_dir / "audio.aac"
+    job_ids.append(queue.submit("render-audio", {**common, "output": str(audio.resolve())}, priority, max_attempts))
+
+    # The concat job goes ahead of new chunk work so finished renders do not wait behind other episodes
+    job_ids.append(queue.submit("concat", {
+        "inputs": inputs,
+        "audio": str(audio.resolve()),
+        "output": str(output.resolve()),
+    }, priority + 1, max_attempts, depends_on=job_ids))
+    return job_ids
+
+
+def run_workers(queue_path: Path, kinds, workers: int, workdir: Path, lease_seconds: float, drain: bool):
+    """Run workers as threads in this process; each claims jobs through its own connection."""
+    runners = [
+        QueueWorker(queue_path, kinds, index, workdir, lease_seconds=lease_seconds, drain=drain)
+        for index in range(workers)
+    ]
+    threads = [threading.Thread(target=runner.run, name=runner.worker_id) for runner in runners]
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        print("\n⏹️  Stopping after the current jobs...")
+        for runner in runners:
+            runner.stop_event.set()
+        for thread in threads:
+            thread.join()
+
+
+def print_status(status: dict, show_failed: bool):
+    print(f"📋 Queue depth")
+    if not status["depth"]:
+        print("   (empty)")
+    for kind, counts in sorted(status["depth"].items()):
+        summary = ", ".join(f"{counts[s]} {s}" for s in ("queued", "running", "done", "failed") if counts.get(s))
+        print(f"   {kind:<13} {summary}")
+
+    minutes = status["window_seconds"] / 60
+    print(f"\n⚡ Throughput (last {minutes:.0f} min)")
+    if not status["throughput"]:
+        print("   (nothing finished)")
+    for kind, stats in sorted(status["throughput"].items()):
+        print(f"   {kind:<13} {stats['done']} done, {stats['per_hour']}/h, avg {stats['avg_seconds']}s per job")
+
+    print(f"\n👷 Workers")
+    if not status["workers"]:
+        print("   (none registered)")
+    for worker in status["workers"]:
+        if worker["alive"]:
+            state = f"job {worker['current_job']}" if worker["current_job"] else "idle"
+        elif worker["stopped"]:
+            state = "stopped"
+        else:
+            state = f"lost (last seen {worker['last_seen_seconds']:.0f}s ago)"
+        print(f"   {worker['id']:<32} {worker['utilization'] * 100:5.1f}% busy  "
+              f"{worker['jobs_done']} done, {worker['jobs_failed']} failed  {state}")
+
+    if show_failed and status["failed"]:
+        print(f"\n❌ Failed jobs")
+        for job in status["failed"]:
+            first_line = (job["error"] or "").strip().splitlines()[:1]
+            print(f"   {job['id']:>6} {job['kind']:<13} after {job['attempts']} attempts: "
+                  f"{first_line[0] if first_line else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Shared SQLite job queue for captions, audio, transcodes and chunked renders",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Queue script jobs (arguments after -- go to the script)
+  python job-queue.py submit caption -- public/assets/host.mp4 --model small
+  python job-queue.py submit normalize --priority 5 -- public/assets/host.mp4 -o out/host-normalized.mp4
+
+  # Split a render into 900-frame chunks (bundle from batch-render.py)
+  python job-queue.py submit-render --bundle out/episodes/.bundle --props out/episodes/.props/ep01.json \\
+      --output out/episodes/ep01.mp4
+
+  # Four local workers; on other nodes point --queue at the same shared file
+  python job-queue.py worker --workers 4
+  python job-queue.py --queue /mnt/shared/jobs.sqlite worker --kinds render-chunk concat
+
+  # Depth, throughput and per-worker utilization
+  python job-queue.py status --failed
+
+Notes:
+  Keep the queue on a filesystem with working POSIX locks (NFSv4, SMB with
+  locking). Paths are made absolute at submit time (script arguments that
+  exist, or whose directory exists), so submit from a path that is the same
+  on every node. Other relative arguments resolve against each worker's
+  --workdir. Leases expire by wall clock, so keep node clocks synchronized
+  (NTP); a node running ahead takes over jobs that are still alive.
+        """
+    )
+
+    parser.add_argument(
+        "--queue",
+        default=DEFAULT_QUEUE,
+        help=f"Queue file (default: {DEFAULT_QUEUE})"
+    )
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser(
+        "submit",
+        help="Queue a script job",
+        usage="%(prog)s [--priority N] [--max-attempts N] KIND -- SCRIPT_ARGS..."
+    )
+    submit.add_argument("kind", choices=SCRIPT_KINDS, help="Job kind; the script's arguments follow --")
+
+    render = commands.add_parser("submit-render", help="Queue a chunked Remotion render")
+    render.add_argument("--bundle", required=True, help="Remotion bundle directory (npx remotion bundle)")
+    render.add_argument("--props", required=True, help="Input props JSON file")
+    render.add_argument("--output", required=True, help="Final video path")
+    render.add_argument("--frames", type=int, help="Total frames (default: sum of the scene durations in the props)")
+    render.add_argument("--chunk-frames", type=int, default=900, help="Frames per chunk (default: 900, 30s)")
+    render.add_argument("--concurrency", type=int, help="Remotion --concurrency per chunk")
+
+    for sub in (submit, render):
+        sub.add_argument("--priority", type=int, default=0, help="Higher runs first (default: 0)")
+        sub.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                         help=f"Attempts before a job is marked failed (default: {DEFAULT_MAX_ATTEMPTS})")
+
+    worker = commands.add_parser("worker", help="Run workers until interrupted")
+    worker.add_argument("--kinds", nargs="+", choices=list(JOB_KINDS), default=list(JOB_KINDS),
+                        help="Job kinds to claim (default: all)")
+    worker.add_argument("--workers", type=int, default=1, help="Worker threads in this process (default: 1)")
+    worker.add_argument("--workdir", default=".", help="Working directory for jobs (default: current)")
+    worker.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help=f"Lease seconds without heartbeat (default: {DEFAULT_LEASE_SECONDS:.0f})")
+    worker.add_argument("--drain", action="store_true", help="Exit once no claimable or running jobs are left")
+
+    status = commands.add_parser("status", help="Show queue depth, throughput and workers")
+    status.add_argument("--window", type=float, default=60, help="Throughput window in minutes (default: 60)")
+    status.add_argument("--failed", action="store_true", help="List failed jobs")
+    status.add_argument("--json", action="store_true", help="Print the status as JSON")
+
+    retry = commands.add_parser("retry", help="Queue failed jobs again")
+    retry.add_argument("ids", nargs="*", type=int, help="Job ids (default: all failed)")
+
+    # Everything after -- belongs to the job's script; split it off before argparse sees it
+    argv = sys.argv[1:]
+    script_argv = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, script_argv = argv[:split], argv[split + 1:]
+    args = parser.parse_args(argv)
+    if script_argv and args.command != "submit":
+        parser.error("arguments after -- are only used by submit")
+
+    try:
+        queue = JobQueue(Path(args.queue))
+
+        if args.command == "submit":
+            script_argv = resolve_script_paths(script_argv)
+            job_id = queue.submit(args.kind, {"argv": script_argv}, args.priority, args.max_attempts)
+            print(f"📥 Queued job {job_id} (priority {args.priority}): {args.kind} {' '.join(script_argv)}")
+
+        elif args.command == "submit-render":
+            props_path = Path(args.props)
+            if not props_path.exists():
+                print(f"❌ Error: File not found: {args.props}")
+                sys.exit(1)
+            frames = args.frames or composition_frames(json.loads(props_path.read_text(encoding="utf-8")))
+            job_ids = submit_render(queue, Path(args.bundle), props_path, Path(args.output), frames,
+                                    args.chunk_frames, args.priority, args.max_attempts, args.concurrency)
+            print(f"📥 Queued {len(job_ids) - 2} chunks of up to {args.chunk_frames} frames ({frames} total), "
+                  f"an audio job and concat job {job_ids[-1]}")
+
+        elif args.command == "worker":
+            queue.close()
+            print(f"👷 Starting {args.workers} worker(s) for: {', '.join(args.kinds)}")
+            run_workers(Path(args.queue), args.kinds, args.workers, Path(args.workdir), args.lease, args.drain)
+
+        elif args.command == "status":
+            result = queue.status(args.window * 60)
+            if args.json:
+                print(json.dumps(result, ensure_ascii=False, indent=2))
+            else:
+                print_status(result, args.failed)
+
+        elif args.command == "retry":
+            print(f"🔁 Requeued {queue.retry_failed(args.ids)} job(s)")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
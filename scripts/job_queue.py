@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed job queue shared by workers on one or several machines.
+
+The queue is a single SQLite file, typically on storage every node can
+reach, so no broker or service is needed. Jobs run the existing scripts
+(captions, audio normalization, short-GOP transcodes, Remotion render
+chunks) as subprocesses.
+
+Workers claim jobs inside an IMMEDIATE transaction, highest priority
+first. A claim is a lease: while the job runs, a heartbeat keeps
+extending it. If a worker dies, its lease expires and another worker
+takes the job over. Lease expiry compares time.time() readings taken on
+different nodes, so node clocks must be kept synchronized (NTP); a node
+whose clock runs ahead sees other workers' leases expire early. Failed jobs are retried with exponential backoff
+until max_attempts, and a job only becomes claimable once the jobs it
+depends on are done.
+
+The file uses the rollback journal rather than WAL, because WAL needs
+shared memory that network filesystems do not provide.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from instrumentation import count
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# A lease lasts this long without a heartbeat; heartbeats come every third of it
+DEFAULT_LEASE_SECONDS = 60.0
+
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Retry delay: RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+RETRY_BASE_SECONDS = 15.0
+
+# Characters of job output kept in the database on failure
+ERROR_TAIL = 2000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    args TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    not_before REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority DESC, id);
+CREATE TABLE IF NOT EXISTS job_deps (
+    job_id INTEGER NOT NULL,
+    dep_id INTEGER NOT NULL,
+    PRIMARY KEY (job_id, dep_id)
+);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    kinds TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    busy_seconds REAL NOT NULL DEFAULT 0,
+    jobs_done INTEGER NOT NULL DEFAULT 0,
+    jobs_failed INTEGER NOT NULL DEFAULT 0,
+    current_job INTEGER,
+    stopped INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def script_command(script: str, argv: List[str]) -> List[str]:
+    return [sys.executable, str(SCRIPTS_DIR / script), *argv]
+
+
+def render_chunk_command(args: dict) -> List[str]:
+    """One frame range of the composition, video only (audio is rendered once separately)."""
+    start, end = args["frames"]
+    return [
+        "npx", "remotion", "render", args["bundle"], args.get("composition", "TutorialVideo"), args["output"],
+        f"--props={args['props']}",
+        f"--frames={start}-{end}",
+        "--muted",
+        *([f"--concurrency={args['concurrency']}"] if args.get("concurrency") else []),
+    ]
+
+
+def render_audio_command(args: dict) -> List[str]:
+    """The composition's audio track alone; Remotion skips frame rendering for audio codecs."""
+    return [
+        "npx", "remotion", "render", args["bundle"], args.get("composition", "TutorialVideo"), args["output"],
+        f"--props={args['props']}",
+        "--codec=aac",
+    ]
+
+
+def concat_command(args: dict) -> List[str]:
+    """Join video chunks without re-encoding and add the audio track."""
+    list_path = Path(args["output"]).with_suffix(".chunks.txt")
+    list_path.write_text("".join(f"file '{Path(p).resolve()}'\n" for p in args["inputs"]), encoding="utf-8")
+    return [
+        "ffmpeg", "-v", "error",
+        "-f", "concat", "-safe", "0", "-i", str(list_path),
+        *(["-i", args["audio"]] if args.get("audio") else []),
+        "-map", "0:v",
+        *(["-map", "1:a"] if args.get("audio") else []),
+        "-c", "copy",
+        "-movflags", "+faststart",
+        "-y",  # Overwrite
+        args["output"]
+    ]
+
+
+# Job kinds and how each becomes a command. Script kinds take the
+# script's own arguments as args["argv"].
+JOB_KINDS = {
+    "caption": lambda args: script_command("generate-captions.py", args["argv"]),
+    "normalize": lambda args: script_command("normalize-audio.py", args["argv"]),
+    "transcode": lambda args: script_command("prepare-video.py", args["argv"]),
+    "render-chunk": render_chunk_command,
+    "render-audio": render_audio_command,
+    "concat": concat_command,
+}
+
+
+def worker_name(index: int = 0) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+class JobQueue:
+    """One connection to the queue file (use one instance per thread)."""
+
+    def __init__(self, path: Path, timeout: float = 30.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), timeout=timeout, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=DELETE")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _transaction(self):
+        return _Immediate(self.db)
+
+    def _fail_dependents(self, now: float):
+        """Fail queued jobs whose dependencies failed for good (they could never run)."""
+        while self.db.execute(
+            "UPDATE jobs SET status='failed', finished_at=?, error='dependency failed' "
+            "WHERE status='queued' AND EXISTS ("
+            "    SELECT 1 FROM job_deps d JOIN jobs p ON p.id = d.dep_id"
+            "    WHERE d.job_id = jobs.id AND p.status = 'failed')",
+            (now,)
+        ).rowcount:
+            pass
+
+    # Submitting
+
+    def submit(self, kind: str, args: dict, priority: int = 0, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+               depends_on: Iterable[int] = ()) -> int:
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind} (choose from {', '.join(JOB_KINDS)})")
+        with self._transaction():
+            cursor = self.db.execute(
+                "INSERT INTO jobs (kind, args, priority, max_attempts, created_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, json.dumps(args, ensure_ascii=False), priority, max_attempts, time.time())
+            )
+            job_id = cursor.lastrowid
+            self.db.executemany("INSERT INTO job_deps (job_id, dep_id) VALUES (?, ?)",
+                                [(job_id, dep) for dep in depends_on])
+        return job_id
+
+    def retry_failed(self, job_ids: Optional[List[int]] = None) -> int:
+        """Queue failed jobs again with a fresh attempt budget (dependents included when retrying all)."""
+        query = "UPDATE jobs SET status='queued', attempts=0, not_before=0, error=NULL WHERE status='failed'"
+        params = []
+        if job_ids:
+            query += f" AND id IN ({','.join('?' * len(job_ids))})"
+            params = job_ids
+        with self._transaction():
+            return self.db.execute(query, params).rowcount
+
+    # Claiming and leases
+
+    def claim(self, worker_id: str, kinds: Iterable[str], lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        """
+        Take the next runnable job, or None.
+
+        Runnable means queued (or running with an expired lease), past its
+        retry delay, and with every dependency done. Expired jobs that
+        have used up their attempts are marked failed on the way.
+        """
+        kinds = list(kinds)
+        marks = ",".join("?" * len(kinds))
+        now = time.time()
+        with self._transaction():
+            self.db.execute(
+                "UPDATE jobs SET status='failed', lease_owner=NULL, finished_at=?, "
+                "error=COALESCE(error, 'lease expired (worker lost)') "
+                "WHERE status='running' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            self._fail_dependents(now)
+            row = self.db.execute(
+                f"""
+                SELECT * FROM jobs j
+                WHERE j.kind IN ({marks})
+                  AND (j.status = 'queued' OR (j.status = 'running' AND j.lease_expires < ?))
+                  AND j.not_before <= ?
+                  AND NOT EXISTS (
+                      SELECT 1 FROM job_deps d JOIN jobs p ON p.id = d.dep_id
+                      WHERE d.job_id = j.id AND p.status != 'done'
+                  )
+                ORDER BY j.priority DESC, j.id
+                LIMIT 1
+                """,
+                (*kinds, now, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute(
+                "UPDATE jobs SET status='running', lease_owner=?, lease_expires=?, attempts=attempts+1, "
+                "started_at=? WHERE id=?",
+                (worker_id, now + lease_seconds, now, row["id"])
+            )
+        count("jobs_claimed")
+        job = dict(row)
+        job["args"] = json.loads(job["args"])
+        job["attempts"] += 1
+        return job
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Extend a lease; False if the job is no longer ours (lease expired and taken over)."""
+        with self._transaction():
+            cursor = self.db.execute(
+                "UPDATE jobs SET lease_expires=? WHERE id=? AND lease_owner=? AND status='running'",
+                (time.time() + lease_seconds, job_id, worker_id)
+            )
+            self.db.execute("UPDATE workers SET last_seen=? WHERE id=?", (time.time(), worker_id))
+        return cursor.rowcount == 1
+
+    def finish(self, job: dict, worker_id: str, error: Optional[str] = None) -> str:
+        """
+        Record the outcome; a failure is retried with backoff while attempts remain.
+
+        Returns:
+            The new status, or "lost" if the lease was taken over before the
+            outcome could be recorded (nothing is changed then)
+        """
+        now = time.time()
+        with self._transaction():
+            if error is None:
+                status, not_before = "done", 0
+            elif job["attempts"] < job["max_attempts"]:
+                status, not_before = "queued", now + RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+            else:
+                status, not_before = "failed", 0
+            cursor = self.db.execute(
+                "UPDATE jobs SET status=?, not_before=?, lease_owner=NULL, lease_expires=NULL, "
+                "finished_at=?, error=? WHERE id=? AND lease_owner=? AND status='running'",
+                (status, not_before, now, error, job["id"], worker_id)
+            )
+            if cursor.rowcount == 0:
+                return "lost"
+            if status == "failed":
+                self._fail_dependents(now)
+        return status
+
+    # Workers
+
+    def register_worker(self, worker_id: str, kinds: Iterable[str]):
+        now = time.time()
+        with self._transaction():
+            self.db.execute(
+                "INSERT OR REPLACE INTO workers (id, host, kinds, started_at, last_seen) VALUES (?, ?, ?, ?, ?)",
+                (worker_id, socket.gethostname(), ",".join(kinds), now, now)
+            )
+
+    def update_worker(self, worker_id: str, current_job: Optional[int] = None, busy_seconds: float = 0.0,
+                      done: int = 0, failed: int = 0, stopped: bool = False):
+        with self._transaction():
+            self.db.execute(
+                "UPDATE workers SET last_seen=?, current_job=?, busy_seconds=busy_seconds+?, "
+                "jobs_done=jobs_done+?, jobs_failed=jobs_failed+?, stopped=? WHERE id=?",
+                (time.time(), current_job, busy_seconds, done, failed, int(stopped), worker_id)
+            )
+
+    # Reporting
+
+    def status(self, window_seconds: float = 3600.0) -> dict:
+        """Queue depth per kind and status, recent throughput and per-worker utilization."""
+        now = time.time()
+        depth: Dict[str, Dict[str, int]] = {}
+        for row in self.db.execute("SELECT kind, status, COUNT(*) AS n FROM jobs GROUP BY kind, status"):
+            depth.setdefault(row["kind"], {})[row["status"]] = row["n"]
+
+        throughput = {}
+        for row in self.db.execute(
+            "SELECT kind, COUNT(*) AS n, AVG(finished_at - started_at) AS avg_seconds FROM jobs "
+            "WHERE status='done' AND finished_at >= ? GROUP BY kind",
+            (now - window_seconds,)
+        ):
+            throughput[row["kind"]] = {
+                "done": row["n"],
+                "per_hour": round(row["n"] * 3600.0 / window_seconds, 1),
+                "avg_seconds": round(row["avg_seconds"] or 0.0, 1),
+            }
+
+        workers = []
+        for row in self.db.execute("SELECT * FROM workers ORDER BY host, id"):
+            alive = not row["stopped"] and now - row["last_seen"] < 2 * DEFAULT_LEASE_SECONDS
+            end = now if alive else row["last_seen"]
+            elapsed = max(1e-6, end - row["started_at"])
+            busy = row["busy_seconds"]
+            if alive and row["current_job"] is not None:
+                started = self.db.execute("SELECT started_at FROM jobs WHERE id=?", (row["current_job"],)).fetchone()
+                if started and started["started_at"]:
+                    busy += now - started["started_at"]
+            workers.append({
+                "id": row["id"],
+                "host": row["host"],
+                "kinds": row["kinds"],
+                "alive": alive,
+                "stopped": bool(row["stopped"]),
+                "current_job": row["current_job"],
+                "jobs_done": row["jobs_done"],
+                "jobs_failed": row["jobs_failed"],
+                "utilization": round(min(1.0, busy / elapsed), 3),
+                "last_seen_seconds": round(now - row["last_seen"], 1),
+            })
+
+        failed = [dict(row) for row in self.db.execute(
+            "SELECT id, kind, attempts, error FROM jobs WHERE status='failed' ORDER BY id DESC LIMIT 20"
+        )]
+        return {"depth": depth, "throughput": throughput, "window_seconds": window_seconds,
+                "workers": workers, "failed": failed}
+
+
+class _Immediate:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK: takes the write lock up front so claims never race."""
+
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+class QueueWorker:
+    """
+    Claim and run jobs until stopped (or until the queue is empty with drain=True).
+
+    Each job runs as a subprocess in workdir, with output appended to
+    <queue>.logs/<job id>.log. A heartbeat thread extends the lease;
+    if the lease is lost, the subprocess is killed and its result dropped.
+    """
+
+    def __init__(self, queue_path: Path, kinds: Iterable[str], index: int = 0, workdir: Path = None,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS, poll_seconds: float = 2.0, drain: bool = False):
+        self.queue_path = Path(queue_path)
+        self.kinds = list(kinds)
+        self.worker_id = worker_name(index)
+        self.workdir = Path(workdir or os.getcwd())
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.drain = drain
+        self.stop_event = threading.Event()
+        self.logs_dir = self.queue_path.with_name(f"{self.queue_path.stem}.logs")
+
+    def run(self):
+        queue = JobQueue(self.queue_path)
+        queue.register_worker(self.worker_id, self.kinds)
+        try:
+            while not self.stop_event.is_set():
+                job = queue.claim(self.worker_id, self.kinds, self.lease_seconds)
+                if job is None:
+                    if self.drain and not self._pending(queue):
+                        break
+                    queue.update_worker(self.worker_id)
+                    self.stop_event.wait(self.poll_seconds)
+                    continue
+                self._run_job(queue, job)
+        finally:
+            queue.update_worker(self.worker_id, stopped=True)
+            queue.close()
+
+    def _pending(self, queue: JobQueue) -> bool:
+        marks = ",".join("?" * len(self.kinds))
+        row = queue.db.execute(
+            f"SELECT COUNT(*) FROM jobs WHERE kind IN ({marks}) AND status IN ('queued', 'running')",
+            self.kinds
+        ).fetchone()
+        return row[0] > 0
+
+    def _run_job(self, queue: JobQueue, job: dict):
+        queue.update_worker(self.worker_id, current_job=job["id"])
+        print(f"[{self.worker_id}] ▶ job {job['id']} {job['kind']} (attempt {job['attempts']}/{job['max_attempts']})")
+
+        self.logs_dir.mkdir(parents=True, exist_ok=True)
+        log_path = self.logs_dir / f"{job['id']}.log"
+        started = time.perf_counter()
+        lost = threading.Event()
+        error = None
+
+        try:
+            cmd = JOB_KINDS[job["kind"]](job["args"])
+            with log_path.open("a", encoding="utf-8") as log:
+                log.write(f"\n=== {self.worker_id} attempt {job['attempts']}: {' '.join(cmd)}\n")
+                log.flush()
+                proc = subprocess.Popen(cmd, cwd=self.workdir, stdout=log, stderr=subprocess.STDOUT)
+                beat = threading.Thread(target=self._heartbeat, args=(job, proc, lost), daemon=True)
+                beat.start()
+                returncode = proc.wait()
+                beat.join()
+            if returncode != 0:
+                tail = log_path.read_text(encoding="utf-8", errors="ignore")[-ERROR_TAIL:]
+                error = f"exit code {returncode}\n{tail}"
+        except Exception as e:
+            error = str(e)
+
+        seconds = time.perf_counter() - started
+        # The lease can also be taken over between the last heartbeat and finish()
+        status = "lost" if lost.is_set() else queue.finish(job, self.worker_id, error)
+        if status == "lost":
+            print(f"[{self.worker_id}] ⚠️  job {job['id']} lease lost, result dropped")
+            queue.update_worker(self.worker_id, busy_seconds=seconds)
+            return
+
+        queue.update_worker(self.worker_id, busy_seconds=seconds,
+                            done=int(status == "done"), failed=int(status == "failed"))
+        icon = {"done": "✅", "queued": "🔁", "failed": "❌"}[status]
+        print(f"[{self.worker_id}] {icon} job {job['id']} {job['kind']} {status} in {seconds:.1f}s")
+
+    def _heartbeat(self, job: dict, proc: subprocess.Popen, lost: threading.Event):
+        # Own connection: sqlite3 connections must not be shared between threads
+        queue = JobQueue(self.queue_path)
+        try:
+            while True:
+                try:
+                    proc.wait(timeout=self.lease_seconds / 3)
+                    return
+                except subprocess.TimeoutExpired:
+                    pass
+                if not queue.heartbeat(job["id"], self.worker_id, self.lease_seconds):
+                    lost.set()
+                    proc.kill()
+                    return
+        finally:
+            queue.close()
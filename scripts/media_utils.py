@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Shared media helpers for the tutorial video scripts.
+
+Small FFmpeg/ffprobe wrappers and caption file helpers used by the
+analysis and post-processing scripts in this directory.
+
+Requirements:
+    pip install numpy
+    FFmpeg must be installed and in PATH
+"""
+
+import importlib.util
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import List, Tuple
+
+from instrumentation import count, run_subprocess
+
+# NumPy is imported on first use so script startup (and --help) stays fast
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+
+def check_ffmpeg() -> bool:
+    """Verify FFmpeg is installed and accessible."""
+    try:
+        run_subprocess(
+            ["ffmpeg", "-version"],
+            capture_output=True,
+            check=True
+        )
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+
+
+def require_numpy():
+    """Import and return NumPy, raising a helpful error if it is missing."""
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy not installed. Install with: pip install numpy")
+    import numpy
+    return numpy
+
+
+def probe_duration(media_path: str) -> float:
+    """Get media duration in seconds using ffprobe."""
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", media_path]
+    result = run_subprocess(cmd, capture_output=True, text=True, check=True)
+    return float(json.loads(result.stdout)["format"]["duration"])
+
+
+def decode_audio(media_path: str, sample_rate: int = 16000, channels: int = 1):
+    """
+    Decode the audio track of a media file into a float32 NumPy array.
+
+    The audio is decoded once by FFmpeg and streamed through a pipe,
+    so no temporary WAV file is written.
+
+    Args:
+        media_path: Path to audio or video file
+        sample_rate: Output sample rate in Hz
+        channels: Number of output channels (1 = downmix to mono)
+
+    Returns:
+        Array of shape (samples,) for mono or (samples, channels) otherwise
+    """
+    np = require_numpy()
+
+    cmd = [
+        "ffmpeg",
+        "-v", "error",
+        "-i", media_path,
+        "-vn",  # No video
+        "-f", "f32le",  # Raw float32 little-endian
+        "-acodec", "pcm_f32le",
+        "-ar", str(sample_rate),
+        "-ac", str(channels),
+        "-"
+    ]
+
+    result = run_subprocess(cmd, capture_output=True)
+
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg audio decode failed: {result.stderr.decode('utf-8', errors='ignore')}")
+
+    samples = np.frombuffer(result.stdout, dtype=np.float32)
+    count("audio_seconds", len(samples) / channels / sample_rate)
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels)
+    return samples
+
+
+def stream_audio(media_path: str, block_seconds: float, sample_rate: int = 16000):
+    """
+    Decode mono audio in fixed-size blocks without holding the whole file.
+
+    FFmpeg writes raw float32 to a pipe and blocks while the consumer is
+    busy, so memory stays at one block regardless of the file length.
+
+    Args:
+        media_path: Path to audio or video file
+        block_seconds: Length of each yielded block in seconds
+        sample_rate: Output sample rate in Hz
+
+    Yields:
+        Float32 NumPy arrays of block_seconds (the last one may be shorter)
+    """
+    np = require_numpy()
+
+    cmd = [
+        "ffmpeg",
+        "-v", "error",
+        "-i", media_path,
+        "-vn",  # No video
+        "-f", "f32le",  # Raw float32 little-endian
+        "-acodec", "pcm_f32le",
+        "-ar", str(sample_rate),
+        "-ac", "1",
+        "-"
+    ]
+
+    block_bytes = int(block_seconds * sample_rate) * 4
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    finished = False
+    try:
+        while True:
+            data = proc.stdout.read(block_bytes)
+            if not data:
+                break
+            count("audio_seconds", len(data) / 4 / sample_rate)
+            yield np.frombuffer(data, dtype=np.float32)
+        finished = True
+    finally:
+        proc.stdout.close()
+        if not finished:
+            proc.kill()  # Consumer stopped early
+        stderr = proc.stderr.read()
+        proc.stderr.close()
+        if proc.wait() != 0 and finished:
+            raise RuntimeError(f"FFmpeg audio decode failed: {stderr.decode('utf-8', errors='ignore')}")
+
+
+def stream_video_frames(media_path: str, width: int, height: int, fps: float, block_frames: int = 300,
+                        pix_fmt: str = "gray"):
+    """
+    Decode video frames at low resolution in fixed-size blocks.
+
+    Frames are resampled to `fps` (the composition frame rate) and scaled
+    with area averaging, which also smooths compression noise. Like
+    stream_audio(), memory stays at one block.
+
+    Args:
+        media_path: Path to video file
+        width: Output frame width
+        height: Output frame height
+        fps: Output frame rate
+        block_frames: Frames per yielded block
+        pix_fmt: "gray" (one channel) or "rgb24"
+
+    Yields:
+        Uint8 NumPy arrays of shape (frames, height, width[, 3])
+    """
+    np = require_numpy()
+
+    cmd = [
+        "ffmpeg",
+        "-v", "error",
+        "-i", media_path,
+        "-an",  # No audio
+        "-vf", f"fps={fps},scale={width}:{height}:flags=area",
+        "-f", "rawvideo",
+        "-pix_fmt", pix_fmt,
+        "-"
+    ]
+
+    channels = 3 if pix_fmt == "rgb24" else 1
+    shape = (height, width, 3) if channels == 3 else (height, width)
+    frame_bytes = width * height * channels
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    finished = False
+    try:
+        while True:
+            data = proc.stdout.read(frame_bytes * block_frames)
+            frames = len(data) // frame_bytes
+            if not frames:
+                break
+            count("video_frames", frames)
+            yield np.frombuffer(data[: frames * frame_bytes], dtype=np.uint8).reshape(frames, *shape)
+        finished = True
+    finally:
+        proc.stdout.close()
+        if not finished:
+            proc.kill()  # Consumer stopped early
+        stderr = proc.stderr.read()
+        proc.stderr.close()
+        if proc.wait() != 0 and finished:
+            raise RuntimeError(f"FFmpeg video decode failed: {stderr.decode('utf-8', errors='ignore')}")
+
+
+def load_captions(captions_path: str) -> dict:
+    """Load a captions JSON file written by generate-captions.py."""
+    with Path(captions_path).open('r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_captions(data: dict, captions_path: str):
+    """
+    Write captions JSON in the same layout as generate-captions.py.
+
+    The file is written to a temporary sibling and renamed into place, so
+    readers (e.g. Remotion Studio reloading the preview) never see a
+    half-written file.
+    """
+    output_file = Path(captions_path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    temp_file = output_file.with_name(f".{output_file.name}.{os.getpid()}.tmp")
+    with temp_file.open('w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(temp_file, output_file)
+
+
+class CaptionStreamWriter:
+    """
+    Write a captions file one segment at a time.
+
+    Produces the same layout as save_captions() without keeping the
+    segments in memory. Segments go to a temporary sibling that is renamed
+    into place on close(), so readers never see a half-written file.
+    """
+
+    def __init__(self, captions_path: str, language: str):
+        self.path = Path(captions_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.temp_file = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        self.count = 0
+        self._file = self.temp_file.open('w', encoding='utf-8')
+        self._file.write('{\n  "language": %s,\n  "segments": [' % json.dumps(language, ensure_ascii=False))
+
+    def write(self, segment: dict):
+        body = json.dumps(segment, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+        self._file.write(("," if self.count else "") + "\n    " + body)
+        self.count += 1
+        self._file.flush()
+
+    def close(self):
+        self._file.write("\n  ]\n}" if self.count else "]\n}")
+        self._file.close()
+        os.replace(self.temp_file, self.path)
+
+    def abort(self):
+        self._file.close()
+        self.temp_file.unlink(missing_ok=True)
+
+
+def speech_intervals(captions: dict, merge_gap: float = 0.0) -> List[Tuple[float, float]]:
+    """
+    Extract sorted speech intervals from caption segments.
+
+    Args:
+        captions: Captions data with a "segments" list
+        merge_gap: Merge intervals separated by less than this many seconds
+
+    Returns:
+        List of (start, end) tuples in seconds
+    """
+    spans = sorted(
+        (float(seg["start"]), float(seg["end"]))
+        for seg in captions.get("segments", [])
+        if seg.get("end", 0) > seg.get("start", 0)
+    )
+
+    merged: List[Tuple[float, float]] = []
+    for start, end in spans:
+        if merged and start - merged[-1][1] <= merge_gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def frame_envelope(samples, sample_rate: int, fps: float):
+    """
+    Compute per-frame RMS and peak amplitude of mono samples.
+
+    Each video frame covers sample_rate / fps samples; frame boundaries are
+    rounded so the envelope has exactly ceil(duration * fps) entries.
+
+    Args:
+        samples: Mono float32 samples in [-1, 1]
+        sample_rate: Sample rate in Hz
+        fps: Composition frame rate
+
+    Returns:
+        Tuple of (rms, peak) float32 arrays, one value per frame
+    """
+    np = require_numpy()
+
+    if len(samples) == 0:
+        empty = np.zeros(0, dtype=np.float32)
+        return empty, empty
+
+    frame_count = int(np.ceil(len(samples) * fps / sample_rate))
+    bounds = np.round(np.arange(frame_count) * sample_rate / fps).astype(np.int64)
+    bounds = np.minimum(bounds, len(samples) - 1)
+
+    squares = np.add.reduceat(samples.astype(np.float64) ** 2, bounds)
+    lengths = np.diff(np.append(bounds, len(samples)))
+    rms = np.sqrt(squares / np.maximum(lengths, 1))
+    peak = np.maximum.reduceat(np.abs(samples), bounds)
+
+    return rms.astype(np.float32), peak.astype(np.float32)
+
+
+def encode_audio(samples, output_path: str, sample_rate: int, extra_args: List[str] = None):
+    """
+    Encode float32 samples to an audio file by piping raw PCM into FFmpeg.
+
+    Args:
+        samples: Array of shape (samples,) or (samples, channels)
+        output_path: Output file; the codec follows the extension unless overridden
+        sample_rate: Sample rate in Hz
+        extra_args: Extra FFmpeg output arguments (e.g. ["-b:a", "192k"])
+    """
+    np = require_numpy()
+
+    channels = 1 if samples.ndim == 1 else samples.shape[1]
+    cmd = [
+        "ffmpeg",
+        "-v", "error",
+        "-f", "f32le",
+        "-ar", str(sample_rate),
+        "-ac", str(channels),
+        "-i", "-",
+        *(extra_args or []),
+        "-y",  # Overwrite
+        output_path
+    ]
+
+    data = np.ascontiguousarray(samples, dtype=np.float32).tobytes()
+    result = run_subprocess(cmd, input=data, capture_output=True)
+    count("bytes_written", len(data))
+
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg audio encode failed: {result.stderr.decode('utf-8', errors='ignore')}")
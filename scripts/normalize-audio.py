@@ -14,17 +14,21 @@ Usage:
 """
 
 import argparse
+import importlib.util
 import sys
 import subprocess
 from pathlib import Path
 
-try:
-    from pydub import AudioSegment
-    from pydub.effects import normalize
-except ImportError:
-    print("Error: pydub not installed.")
-    print("Install with: pip install pydub")
-    sys.exit(1)
+from instrumentation import (
+    add_profile_arguments,
+    count_file_bytes,
+    profiled_run,
+    run_subprocess,
+    span,
+)
+
+# pydub is imported lazily so --help and early exits stay fast
+PYDUB_AVAILABLE = importlib.util.find_spec("pydub") is not None
 
 
 def check_ffmpeg():
@@ -64,7 +68,8 @@ def extract_audio(video_path: str, audio_output: str = "temp_audio.wav") -> str:
         audio_output
     ]
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_subprocess(cmd, capture_output=True, text=True)
+    count_file_bytes("bytes_read", video_path)
 
     if result.returncode != 0:
         raise RuntimeError(f"FFmpeg extraction failed: {result.stderr}")
@@ -91,8 +96,14 @@ def normalize_audio_file(
     """
     print(f"🔊 Normalizing audio to {target_dBFS} dBFS...")
 
+    with span("import:pydub"):
+        from pydub import AudioSegment
+        from pydub.effects import normalize
+
     # Load audio
-    audio = AudioSegment.from_file(input_audio)
+    with span("load_audio"):
+        audio = AudioSegment.from_file(input_audio)
+    count_file_bytes("bytes_read", input_audio)
 
     # Calculate current volume
     current_dBFS = audio.dBFS
@@ -112,7 +123,9 @@ def normalize_audio_file(
         normalized = audio
 
     # Export normalized audio
-    normalized.export(output_audio, format="wav")
+    with span("export_audio"):
+        normalized.export(output_audio, format="wav")
+    count_file_bytes("bytes_written", output_audio)
     print(f"💾 Normalized audio saved to: {output_audio}")
 
     return output_audio
@@ -147,11 +160,13 @@ def combine_audio_video(
         video_output
     ]
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_subprocess(cmd, capture_output=True, text=True)
 
     if result.returncode != 0:
         raise RuntimeError(f"FFmpeg combination failed: {result.stderr}")
 
+    count_file_bytes("bytes_written", video_output)
+
     print(f"✅ Combined video saved to: {video_output}")
 
 
@@ -182,6 +197,9 @@ Examples:
   # Keep intermediate files
   python normalize-audio.py video.mp4 --keep-temp
 
+  # Write a Chrome trace of where the time went
+  python normalize-audio.py video.mp4 --profile trace.json
+
 Target Levels:
   -20.0 dBFS - Standard for web video (default)
   -16.0 dBFS - EBU R128 broadcast standard
@@ -214,8 +232,15 @@ Target Levels:
         help="Keep temporary audio files (for debugging)"
     )
 
+    add_profile_arguments(parser)
+
     args = parser.parse_args()
 
+    if not PYDUB_AVAILABLE:
+        print("Error: pydub not installed.")
+        print("Install with: pip install pydub")
+        sys.exit(1)
+
     # Check FFmpeg installation
     if not check_ffmpeg():
         print("❌ Error: FFmpeg not found.")
@@ -239,35 +264,39 @@ Target Levels:
     temp_audio_extract = "temp_audio_extract.wav"
     temp_audio_normalized = "temp_audio_normalized.wav"
 
-    try:
-        # Step 1: Extract audio
-        extract_audio(args.video, temp_audio_extract)
-
-        # Step 2: Normalize audio
-        normalize_audio_file(
-            temp_audio_extract,
-            temp_audio_normalized,
-            args.target_dBFS
-        )
-
-        # Step 3: Combine with video
-        combine_audio_video(
-            args.video,
-            temp_audio_normalized,
-            output_path
-        )
-
-        print(f"\n🎉 Successfully normalized video: {output_path}")
-
-    except Exception as e:
-        print(f"\n❌ Error: {e}")
-        sys.exit(1)
-
-    finally:
-        # Cleanup temporary files
-        if not args.keep_temp:
-            cleanup_temp_file(temp_audio_extract)
-            cleanup_temp_file(temp_audio_normalized)
+    with profiled_run(args):
+        try:
+            # Step 1: Extract audio
+            with span("extract"):
+                extract_audio(args.video, temp_audio_extract)
+
+            # Step 2: Normalize audio
+            with span("normalize"):
+                normalize_audio_file(
+                    temp_audio_extract,
+                    temp_audio_normalized,
+                    args.target_dBFS
+                )
+
+            # Step 3: Combine with video
+            with span("mux"):
+                combine_audio_video(
+                    args.video,
+                    temp_audio_normalized,
+                    output_path
+                )
+
+            print(f"\n🎉 Successfully normalized video: {output_path}")
+
+        except Exception as e:
+            print(f"\n❌ Error: {e}")
+            sys.exit(1)
+
+        finally:
+            # Cleanup temporary files
+            if not args.keep_temp:
+                cleanup_temp_file(temp_audio_extract)
+                cleanup_temp_file(temp_audio_normalized)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Resize logo, avatar and overlay images to the size they are shown at.
+
+Users often supply multi-megapixel photos for a 140px logo or a 160px
+avatar. The browser decodes the full image in every render tab and
+downsamples it on every frame it is visible. This script scales each
+image once to its on-screen box (times --dpr) with a Lanczos filter.
+It crops "cover" slots to the box's aspect ratio and re-encodes the
+result: JPEG for opaque images, PNG when there is an alpha channel.
+Images are never upscaled. Phone photos stored sideways with an EXIF
+Orientation tag are turned upright first, as the browser would show
+them; the re-encoded file carries no tag.
+
+Results are cached by the source's SHA-256 plus the target parameters,
+so re-running is instant and projects that share a logo share its
+optimized copy (linked like sync-assets.py does). The report compares
+file bytes, decoded bitmap memory and FFmpeg decode time before and
+after.
+
+Slots (on-screen boxes in the 1920x1080 composition):
+    logo     VisualHammer logo (logoImageUrl), 140x140, contain
+    avatar   ScreenRecording live PIP avatar (avatarImage), 160x160, cover
+    WxH      any other overlay image shown in a WxH box, contain
+
+Output (in public/assets of the project):
+    <name>.display.jpg|png  - point the prop at this file
+
+Requirements:
+    FFmpeg must be installed and in PATH
+
+Usage:
+    python optimize-images.py logo=raw/logo.png avatar=raw/me.jpg [--dpr 2]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import statistics
+import sys
+from pathlib import Path
+
+from asset_store import DEFAULT_STORE, file_digest, place_file
+from instrumentation import count, run_subprocess
+from media_utils import check_ffmpeg
+
+DEFAULT_CACHE = DEFAULT_STORE.parent / "images"
+
+# On-screen boxes, from the component styles
+IMAGE_SLOTS = {
+    "logo": {"prop": "logoImageUrl", "size": (140, 140), "fit": "contain"},
+    "avatar": {"prop": "avatarImage", "size": (160, 160), "fit": "cover"},
+}
+
+# Bumped when the encoding settings change, to invalidate cached results
+ENCODER_VERSION = 2
+
+JPEG_QUALITY = 3  # FFmpeg mjpeg -q:v (2-31, lower is better)
+
+DECODE_RUNS = 3
+
+# Pixel formats that may carry transparency (palette PNGs can have a tRNS chunk)
+ALPHA_PIX_FMTS = ("rgba", "bgra", "argb", "abgr", "ya", "yuva", "gbrap", "pal8")
+
+# FFmpeg filters that apply an EXIF Orientation value (1 is upright)
+ORIENTATION_FILTERS = {
+    2: ["hflip"],
+    3: ["hflip", "vflip"],
+    4: ["vflip"],
+    5: ["transpose=cclock_flip"],
+    6: ["transpose=clock"],
+    7: ["transpose=clock_flip"],
+    8: ["transpose=cclock"],
+}
+
+
+def probe_image(path: Path) -> dict:
+    """
+    Upright width and height, EXIF orientation and whether the image has an alpha channel.
+
+    The Orientation tag is exported as frame metadata, so the first frame
+    is decoded. Width and height are swapped for 90° and 270° rotations.
+    """
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-select_streams", "v:0",
+        "-read_intervals", "%+#1",
+        "-show_entries", "stream=width,height,pix_fmt:frame_tags=Orientation",
+        "-of", "json",
+        str(path)
+    ]
+    result = run_subprocess(cmd, capture_output=True, text=True, check=True)
+    info = json.loads(result.stdout)
+    stream = info["streams"][0]
+    tags = next((frame.get("tags", {}) for frame in info.get("frames", [])), {})
+    try:
+        orientation = int(tags.get("Orientation", 1))
+    except ValueError:
+        orientation = 1
+    if orientation not in ORIENTATION_FILTERS:
+        orientation = 1
+
+    width, height = int(stream["width"]), int(stream["height"])
+    if orientation >= 5:
+        width, height = height, width
+    pix_fmt = stream.get("pix_fmt", "")
+    return {
+        "width": width,
+        "height": height,
+        "orientation": orientation,
+        "alpha": pix_fmt.startswith(ALPHA_PIX_FMTS),
+    }
+
+
+def target_geometry(width: int, height: int, box, fit: str, dpr: float):
+    """
+    Scaled size and crop for an image shown in `box` CSS pixels.
+
+    Returns:
+        Tuple of ((scaled width, scaled height), (crop width, crop height) or None)
+    """
+    box_w, box_h = math.ceil(box[0] * dpr), math.ceil(box[1] * dpr)
+    if fit == "cover":
+        factor = min(1.0, max(box_w / width, box_h / height))
+    else:
+        factor = min(1.0, box_w / width, box_h / height)
+    scaled = (max(1, round(width * factor)), max(1, round(height * factor)))
+
+    crop = None
+    if fit == "cover":
+        # Keep the centered part objectFit: cover shows, at the box's aspect ratio
+        crop_w = min(scaled[0], round(scaled[1] * box_w / box_h))
+        crop_h = min(scaled[1], round(scaled[0] * box_h / box_w))
+        if (crop_w, crop_h) != scaled:
+            crop = (crop_w, crop_h)
+    return scaled, crop
+
+
+def optimize_image(source: Path, box, fit: str, dpr: float, cache_dir: Path) -> dict:
+    """
+    Produce (or reuse) the display-size version of an image.
+
+    Returns:
+        Dict with the cached path, geometry and whether it was a cache hit
+    """
+    info = probe_image(source)
+    scaled, crop = target_geometry(info["width"], info["height"], box, fit, dpr)
+    ext = ".png" if info["alpha"] else ".jpg"
+
+    params = {"box": list(box), "fit": fit, "dpr": dpr, "scaled": scaled, "crop": crop,
+              "orientation": info["orientation"], "ext": ext, "version": ENCODER_VERSION}
+    key = hashlib.sha256((file_digest(source) + json.dumps(params, sort_keys=True)).encode()).hexdigest()
+    cached = cache_dir / key[:2] / f"{key}{ext}"
+
+    hit = cached.exists()
+    if hit:
+        count("images_cached")
+    else:
+        # Upright first: geometry was computed for the image as displayed
+        filters = ORIENTATION_FILTERS.get(info["orientation"], []) + [f"scale={scaled[0]}:{scaled[1]}:flags=lanczos"]
+        if crop:
+            filters.append(f"crop={crop[0]}:{crop[1]}")
+        if info["alpha"]:
+            codec = ["-c:v", "png", "-pix_fmt", "rgba", "-compression_level", "9"]
+        else:
+            codec = ["-c:v", "mjpeg", "-q:v", str(JPEG_QUALITY), "-pix_fmt", "yuvj444p"]
+
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        temp = cached.with_name(f".{cached.stem}.tmp{ext}")
+        cmd = [
+            "ffmpeg", "-v", "error",
+            "-noautorotate",  # Orientation is applied by the filters above
+            "-i", str(source),
+            "-vf", ",".join(filters),
+            "-frames:v", "1",
+            *codec,
+            "-y",  # Overwrite
+            str(temp)
+        ]
+        result = run_subprocess(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            temp.unlink(missing_ok=True)
+            raise RuntimeError(f"FFmpeg failed for {source}: {result.stderr}")
+        temp.replace(cached)
+        count("images_encoded")
+
+    width, height = crop or scaled
+    return {"path": cached, "source_size": (info["width"], info["height"]), "size": (width, height),
+            "alpha": info["alpha"], "cached": hit}
+
+
+def decode_seconds(path: Path) -> float:
+    """Median FFmpeg decode time of an image (decode loop only, from -benchmark)."""
+    cmd = ["ffmpeg", "-v", "error", "-benchmark", "-i", str(path), "-f", "null", "-"]
+    times = []
+    for _ in range(DECODE_RUNS):
+        result = run_subprocess(cmd, capture_output=True, text=True)
+        match = re.search(r"rtime=([\d.]+)s", result.stderr + result.stdout)
+        if match:
+            times.append(float(match.group(1)))
+    return statistics.median(times) if times else 0.0
+
+
+def parse_slot(spec: str):
+    """Parse SLOT=PATH, where SLOT is logo, avatar or a WIDTHxHEIGHT box."""
+    slot, sep, path = spec.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected SLOT=PATH, got: {spec}")
+    if slot in IMAGE_SLOTS:
+        return slot, IMAGE_SLOTS[slot]["size"], IMAGE_SLOTS[slot]["fit"], Path(path)
+    match = re.fullmatch(r"(\d+)x(\d+)", slot)
+    if not match:
+        raise argparse.ArgumentTypeError(f"unknown slot '{slot}' (use {', '.join(IMAGE_SLOTS)} or WIDTHxHEIGHT)")
+    return slot, (int(match.group(1)), int(match.group(2))), "contain", Path(path)
+
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Resize logo, avatar and overlay images to their on-screen size",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Optimize the logo and avatar already in public/assets
+  python optimize-images.py
+
+  # From originals, for a render with --scale=2
+  python optimize-images.py logo=raw/logo.png avatar=raw/me.jpg --dpr 2
+
+  # An overlay image shown in a 320x180 box
+  python optimize-images.py 320x180=raw/diagram.png
+
+Notes:
+  The avatar slot is the live PIP (pipMode "live"). For "asset" and "baked"
+  modes, prepare-pip.py already renders the avatar at its display size.
+        """
+    )
+
+    parser.add_argument(
+        "images",
+        nargs="*",
+        type=parse_slot,
+        metavar="SLOT=PATH",
+        help="Images to optimize (default: logo.jpg and avatar.jpg in public/assets)"
+    )
+
+    parser.add_argument(
+        "--project",
+        "-p",
+        default=".",
+        help="Remotion project directory (default: current directory)"
+    )
+
+    parser.add_argument(
+        "--dpr",
+        type=float,
+        default=1.0,
+        help="Device pixel ratio: the render --scale (default: 1)"
+    )
+
+    parser.add_argument(
+        "--cache",
+        default=str(DEFAULT_CACHE),
+        help=f"Cache directory (default: {DEFAULT_CACHE})"
+    )
+
+    parser.add_argument(
+        "--no-benchmark",
+        action="store_true",
+        help="Skip measuring decode times"
+    )
+
+    args = parser.parse_args()
+
+    # Check FFmpeg installation
+    if not check_ffmpeg():
+        print("❌ Error: FFmpeg not found.")
+        print("Install FFmpeg: https://ffmpeg.org/download.html")
+        sys.exit(1)
+
+    assets_dir = Path(args.project) / "public" / "assets"
+    images = args.images
+    if not images:
+        images = [(slot, spec["size"], spec["fit"], assets_dir / f"{slot}.jpg")
+                  for slot, spec in IMAGE_SLOTS.items() if (assets_dir / f"{slot}.jpg").exists()]
+        if not images:
+            parser.error(f"no images given and no logo.jpg/avatar.jpg in {assets_dir}")
+
+    for _, _, _, path in images:
+        if not path.is_file():
+            print(f"❌ Error: File not found: {path}")
+            sys.exit(1)
+
+    print(f"🖼️  Optimizing {len(images)} image(s) for DPR {args.dpr:g}")
+
+    totals = {"bytes_before": 0, "bytes_after": 0, "pixels_before": 0, "pixels_after": 0,
+              "decode_before": 0.0, "decode_after": 0.0}
+    try:
+        for slot, box, fit, source in images:
+            result = optimize_image(source, box, fit, args.dpr, Path(args.cache))
+            target = assets_dir / f"{source.stem}.display{result['path'].suffix}"
+            place_file(result["path"], target)
+
+            before, after = source.stat().st_size, target.stat().st_size
+            pixels_before = result["source_size"][0] * result["source_size"][1]
+            pixels_after = result["size"][0] * result["size"][1]
+            totals["bytes_before"] += before
+            totals["bytes_after"] += after
+            totals["pixels_before"] += pixels_before
+            totals["pixels_after"] += pixels_after
+
+            decode = ""
+            if not args.no_benchmark:
+                decode_before, decode_after = decode_seconds(source), decode_seconds(target)
+                totals["decode_before"] += decode_before
+                totals["decode_after"] += decode_after
+                decode = f", decode {decode_before * 1000:.1f} -> {decode_after * 1000:.1f} ms"
+
+            cached = " (cached)" if result["cached"] else ""
+            print(f"  ✅ {slot:<8} {source.name}: {result['source_size'][0]}x{result['source_size'][1]} -> "
+                  f"{result['size'][0]}x{result['size'][1]}, {format_size(before)} -> {format_size(after)}"
+                  f"{decode}{cached}")
+            prop = IMAGE_SLOTS[slot]["prop"] if slot in IMAGE_SLOTS else "the image prop"
+            print(f"     Set {prop} to: {target.relative_to(Path(args.project) / 'public').as_posix()}")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+    print(f"\n📊 Saved {format_size(totals['bytes_before'] - totals['bytes_after'])} on disk, "
+          f"{format_size((totals['pixels_before'] - totals['pixels_after']) * 4)} of decoded bitmaps per render tab")
+    if not args.no_benchmark:
+        print(f"⚡ Decode time {totals['decode_before'] * 1000:.1f} -> {totals['decode_after'] * 1000:.1f} ms "
+              f"per load ({(totals['decode_before'] - totals['decode_after']) * 1000:.1f} ms saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Pre-composite the picture-in-picture avatar offline.
+
+ScreenRecording.tsx draws the PIP on every tutorial frame: it scales the
+full-size avatar into a 160px circle (border-radius + overflow mask),
+adds a white border, a box shadow and a blurred gradient glow. The
+browser redoes the scaling, masking and the 8px blur for each frame.
+
+This script does that work once. It scales and crops the avatar (an
+image, or host footage for a talking-head PIP) to the exact PIP size
+and bakes the circle mask, border, shadow and glow into one small
+transparent asset (PNG, or WebM with alpha for video). Render with
+pipMode "asset" so the component only draws that asset. Alternatively,
+--bake composites the asset straight onto the screen recording in one
+FFmpeg filter graph; render with pipMode "baked" and the PIP costs
+nothing per frame.
+
+Requirements:
+    pip install numpy
+    FFmpeg must be installed and in PATH
+
+Usage:
+    python prepare-pip.py public/assets/avatar.jpg [--output public/assets/avatar-pip.png]
+    python prepare-pip.py public/assets/avatar.jpg --bake public/assets/screen-recording.mp4
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+from instrumentation import count, run_subprocess
+from media_utils import check_ffmpeg, require_numpy
+
+# PIP layout from ScreenRecording.tsx (1920x1080 composition)
+PIP_SIZE = 160          # width/height of the circle, border included (border-box)
+PIP_BORDER = 4          # white border
+PIP_MARGIN = 32         # bottom/right offset
+GLOW_INSET = 6          # glow circle extends this far outside the PIP
+GLOW_SIGMA = 8          # CSS blur(8px)
+GLOW_OPACITY = 0.6
+GLOW_COLORS = ["#FF6B9D", "#C44CD9", "#6B9DFF"]  # 135deg gradient
+SHADOW_OFFSET = 8       # box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3)
+SHADOW_SIGMA = 16
+SHADOW_OPACITY = 0.3
+
+# Transparent padding around the PIP so the glow and shadow fit
+CANVAS_PAD = 48
+CANVAS_SIZE = PIP_SIZE + 2 * CANVAS_PAD
+AVATAR_SIZE = PIP_SIZE - 2 * PIP_BORDER
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+
+
+def disk(size: int, diameter: float, cx: float, cy: float):
+    """Anti-aliased disk coverage (0-1) on a size x size grid."""
+    np = require_numpy()
+    y, x = np.mgrid[0:size, 0:size] + 0.5
+    distance = np.hypot(x - cx, y - cy)
+    return np.clip(diameter / 2 - distance + 0.5, 0.0, 1.0)
+
+
+def gaussian_blur(channel, sigma: float):
+    """Separable Gaussian blur of a 2D array (edges treated as transparent)."""
+    np = require_numpy()
+    radius = int(3 * sigma)
+    x = np.arange(-radius, radius + 1)
+    kernel = np.exp(-(x * x) / (2.0 * sigma * sigma))
+    kernel /= kernel.sum()
+    blurred = np.apply_along_axis(np.convolve, 0, channel, kernel, mode="same")
+    return np.apply_along_axis(np.convolve, 1, blurred, kernel, mode="same")
+
+
+def over(top, bottom):
+    """Porter-Duff 'over' for premultiplied RGBA float arrays."""
+    return top + bottom * (1.0 - top[..., 3:4])
+
+
+def hex_rgb(color: str):
+    return [int(color[i:i + 2], 16) / 255.0 for i in (1, 3, 5)]
+
+
+def decoration_layer():
+    """
+    Shadow, glow and white border, premultiplied RGBA on the canvas.
+
+    Everything except the avatar pixels is static, so it is built once.
+    """
+    np = require_numpy()
+    size = CANVAS_SIZE
+    center = size / 2
+
+    # Box shadow: black disk, offset down, blurred
+    shadow_alpha = SHADOW_OPACITY * gaussian_blur(disk(size, PIP_SIZE, center, center + SHADOW_OFFSET), SHADOW_SIGMA)
+    shadow = np.zeros((size, size, 4))
+    shadow[..., 3] = shadow_alpha
+
+    # Glow: 135deg three-stop gradient in a slightly larger disk, blurred
+    stops = [np.array(hex_rgb(c)) for c in GLOW_COLORS]
+    y, x = np.mgrid[0:size, 0:size]
+    t = np.clip((x + y) / (2.0 * (size - 1)), 0.0, 1.0)[..., None]
+    gradient = np.where(t < 0.5, stops[0] + (stops[1] - stops[0]) * (t * 2), stops[1] + (stops[2] - stops[1]) * (t * 2 - 1))
+    glow_alpha = GLOW_OPACITY * disk(size, PIP_SIZE + 2 * GLOW_INSET, center, center)
+    glow = np.zeros((size, size, 4))
+    for c in range(3):
+        glow[..., c] = gaussian_blur(gradient[..., c] * glow_alpha, GLOW_SIGMA)
+    glow[..., 3] = gaussian_blur(glow_alpha, GLOW_SIGMA)
+
+    # White border: full PIP disk in white (the avatar covers the inside)
+    border = np.zeros((size, size, 4))
+    border[..., 3] = disk(size, PIP_SIZE, center, center)
+    border[..., :3] = border[..., 3:4]
+
+    return over(border, over(glow, shadow))
+
+
+def avatar_mask():
+    """Circle coverage of the avatar area, placed on the canvas."""
+    np = require_numpy()
+    mask = np.zeros((CANVAS_SIZE, CANVAS_SIZE))
+    offset = CANVAS_PAD + PIP_BORDER
+    mask[offset:offset + AVATAR_SIZE, offset:offset + AVATAR_SIZE] = disk(
+        AVATAR_SIZE, AVATAR_SIZE, AVATAR_SIZE / 2, AVATAR_SIZE / 2
+    )
+    return mask
+
+
+def composite_frame(rgba_bytes: bytes, base, mask):
+    """Place one AVATAR_SIZE² RGBA frame in the circle over the decorations."""
+    np = require_numpy()
+    avatar = np.frombuffer(rgba_bytes, dtype=np.uint8).reshape(AVATAR_SIZE, AVATAR_SIZE, 4) / 255.0
+    offset = CANVAS_PAD + PIP_BORDER
+    top = np.zeros((CANVAS_SIZE, CANVAS_SIZE, 4))
+    area = top[offset:offset + AVATAR_SIZE, offset:offset + AVATAR_SIZE]
+    area[..., 3] = avatar[..., 3]
+    area[..., :3] = avatar[..., :3] * avatar[..., 3:4]
+    top *= mask[..., None]
+
+    out = over(top, base)
+    # Back to straight alpha for PNG/WebM
+    alpha = out[..., 3:4]
+    rgb = np.where(alpha > 0, out[..., :3] / np.maximum(alpha, 1e-6), 0.0)
+    return (np.clip(np.concatenate([rgb, alpha], axis=2), 0.0, 1.0) * 255 + 0.5).astype(np.uint8).tobytes()
+
+
+def build_pip(source: str, output_path: str, start: float = 0.0, duration: float = None, fps: int = 30) -> int:
+    """
+    Scale, crop and mask the avatar once and write the pre-composited PIP.
+
+    Images become a PNG; videos are streamed frame by frame into a VP9
+    WebM with alpha, so memory stays at one frame.
+
+    Returns:
+        Number of frames written
+    """
+    is_image = Path(source).suffix.lower() in IMAGE_EXTENSIONS
+    base = decoration_layer()
+    mask = avatar_mask()
+
+    scale = (f"scale={AVATAR_SIZE}:{AVATAR_SIZE}:force_original_aspect_ratio=increase,"
+             f"crop={AVATAR_SIZE}:{AVATAR_SIZE}")
+    if is_image:
+        decode = ["ffmpeg", "-v", "error", "-i", source, "-vf", scale, "-frames:v", "1"]
+    else:
+        decode = ["ffmpeg", "-v", "error", "-ss", str(start), *(["-t", str(duration)] if duration else []),
+                  "-i", source, "-vf", f"{scale},fps={fps}", "-an"]
+    decode += ["-f", "rawvideo", "-pix_fmt", "rgba", "-"]
+
+    encode = ["ffmpeg", "-v", "error", "-f", "rawvideo", "-pix_fmt", "rgba",
+              "-s", f"{CANVAS_SIZE}x{CANVAS_SIZE}", "-r", str(fps), "-i", "-"]
+    if is_image:
+        encode += ["-frames:v", "1"]
+    else:
+        encode += ["-c:v", "libvpx-vp9", "-pix_fmt", "yuva420p", "-b:v", "0", "-crf", "30",
+                   "-auto-alt-ref", "0", "-row-mt", "1"]
+    encode += ["-y", output_path]
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    frame_bytes = AVATAR_SIZE * AVATAR_SIZE * 4
+    frames = 0
+
+    decoder = subprocess.Popen(decode, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    encoder = subprocess.Popen(encode, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while True:
+            data = decoder.stdout.read(frame_bytes)
+            if len(data) < frame_bytes:
+                break
+            encoder.stdin.write(composite_frame(data, base, mask))
+            frames += 1
+    finally:
+        encoder.stdin.close()
+        decoder.stdout.close()
+        decode_err = decoder.stderr.read()
+        encode_err = encoder.stderr.read()
+        decoder.wait()
+        encoder.wait()
+
+    if decoder.returncode != 0 or frames == 0:
+        raise RuntimeError(f"FFmpeg decode failed: {decode_err.decode('utf-8', errors='ignore')}")
+    if encoder.returncode != 0:
+        raise RuntimeError(f"FFmpeg encode failed: {encode_err.decode('utf-8', errors='ignore')}")
+
+    count("pip_frames", frames)
+    return frames
+
+
+def bake_pip(screen_recording: str, pip_path: str, output_path: str, fade: float = 1.0, crf: int = 18):
+    """
+    Composite the PIP onto the screen recording in a single FFmpeg pass.
+
+    The recording is scaled/cropped to 1920x1080 like objectFit: cover,
+    the PIP fades in over `fade` seconds, and keyframes are kept 1s apart
+    so the result stays cheap to seek. The output is as long as the
+    recording; a shorter video PIP holds its last frame.
+    """
+    is_image = Path(pip_path).suffix.lower() in IMAGE_EXTENSIONS
+    # The canvas padding pushes the asset past the frame edge by PAD - MARGIN
+    edge = CANVAS_PAD - PIP_MARGIN
+    # The output always runs as long as the recording: a looped image is endless, so
+    # stop at the shortest input; a shorter PIP video holds its last frame
+    length = "shortest=1" if is_image else "eof_action=repeat"
+    graph = (
+        "[0:v]scale=1920:1080:force_original_aspect_ratio=increase,crop=1920:1080,setsar=1[bg];"
+        f"[1:v]format=rgba,fade=t=in:st=0:d={fade}:alpha=1[pip];"
+        f"[bg][pip]overlay=x=W-w+{edge}:y=H-h+{edge}:{length}:format=auto[v]"
+    )
+
+    pip_input = ["-loop", "1", "-framerate", "30", "-i", pip_path] if is_image else ["-c:v", "libvpx-vp9", "-i", pip_path]
+    cmd = [
+        "ffmpeg",
+        "-i", screen_recording,
+        *pip_input,
+        "-filter_complex", graph,
+        "-map", "[v]",
+        "-map", "0:a?",
+        "-c:v", "libx264",
+        "-preset", "fast",
+        "-crf", str(crf),
+        "-pix_fmt", "yuv420p",
+        "-force_key_frames", "expr:gte(t,n_forced*1)",
+        "-c:a", "copy",
+        "-movflags", "+faststart",
+        "-y",  # Overwrite
+        output_path
+    ]
+
+    print(f"🎬 Compositing PIP onto: {screen_recording}")
+    result = run_subprocess(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg composite failed: {result.stderr}")
+    print(f"✅ Screen recording with PIP saved to: {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pre-composite the PIP avatar (mask, border, glow, shadow) once, offline",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Examples:
+  # Pre-masked PIP image; render with pipMode "asset"
+  python prepare-pip.py public/assets/avatar.jpg
+  #   props: {{"pipMode": "asset", "avatarImage": "assets/avatar-pip.png"}}
+
+  # Talking-head PIP from host footage (WebM with alpha)
+  python prepare-pip.py public/assets/host-video.mp4 --start 2 --duration 60
+
+  # Bake the PIP into the screen recording; render with pipMode "baked"
+  python prepare-pip.py public/assets/avatar.jpg --bake public/assets/screen-recording.mp4
+  #   props: {{"pipMode": "baked", "screenRecordingUrl": "assets/screen-recording-pip.mp4"}}
+
+Notes:
+  The asset is {CANVAS_SIZE}x{CANVAS_SIZE}: the {PIP_SIZE}px PIP plus {CANVAS_PAD}px for glow and shadow.
+  Baking drops the scale-in, wobble and glow pulse (the PIP fades in
+  instead); use "asset" mode to keep the scale-in and online indicator.
+        """
+    )
+
+    parser.add_argument(
+        "source",
+        help="Avatar image, or host video for a moving PIP"
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="PIP asset path (default: <source>-pip.png, or .webm for video)"
+    )
+
+    parser.add_argument(
+        "--start",
+        type=float,
+        default=0.0,
+        help="Video sources: start time in seconds (default: 0)"
+    )
+
+    parser.add_argument(
+        "--duration",
+        type=float,
+        help="Video sources: length in seconds (default: to the end)"
+    )
+
+    parser.add_argument(
+        "--bake",
+        metavar="SCREEN_RECORDING",
+        help="Also composite the PIP onto this screen recording"
+    )
+
+    parser.add_argument(
+        "--bake-output",
+        help="Output for --bake (default: <recording>-pip.mp4)"
+    )
+
+    parser.add_argument(
+        "--crf",
+        type=int,
+        default=18,
+        help="x264 quality for --bake, lower is better (default: 18)"
+    )
+
+    args = parser.parse_args()
+
+    # Check FFmpeg installation
+    if not check_ffmpeg():
+        print("❌ Error: FFmpeg not found.")
+        print("Install FFmpeg: https://ffmpeg.org/download.html")
+        sys.exit(1)
+
+    for path in filter(None, (args.source, args.bake)):
+        if not Path(path).exists():
+            print(f"❌ Error: File not found: {path}")
+            sys.exit(1)
+
+    source = Path(args.source)
+    is_image = source.suffix.lower() in IMAGE_EXTENSIONS
+    output = args.output or str(source.with_name(f"{source.stem}-pip{'.png' if is_image else '.webm'}"))
+
+    try:
+        print(f"🎨 Pre-compositing PIP from: {args.source}")
+        frames = build_pip(args.source, output, start=args.start, duration=args.duration)
+        kind = "image" if is_image else f"{frames} frames"
+        print(f"✅ PIP asset ({CANVAS_SIZE}x{CANVAS_SIZE}, {kind}) saved to: {output}")
+
+        if args.bake:
+            recording = Path(args.bake)
+            bake_output = args.bake_output or str(recording.with_name(f"{recording.stem}-pip.mp4"))
+            bake_pip(args.bake, output, bake_output, crf=args.crf)
+            print(f'\n👉 Render with: "pipMode": "baked", "screenRecordingUrl": "assets/{Path(bake_output).name}"')
+        else:
+            print(f'\n👉 Render with: "pipMode": "asset", "avatarImage": "assets/{Path(output).name}"')
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Make source videos cheap to seek for Remotion frame extraction.
+
+Remotion fetches an arbitrary frame of host-video.mp4 and
+screen-recording.mp4 for every rendered frame, and each parallel render
+chunk starts mid-file. Screen recorders often emit very long GOPs
+(one keyframe every 10 seconds or more), so every seek decodes from a
+distant keyframe. This script reads the keyframe layout from ffprobe
+packet flags and re-encodes only videos whose keyframe interval exceeds
+a threshold (or that are not H.264), using a fixed short GOP.
+
+With --benchmark it also measures random-seek latency on the actual file
+before and after the re-encode.
+
+Requirements:
+    FFmpeg must be installed and in PATH
+
+Usage:
+    python prepare-video.py public/assets/screen-recording.mp4 [--max-interval 2.0] [--gop 1.0] [--benchmark]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from instrumentation import run_subprocess
+from media_utils import check_ffmpeg, probe_duration
+
+
+def probe_video_stream(video_path: str) -> dict:
+    """Return codec, frame rate and audio codec of a video file."""
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "stream=codec_type,codec_name,avg_frame_rate",
+        "-of", "json",
+        video_path
+    ]
+    result = run_subprocess(cmd, capture_output=True, text=True, check=True)
+    streams = json.loads(result.stdout).get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if video is None:
+        raise RuntimeError(f"No video stream in: {video_path}")
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+
+    num, _, den = video.get("avg_frame_rate", "30/1").partition("/")
+    fps = float(num) / float(den or 1) if float(den or 1) else 30.0
+    return {
+        "codec": video.get("codec_name"),
+        "fps": fps or 30.0,
+        "audio_codec": audio.get("codec_name") if audio else None,
+    }
+
+
+def keyframe_times(video_path: str) -> List[float]:
+    """
+    Keyframe timestamps of the first video stream, from packet flags.
+
+    Reading packet flags only demuxes the file; nothing is decoded.
+    """
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags",
+        "-of", "csv=p=0",
+        video_path
+    ]
+    result = run_subprocess(cmd, capture_output=True, text=True, check=True)
+
+    times = []
+    for line in result.stdout.splitlines():
+        pts, _, flags = line.partition(",")
+        if "K" in flags and pts not in ("", "N/A"):
+            times.append(float(pts))
+    return sorted(times)
+
+
+def analyze_gop(video_path: str) -> dict:
+    """
+    Summarize keyframe spacing.
+
+    expected_decode_frames is the average number of frames decoded to
+    reach a uniformly random timestamp: sum(interval²) / (2 · duration) · fps.
+    """
+    stream = probe_video_stream(video_path)
+    duration = probe_duration(video_path)
+    keyframes = keyframe_times(video_path)
+
+    bounds = keyframes + [duration]
+    intervals = [b - a for a, b in zip(bounds, bounds[1:]) if b > a]
+    if not intervals:
+        intervals = [duration]
+
+    return {
+        "codec": stream["codec"],
+        "fps": round(stream["fps"], 3),
+        "audio_codec": stream["audio_codec"],
+        "duration": round(duration, 3),
+        "keyframes": len(keyframes),
+        "max_interval": round(max(intervals), 3),
+        "mean_interval": round(sum(intervals) / len(intervals), 3),
+        "expected_decode_frames": round(sum(i * i for i in intervals) / (2 * duration) * stream["fps"], 1),
+    }
+
+
+def reencode_short_gop(video_path: str, output_path: str, fps: float, gop: float,
+                       audio_codec: str = None, crf: int = 18):
+    """
+    Re-encode to H.264 with a keyframe every `gop` seconds.
+
+    Scene-cut keyframes are disabled so the interval is fixed, which keeps
+    every parallel render chunk equally cheap to start. AAC audio is copied.
+    """
+    keyint = max(1, round(fps * gop))
+    temp = Path(output_path).with_name(f".{Path(output_path).stem}.{os.getpid()}.tmp.mp4")
+
+    cmd = [
+        "ffmpeg",
+        "-i", video_path,
+        "-c:v", "libx264",
+        "-preset", "fast",
+        "-crf", str(crf),
+        "-pix_fmt", "yuv420p",
+        "-x264-params", f"keyint={keyint}:min-keyint={keyint}:scenecut=0",
+        *(["-c:a", "copy"] if audio_codec == "aac" else ["-c:a", "aac", "-b:a", "192k"]),
+        "-movflags", "+faststart",
+        "-y",  # Overwrite
+        str(temp)
+    ]
+
+    print(f"🎬 Re-encoding with a keyframe every {keyint} frames ({gop:g}s)...")
+    result = run_subprocess(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        temp.unlink(missing_ok=True)
+        raise RuntimeError(f"FFmpeg re-encode failed: {result.stderr}")
+
+    # Replace by rename: safe even when the target is a hard link into the asset store
+    os.replace(temp, output_path)
+    print(f"✅ Seek-friendly video saved to: {output_path}")
+
+
+def seek_latency(video_path: str, samples: int = 20, seed: int = 0) -> dict:
+    """
+    Time decoding one frame at random timestamps, like a render chunk start.
+
+    Each sample runs `ffmpeg -ss T -i file -frames:v 1`, which seeks to the
+    keyframe before T and decodes forward to T. Timestamps are seeded, so
+    before/after runs hit the same positions.
+    """
+    duration = probe_duration(video_path)
+    rng = random.Random(seed)
+    latencies = []
+
+    for _ in range(samples):
+        t = rng.uniform(0, max(0.0, duration - 0.5))
+        cmd = [
+            "ffmpeg", "-v", "error",
+            "-ss", f"{t:.3f}",
+            "-i", video_path,
+            "-frames:v", "1",
+            "-f", "null", "-"
+        ]
+        started = time.perf_counter()
+        run_subprocess(cmd, capture_output=True, check=True)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    latencies.sort()
+    return {
+        "samples": samples,
+        "median_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 1),
+        "max_ms": round(latencies[-1], 1),
+    }
+
+
+def print_gop(label: str, gop: dict):
+    print(f"  {label:<7} {gop['codec']}, {gop['keyframes']} keyframes, interval max {gop['max_interval']:.2f}s "
+          f"/ mean {gop['mean_interval']:.2f}s, ~{gop['expected_decode_frames']:.0f} frames decoded per seek")
+
+
+def print_seek(label: str, seek: dict):
+    print(f"  {label:<7} seek median {seek['median_ms']:.0f} ms, p95 {seek['p95_ms']:.0f} ms, "
+          f"max {seek['max_ms']:.0f} ms ({seek['samples']} samples)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-encode long-GOP source videos so Remotion can seek them quickly",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Analyze and fix both source videos in place (only if needed)
+  python prepare-video.py public/assets/host-video.mp4 public/assets/screen-recording.mp4
+
+  # Only report the GOP structure
+  python prepare-video.py public/assets/screen-recording.mp4 --analyze-only
+
+  # Measure random-seek latency before and after
+  python prepare-video.py public/assets/screen-recording.mp4 --benchmark
+
+Notes:
+  Files are replaced by rename, so assets hard-linked by sync-assets.py
+  keep the store intact; run sync-assets.py before this script, not after,
+  or it will link the original back.
+        """
+    )
+
+    parser.add_argument(
+        "videos",
+        nargs="+",
+        help="Video files to prepare"
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Output path (single input only, default: replace the input)"
+    )
+
+    parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=2.0,
+        help="Re-encode when any keyframe interval exceeds this many seconds (default: 2.0)"
+    )
+
+    parser.add_argument(
+        "--gop",
+        type=float,
+        default=1.0,
+        help="Keyframe interval of the re-encoded video in seconds (default: 1.0)"
+    )
+
+    parser.add_argument(
+        "--crf",
+        type=int,
+        default=18,
+        help="x264 quality, lower is better (default: 18)"
+    )
+
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-encode even if the GOP is already short"
+    )
+
+    parser.add_argument(
+        "--analyze-only",
+        action="store_true",
+        help="Only print the GOP analysis"
+    )
+
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Measure random-seek latency before and after"
+    )
+
+    parser.add_argument(
+        "--seek-samples",
+        type=int,
+        default=20,
+        help="Random seeks per benchmark (default: 20)"
+    )
+
+    parser.add_argument(
+        "--report",
+        help="Write the analysis and benchmark results to this JSON file"
+    )
+
+    args = parser.parse_args()
+
+    if args.output and len(args.videos) > 1:
+        parser.error("--output can only be used with a single input video")
+
+    # Check FFmpeg installation
+    if not check_ffmpeg():
+        print("❌ Error: FFmpeg not found.")
+        print("Install FFmpeg: https://ffmpeg.org/download.html")
+        sys.exit(1)
+
+    for video in args.videos:
+        if not Path(video).exists():
+            print(f"❌ Error: Video file not found: {video}")
+            sys.exit(1)
+
+    report = {}
+    try:
+        for video in args.videos:
+            print(f"\n🔍 {video}")
+            before = analyze_gop(video)
+            print_gop("Before:", before)
+            entry = {"before": before}
+
+            if args.benchmark:
+                entry["seek_before"] = seek_latency(video, args.seek_samples)
+                print_seek("Before:", entry["seek_before"])
+
+            needs_reencode = (
+                args.force
+                or before["codec"] != "h264"
+                or before["max_interval"] > args.max_interval
+            )
+
+            if args.analyze_only:
+                verdict = "needs re-encode" if needs_reencode else "OK"
+                print(f"  {verdict} (threshold {args.max_interval:g}s)")
+            elif not needs_reencode:
+                print(f"  ✅ Already seek-friendly (keyframes every ≤ {args.max_interval:g}s), skipped")
+                if args.output:
+                    print("  (no output written)")
+            else:
+                output = args.output or video
+                reencode_short_gop(video, output, before["fps"], args.gop, before["audio_codec"], args.crf)
+                after = analyze_gop(output)
+                print_gop("After:", after)
+                entry["after"] = after
+
+                if args.benchmark:
+                    entry["seek_after"] = seek_latency(output, args.seek_samples)
+                    print_seek("After:", entry["seek_after"])
+                    speedup = entry["seek_before"]["median_ms"] / max(entry["seek_after"]["median_ms"], 0.1)
+                    print(f"  ⚡ Median seek {speedup:.1f}x faster")
+
+            report[video] = entry
+
+        if args.report:
+            Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+            print(f"\n💾 Report saved to: {args.report}")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
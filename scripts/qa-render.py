@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Check a rendered tutorial video in a single FFmpeg decode pass.
+
+After `npx remotion render`, the output is checked for black frames,
+silent gaps, frozen video, loudness and clipping, and for a duration
+that differs from the composition's durationInFrames. Instead of one
+tool run per check, this script decodes the video once with blackdetect
+and freezedetect on the video stream and silencedetect and ebur128 on
+the audio stream, all in one filter graph, and parses their logs into
+a JSON report.
+
+The expected duration is computed from the source videos the same way
+Root.tsx's calculateMetadata does, so each finding is also labelled
+with the scene it falls in.
+
+Requirements:
+    FFmpeg must be installed and in PATH
+
+Usage:
+    python qa-render.py out/video.mp4 [--host-video public/assets/host-video.mp4]
+                                      [--screen-recording public/assets/screen-recording.mp4]
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from instrumentation import add_profile_arguments, profiled_run, run_subprocess, span
+from media_utils import check_ffmpeg, probe_duration
+
+# Fixed scene lengths from Root.tsx's calculateMetadata
+BRAND_SCENE_SECONDS = 5
+SUBSCRIBE_SCENE_SECONDS = 5
+
+NUMBER = r"-?\d+(?:\.\d+)?(?:e[-+]?\d+)?"
+
+
+def expected_scenes(host_video: Optional[str], screen_recording: Optional[str], fps: int = 30) -> List[dict]:
+    """
+    Scene layout of the TutorialVideo composition.
+
+    Mirrors calculateMetadata: the intro and tutorial last
+    ceil(duration * fps) frames of their source videos (5s and 60s when a
+    video cannot be read), brand and subscribe 5 seconds each.
+    """
+    def source_frames(path, fallback_seconds):
+        if path and Path(path).exists():
+            return math.ceil(probe_duration(path) * fps)
+        return fallback_seconds * fps
+
+    scenes = []
+    start = 0
+    for name, frames in (
+        ("intro", source_frames(host_video, 5)),
+        ("brand", BRAND_SCENE_SECONDS * fps),
+        ("tutorial", source_frames(screen_recording, 60)),
+        ("subscribe", SUBSCRIBE_SCENE_SECONDS * fps),
+    ):
+        scenes.append({"name": name, "start_frame": start, "frames": frames})
+        start += frames
+    return scenes
+
+
+def scene_at(scenes: List[dict], seconds: float, fps: int) -> Optional[str]:
+    frame = int(seconds * fps)
+    for scene in scenes:
+        if scene["start_frame"] <= frame < scene["start_frame"] + scene["frames"]:
+            return scene["name"]
+    return None
+
+
+def probe_output(video_path: str) -> dict:
+    """Container duration plus video frame count and audio duration from ffprobe."""
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration:stream=codec_type,nb_frames,duration,avg_frame_rate",
+        "-of", "json",
+        video_path
+    ]
+    result = run_subprocess(cmd, capture_output=True, text=True, check=True)
+    info = json.loads(result.stdout)
+    streams = info.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    if video is None:
+        raise RuntimeError(f"No video stream in: {video_path}")
+
+    num, _, den = video.get("avg_frame_rate", "0/1").partition("/")
+    fps = float(num) / float(den) if float(den or 0) else 0.0
+    duration = float(info["format"]["duration"])
+    nb_frames = video.get("nb_frames")
+    return {
+        "duration": round(duration, 3),
+        "fps": round(fps, 3),
+        "frames": int(nb_frames) if nb_frames and nb_frames.isdigit() else round(duration * fps),
+        "video_duration": round(float(video.get("duration", duration)), 3),
+        "audio_duration": round(float(audio["duration"]), 3) if audio and audio.get("duration") else None,
+        "has_audio": audio is not None,
+    }
+
+
+def qa_filter_graph(has_audio: bool, min_black: float, black_threshold: float, min_freeze: float,
+                    silence_db: float, min_silence: float) -> str:
+    """One graph for every check: video and audio chains run in the same decode."""
+    graph = (
+        f"[0:v]blackdetect=d={min_black}:pix_th={black_threshold},"
+        f"freezedetect=n=-60dB:d={min_freeze}[v]"
+    )
+    if has_audio:
+        # framelog=verbose keeps the per-100ms meter lines out of the log; the summary stays
+        graph += (
+            f";[0:a]silencedetect=n={silence_db}dB:d={min_silence},"
+            "ebur128=peak=true:framelog=verbose[a]"
+        )
+    return graph
+
+
+def parse_intervals(log: str, name: str, end_of_file: float) -> List[dict]:
+    """
+    Pair <name>_start / <name>_end values from a detect filter's log.
+
+    An interval still open at the end of the file is closed there.
+    """
+    pattern = re.compile(rf"{name}_start:\s*(?P<start>{NUMBER})|{name}_end:\s*(?P<end>{NUMBER})")
+    intervals = []
+    start = None
+    for match in pattern.finditer(log):
+        if match.group("start") is not None:
+            start = max(0.0, float(match.group("start")))
+        elif start is not None:
+            end = float(match.group("end"))
+            intervals.append({"start": round(start, 3), "end": round(end, 3), "duration": round(end - start, 3)})
+            start = None
+    if start is not None:
+        intervals.append({"start": round(start, 3), "end": round(end_of_file, 3),
+                          "duration": round(end_of_file - start, 3)})
+    return intervals
+
+
+def parse_loudness(log: str) -> Optional[dict]:
+    """Integrated loudness, loudness range and true peak from the ebur128 summary."""
+    if "Summary:" not in log:
+        return None
+    summary = log.rpartition("Summary:")[2]
+    values = {}
+    for key, label in (("integrated_lufs", "I"), ("lra_lu", "LRA"), ("true_peak_dbtp", "Peak")):
+        match = re.search(rf"^\s*{label}:\s*({NUMBER}|-inf)", summary, re.MULTILINE)
+        values[key] = None if not match or match.group(1) == "-inf" else float(match.group(1))
+    return values
+
+
+def _in_scene(interval: dict) -> str:
+    return f" ({interval['scene']})" if interval.get("scene") else ""
+
+
+def run_qa(
+    video_path: str,
+    scenes: Optional[List[dict]],
+    fps: int = 30,
+    min_black: float = 0.5,
+    black_threshold: float = 0.10,
+    min_freeze: float = 10.0,
+    silence_db: float = -50.0,
+    min_silence: float = 3.0,
+    target_lufs: float = -16.0,
+    lufs_tolerance: float = 2.0,
+    max_peak: float = -1.0
+) -> dict:
+    """
+    Decode the video once with all detect filters and build the report.
+
+    Black frames, a wrong frame count and true peaks above max_peak are
+    errors; silence, freezes and loudness off target are warnings, since
+    a paused screen recording can legitimately be silent or still.
+    """
+    probe = probe_output(video_path)
+    graph = qa_filter_graph(probe["has_audio"], min_black, black_threshold, min_freeze, silence_db, min_silence)
+    cmd = [
+        "ffmpeg", "-hide_banner", "-nostats", "-loglevel", "info",
+        "-i", video_path,
+        "-filter_complex", graph,
+        "-map", "[v]",
+        *(["-map", "[a]"] if probe["has_audio"] else []),
+        "-f", "null", "-"
+    ]
+
+    started = time.perf_counter()
+    with span("qa:decode", file=Path(video_path).name):
+        result = run_subprocess(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg QA pass failed: {result.stderr[-2000:]}")
+    log = result.stderr
+
+    end = probe["duration"]
+    report = {
+        "video": str(video_path),
+        **probe,
+        "decode_seconds": round(time.perf_counter() - started, 2),
+        "black": parse_intervals(log, "black", end),
+        "freeze": parse_intervals(log, "freeze", end),
+        "silence": parse_intervals(log, "silence", end) if probe["has_audio"] else [],
+        "loudness": parse_loudness(log) if probe["has_audio"] else None,
+        "expected": None,
+        "issues": [],
+    }
+    issues = report["issues"]
+
+    def issue(severity, check, message):
+        issues.append({"severity": severity, "check": check, "message": message})
+
+    if scenes:
+        expected = sum(scene["frames"] for scene in scenes)
+        report["expected"] = {"frames": expected, "duration": round(expected / fps, 3), "scenes": scenes}
+        if probe["frames"] != expected:
+            issue("error", "duration", f"{probe['frames']} frames rendered, durationInFrames is {expected} "
+                                       f"({(probe['frames'] - expected) / fps:+.2f}s)")
+        for kind in ("black", "freeze", "silence"):
+            for interval in report[kind]:
+                interval["scene"] = scene_at(scenes, interval["start"], fps)
+
+    if probe["audio_duration"] is not None and abs(probe["audio_duration"] - probe["video_duration"]) > 1 / fps:
+        issue("warning", "duration", f"audio is {probe['audio_duration']:.2f}s, video {probe['video_duration']:.2f}s")
+
+    for interval in report["black"]:
+        issue("error", "black", f"black frames {interval['start']:.2f}-{interval['end']:.2f}s"
+                                f"{_in_scene(interval)}")
+    for interval in report["freeze"]:
+        issue("warning", "freeze", f"frozen video {interval['start']:.2f}-{interval['end']:.2f}s"
+                                   f"{_in_scene(interval)}")
+    for interval in report["silence"]:
+        issue("warning", "silence", f"silence {interval['start']:.2f}-{interval['end']:.2f}s"
+                                    f"{_in_scene(interval)}")
+
+    if not probe["has_audio"]:
+        issue("error", "audio", "no audio stream")
+    elif report["loudness"]:
+        loudness = report["loudness"]
+        peak = loudness["true_peak_dbtp"]
+        if peak is not None and peak > max_peak:
+            issue("error", "peak", f"true peak {peak:+.1f} dBTP exceeds {max_peak:+.1f} dBTP (clipping risk)")
+        integrated = loudness["integrated_lufs"]
+        if integrated is not None and abs(integrated - target_lufs) > lufs_tolerance:
+            issue("warning", "loudness", f"integrated loudness {integrated:.1f} LUFS, target {target_lufs:.0f} LUFS")
+
+    report["passed"] = not any(i["severity"] == "error" for i in issues)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check a rendered video for black frames, silence, freezes, loudness and duration",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Check the render against the source videos in public/assets
+  python qa-render.py out/video.mp4
+
+  # Explicit sources and a stricter silence threshold
+  python qa-render.py out/video.mp4 \\
+    --host-video public/assets/host-video.mp4 \\
+    --screen-recording public/assets/screen-recording.mp4 \\
+    --min-silence 1.5
+
+  # Known frame count (e.g. a custom composition)
+  python qa-render.py out/video.mp4 --expected-frames 5400
+
+Exit status is 1 when any error is found (black frames, wrong frame
+count, true peak over the limit), so it can gate a batch or CI run.
+        """
+    )
+
+    parser.add_argument(
+        "video",
+        help="Rendered video to check"
+    )
+
+    parser.add_argument(
+        "--host-video",
+        default="public/assets/host-video.mp4",
+        help="Intro source video (default: public/assets/host-video.mp4)"
+    )
+
+    parser.add_argument(
+        "--screen-recording",
+        default="public/assets/screen-recording.mp4",
+        help="Tutorial source video (default: public/assets/screen-recording.mp4)"
+    )
+
+    parser.add_argument(
+        "--expected-frames",
+        type=int,
+        help="Expected frame count instead of computing it from the source videos"
+    )
+
+    parser.add_argument(
+        "--fps",
+        type=int,
+        default=30,
+        help="Composition frame rate (default: 30)"
+    )
+
+    parser.add_argument(
+        "--min-black",
+        type=float,
+        default=0.5,
+        help="Report black stretches at least this long in seconds (default: 0.5)"
+    )
+
+    parser.add_argument(
+        "--min-freeze",
+        type=float,
+        default=10.0,
+        help="Report frozen video at least this long in seconds (default: 10)"
+    )
+
+    parser.add_argument(
+        "--min-silence",
+        type=float,
+        default=3.0,
+        help="Report silence at least this long in seconds (default: 3)"
+    )
+
+    parser.add_argument(
+        "--silence-db",
+        type=float,
+        default=-50.0,
+        help="Silence threshold in dB (default: -50)"
+    )
+
+    parser.add_argument(
+        "--target-lufs",
+        type=float,
+        default=-16.0,
+        help="Expected integrated loudness (default: -16, as normalize-audio.py)"
+    )
+
+    parser.add_argument(
+        "--max-peak",
+        type=float,
+        default=-1.0,
+        help="Highest allowed true peak in dBTP (default: -1.0)"
+    )
+
+    parser.add_argument(
+        "--report",
+        "-o",
+        help="Report path (default: <video>.qa.json next to the video)"
+    )
+
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    # Check FFmpeg installation
+    if not check_ffmpeg():
+        print("❌ Error: FFmpeg not found.")
+        print("Install FFmpeg: https://ffmpeg.org/download.html")
+        sys.exit(1)
+
+    video = Path(args.video)
+    if not video.exists():
+        print(f"❌ Error: File not found: {args.video}")
+        sys.exit(1)
+
+    report_path = Path(args.report) if args.report else video.with_name(f"{video.stem}.qa.json")
+
+    try:
+        with profiled_run(args):
+            if args.expected_frames:
+                scenes = [{"name": "composition", "start_frame": 0, "frames": args.expected_frames}]
+            else:
+                scenes = expected_scenes(args.host_video, args.screen_recording, args.fps)
+
+            print(f"🔍 Checking {args.video} (one decode pass)...")
+            report = run_qa(
+                args.video,
+                scenes,
+                fps=args.fps,
+                min_black=args.min_black,
+                min_freeze=args.min_freeze,
+                silence_db=args.silence_db,
+                min_silence=args.min_silence,
+                target_lufs=args.target_lufs,
+                max_peak=args.max_peak
+            )
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+    with report_path.open('w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"   {report['frames']} frames, {report['duration']:.2f}s, decoded in {report['decode_seconds']:.1f}s")
+    if report["expected"]:
+        print(f"   Expected {report['expected']['frames']} frames ({report['expected']['duration']:.2f}s)")
+    if report["loudness"]:
+        loudness = report["loudness"]
+        print(f"   Loudness {loudness['integrated_lufs']} LUFS, LRA {loudness['lra_lu']} LU, "
+              f"true peak {loudness['true_peak_dbtp']} dBTP")
+
+    for item in report["issues"]:
+        icon = "❌" if item["severity"] == "error" else "⚠️ "
+        print(f"  {icon} {item['check']}: {item['message']}")
+
+    print(f"\n💾 Report saved to: {report_path}")
+    if report["passed"]:
+        print("✅ QA passed" + (" with warnings" if report["issues"] else ""))
+    else:
+        print("❌ QA failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
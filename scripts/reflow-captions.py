@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Re-flow captions to fit the on-screen caption box.
+
+Whisper segments vary wildly in length, and long ones overflow the
+caption box in ScreenRecording.tsx. This script re-splits and merges
+segments from the word timestamps stored in captions.json so each
+caption fits a line width and reading speed. The model is never re-run:
+try different layout rules as often as you like.
+
+Usage:
+    python reflow-captions.py captions.json [--output captions.json] [--line-width 42] [--max-cps 18]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from caption_layout import layout_report, reflow_captions
+from media_utils import load_captions, save_captions
+
+
+def print_report(label: str, report: dict):
+    print(f"  {label:<7} {report['segments']:4d} captions, widest {report['widest']:3d} columns, "
+          f"{report['too_wide']} too wide, {report['too_fast']} too fast")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-split and merge captions to fit the caption box",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Re-flow in place with the defaults (one 42-column line, 18 columns/s)
+  python reflow-captions.py public/assets/captions.json
+
+  # Two lines of 32 columns, write to a new file
+  python reflow-captions.py captions.json --line-width 32 --max-lines 2 -o captions-2line.json
+
+  # Only report how many captions overflow
+  python reflow-captions.py captions.json --check
+
+Widths are display columns: a Chinese character counts 2, a Latin letter 1.
+The default 42 columns (21 Chinese characters) fits the 24px caption at
+80% of a 1920px frame with room to spare.
+        """
+    )
+
+    parser.add_argument(
+        "captions",
+        help="Captions JSON from generate-captions.py"
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Output JSON file path (default: overwrite the input)"
+    )
+
+    parser.add_argument(
+        "--line-width",
+        type=int,
+        default=42,
+        help="Caption line width in display columns (default: 42)"
+    )
+
+    parser.add_argument(
+        "--max-lines",
+        type=int,
+        default=1,
+        help="Lines a caption may wrap to (default: 1)"
+    )
+
+    parser.add_argument(
+        "--max-cps",
+        type=float,
+        default=18.0,
+        help="Maximum reading speed in display columns per second (default: 18)"
+    )
+
+    parser.add_argument(
+        "--min-duration",
+        type=float,
+        default=1.0,
+        help="Minimum time a caption stays on screen in seconds (default: 1.0)"
+    )
+
+    parser.add_argument(
+        "--max-gap",
+        type=float,
+        default=0.8,
+        help="Pauses longer than this always start a new caption (default: 0.8)"
+    )
+
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only report layout problems, do not write anything"
+    )
+
+    args = parser.parse_args()
+
+    if not Path(args.captions).exists():
+        print(f"❌ Error: Captions file not found: {args.captions}")
+        sys.exit(1)
+
+    try:
+        captions = load_captions(args.captions)
+        before = layout_report(captions, args.line_width, args.max_lines, args.max_cps)
+
+        if not any(seg.get("words") for seg in captions.get("segments", [])):
+            print("⚠️  No word timestamps found; captions can only be merged, not split")
+
+        print(f"📐 Layout: {args.max_lines} x {args.line_width} columns, ≤ {args.max_cps:g} columns/s")
+        print_report("Before:", before)
+
+        if args.check:
+            sys.exit(1 if before["too_wide"] or before["too_fast"] else 0)
+
+        reflowed = reflow_captions(
+            captions,
+            line_width=args.line_width,
+            max_lines=args.max_lines,
+            max_cps=args.max_cps,
+            min_duration=args.min_duration,
+            max_gap=args.max_gap
+        )
+        print_report("After:", layout_report(reflowed, args.line_width, args.max_lines, args.max_cps))
+
+        output = args.output or args.captions
+        save_captions(reflowed, output)
+        print(f"💾 Saved re-flowed captions to: {output}")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
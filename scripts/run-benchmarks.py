@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the tutorial video scripts.
+
+Generates synthetic fixtures locally with FFmpeg (lavfi sine/noise audio and
+testsrc video), runs each script stage against them in a child process and
+records wall time, peak RSS and throughput. Results are written to JSON so
+runs can be compared to catch performance regressions.
+
+Stages:
+    probe      - get-video-duration.py on the fixture video
+    normalize  - normalize-audio.py on the fixture video (needs pydub)
+    envelope   - audio-envelope.py on the fixture audio (needs numpy)
+    duck       - duck-music.py gain table for the fixture audio (needs numpy)
+    trimscan   - trim-silence.py --dry-run energy scan of the fixture audio
+    captions   - caption post-processing (load, OpenCC, shift, JSON write)
+    envcheck   - check-environment.py
+    startup    - cold start of each CLI (`--help`) plus a `python -X importtime`
+                 check that no heavy dependency is imported on that path
+
+Requirements:
+    FFmpeg must be installed and in PATH
+
+Usage:
+    python run-benchmarks.py [--sizes 1,10,60] [--stages probe,normalize] [--output results.json] [--compare old.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+STAGES = ["probe", "normalize", "envelope", "duck", "trimscan", "captions", "envcheck", "startup"]
+
+# Stages that do not need media fixtures
+FIXTURE_FREE_STAGES = {"startup"}
+
+# Stages that read the audio-only fixture, which is only generated for them
+AUDIO_STAGES = {"envelope", "duck", "trimscan"}
+
+# CLIs whose cold start is measured by the startup stage
+CLI_SCRIPTS = [
+    "generate-captions.py",
+    "normalize-audio.py",
+    "get-video-duration.py",
+    "check-environment.py",
+    "trim-silence.py",
+    "audio-envelope.py",
+    "duck-music.py",
+    "caption-worker.py",
+    "reflow-captions.py",
+    "export-subtitles.py",
+    "tune-whisper.py",
+    "sync-assets.py",
+    "prepare-video.py",
+    "prepare-pip.py",
+    "static-frames.py",
+    "qa-render.py",
+    "batch-render.py",
+    "job-queue.py",
+    "detect-chapters.py",
+    "optimize-images.py",
+    "align-captions.py",
+]
+
+# Modules that must never be imported just to print --help
+HEAVY_MODULES = ["faster_whisper", "ctranslate2", "onnxruntime", "tokenizers", "opencc", "pydub", "numpy"]
+
+# Average caption segment length used for synthetic caption fixtures
+SEGMENT_SECONDS = 3.0
+
+
+def generate_audio_fixture(path: Path, duration: int):
+    """Generate a sine + pink noise WAV fixture with FFmpeg lavfi."""
+    cmd = [
+        "ffmpeg", "-v", "error",
+        "-f", "lavfi", "-i", f"sine=frequency=220:sample_rate=48000:duration={duration}",
+        "-f", "lavfi", "-i", f"anoisesrc=color=pink:amplitude=0.05:sample_rate=48000:duration={duration}",
+        "-filter_complex", "amix=inputs=2:duration=shortest",
+        "-ac", "2",
+        "-y", str(path)
+    ]
+    subprocess.run(cmd, check=True, capture_output=True)
+
+
+def generate_video_fixture(path: Path, duration: int, size: str = "1280x720"):
+    """Generate a testsrc H.264 video fixture with sine audio."""
+    cmd = [
+        "ffmpeg", "-v", "error",
+        "-f", "lavfi", "-i", f"testsrc=size={size}:rate=30:duration={duration}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={duration}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-b:a", "128k",
+        "-shortest",
+        "-y", str(path)
+    ]
+    subprocess.run(cmd, check=True, capture_output=True)
+
+
+def generate_captions_fixture(path: Path, duration: int):
+    """Generate a synthetic captions.json with one segment every few seconds."""
+    segments = []
+    t = 0.0
+    seg_id = 0
+    while t + SEGMENT_SECONDS <= duration:
+        seg_id += 1
+        segments.append({
+            "id": seg_id,
+            "start": round(t + 0.2, 3),
+            "end": round(t + SEGMENT_SECONDS - 0.4, 3),
+            "text": "這個範例字幕用來測試後處理的效能",
+            "confidence": 0.9
+        })
+        t += SEGMENT_SECONDS
+
+    with path.open('w', encoding='utf-8') as f:
+        json.dump({"language": "zh", "segments": segments}, f, ensure_ascii=False, indent=2)
+
+
+def ensure_fixtures(fixtures_dir: Path, minutes: int, size: str, audio: bool = True) -> dict:
+    """Create (or reuse cached) fixtures for one duration; the WAV only if `audio`."""
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    duration = minutes * 60
+    fixtures = {
+        "duration": duration,
+        "audio": fixtures_dir / f"audio-{minutes}min.wav",
+        "video": fixtures_dir / f"video-{minutes}min.mp4",
+        "captions": fixtures_dir / f"captions-{minutes}min.json",
+    }
+
+    if audio and not fixtures["audio"].exists():
+        print(f"🎵 Generating {minutes}min audio fixture...")
+        generate_audio_fixture(fixtures["audio"], duration)
+    if not fixtures["video"].exists():
+        print(f"🎬 Generating {minutes}min video fixture...")
+        generate_video_fixture(fixtures["video"], duration, size)
+    if not fixtures["captions"].exists():
+        generate_captions_fixture(fixtures["captions"], duration)
+
+    return fixtures
+
+
+def run_measured(cmd: List[str], cwd: Optional[Path] = None, keep_stderr: bool = False) -> dict:
+    """
+    Run a command and measure wall time and peak RSS of that child.
+
+    Peak RSS is read from os.wait4() on POSIX; it is None elsewhere.
+    Stderr is only kept on failure unless keep_stderr is set.
+    """
+    # stderr goes to a file so a chatty child cannot block on a full pipe
+    with tempfile.TemporaryFile() as stderr_file:
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.DEVNULL, stderr=stderr_file)
+
+        peak_rss_mb = None
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(proc.pid, 0)
+            wall = time.perf_counter() - start
+            returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+            peak_rss_mb = round(usage.ru_maxrss / divisor, 1)
+        else:
+            returncode = proc.wait()
+            wall = time.perf_counter() - start
+
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode("utf-8", errors="ignore")
+
+    return {
+        "wall_s": round(wall, 3),
+        "peak_rss_mb": peak_rss_mb,
+        "returncode": returncode,
+        "stderr": stderr if keep_stderr else (stderr[-500:] if returncode != 0 else ""),
+    }
+
+
+def stage_command(stage: str, fixtures: dict, work_dir: Path) -> List[str]:
+    """Build the command line for one benchmark stage."""
+    python = sys.executable
+
+    if stage == "probe":
+        return [python, str(SCRIPTS_DIR / "get-video-duration.py"), str(fixtures["video"])]
+    if stage == "normalize":
+        return [
+            python, str(SCRIPTS_DIR / "normalize-audio.py"), str(fixtures["video"]),
+            "--output", str(work_dir / "normalized.mp4")
+        ]
+    if stage == "envelope":
+        return [
+            python, str(SCRIPTS_DIR / "audio-envelope.py"), str(fixtures["audio"]),
+            "--output-dir", str(work_dir)
+        ]
+    if stage == "duck":
+        return [
+            python, str(SCRIPTS_DIR / "duck-music.py"), str(fixtures["audio"]),
+            "--captions", str(fixtures["captions"]),
+            "--gain-table", str(work_dir / "music.gain.json")
+        ]
+    if stage == "trimscan":
+        return [
+            python, str(SCRIPTS_DIR / "trim-silence.py"), str(fixtures["audio"]),
+            "--dry-run", "--cuts-output", str(work_dir / "cuts.json")
+        ]
+    if stage == "captions":
+        return [
+            python, str(Path(__file__).resolve()), "--worker", "captions",
+            str(fixtures["captions"]), str(work_dir / "captions-out.json")
+        ]
+    if stage == "envcheck":
+        return [
+            python, str(SCRIPTS_DIR / "check-environment.py"),
+            "--skip-remotion-check", "--skip-caption-check"
+        ]
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def captions_worker(captions_path: str, output_path: str):
+    """
+    Caption post-processing workload, run in a child process.
+
+    Mirrors what happens after transcription: Traditional → Simplified
+    conversion, timestamp shifting and the JSON write.
+    """
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    from media_utils import load_captions, save_captions, speech_intervals
+
+    try:
+        import opencc
+        converter = opencc.OpenCC('t2s')
+    except ImportError:
+        converter = None
+
+    data = load_captions(captions_path)
+    for seg in data["segments"]:
+        if converter:
+            seg["text"] = converter.convert(seg["text"])
+        seg["start"] = round(seg["start"] * 0.98, 3)
+        seg["end"] = round(seg["end"] * 0.98, 3)
+    speech_intervals(data, merge_gap=0.5)
+    save_captions(data, output_path)
+
+
+def parse_importtime(stderr: str) -> dict:
+    """
+    Parse `python -X importtime` output.
+
+    Returns:
+        Dictionary with total self import time (ms), the imported module
+        names and the heaviest top-level imports by cumulative time
+    """
+    total_us = 0
+    modules = []
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            total_us += int(self_us)
+        except ValueError:
+            continue
+        module = name.strip()
+        modules.append(module)
+        # Top-level imports have exactly one space of indentation
+        if name.startswith(" ") and not name.startswith("  "):
+            top_level.append((module, int(cumulative_us)))
+
+    heaviest = sorted(top_level, key=lambda item: -item[1])[:5]
+    return {
+        "import_ms": round(total_us / 1000, 1),
+        "modules": modules,
+        "heaviest": [{"module": m, "cumulative_ms": round(us / 1000, 1)} for m, us in heaviest],
+    }
+
+
+def run_startup_checks(repeat: int) -> List[dict]:
+    """Measure cold start of every CLI and check --help imports nothing heavy."""
+    results = []
+    print("🚀 CLI cold start (--help):")
+
+    for script in CLI_SCRIPTS:
+        script_path = SCRIPTS_DIR / script
+        if not script_path.exists():
+            continue
+
+        cmd = [sys.executable, str(script_path), "--help"]
+        runs = [run_measured(cmd) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r["wall_s"])
+
+        traced = run_measured([sys.executable, "-X", "importtime", str(script_path), "--help"], keep_stderr=True)
+        imports = parse_importtime(traced["stderr"])
+        heavy = sorted({
+            module.split(".")[0] for module in imports["modules"]
+            if module.split(".")[0] in HEAVY_MODULES
+        })
+
+        result = {
+            "stage": "startup",
+            "fixture": script,
+            "media_seconds": 0,
+            "wall_s": best["wall_s"],
+            "peak_rss_mb": best["peak_rss_mb"],
+            "throughput_x": None,
+            "returncode": best["returncode"],
+            "import_ms": imports["import_ms"],
+            "heaviest_imports": imports["heaviest"],
+            "heavy_imports": heavy,
+        }
+        results.append(result)
+
+        status = "✅" if best["returncode"] == 0 and not heavy else "❌"
+        print(f"  {status} {script:<24} {best['wall_s'] * 1000:>7.0f} ms  (imports {imports['import_ms']:.0f} ms)")
+        if heavy:
+            print(f"     ⚠️  --help imports heavy modules: {', '.join(heavy)}")
+
+    print()
+    return results
+
+
+def run_suite(sizes: List[int], stages: List[str], fixtures_dir: Path, repeat: int, size: str) -> List[dict]:
+    """Run every stage against every fixture size."""
+    results = []
+    if "startup" in stages:
+        results.extend(run_startup_checks(repeat))
+
+    fixture_stages = [stage for stage in stages if stage not in FIXTURE_FREE_STAGES]
+    if not fixture_stages:
+        return results
+
+    work_dir = fixtures_dir / "work"
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    for minutes in sizes:
+        fixtures = ensure_fixtures(fixtures_dir, minutes, size, audio=bool(AUDIO_STAGES & set(fixture_stages)))
+
+        for stage in fixture_stages:
+            cmd = stage_command(stage, fixtures, work_dir)
+            runs = [run_measured(cmd) for _ in range(repeat)]
+            best = min(runs, key=lambda r: r["wall_s"])
+
+            media_seconds = 0 if stage == "envcheck" else fixtures["duration"]
+            result = {
+                "stage": stage,
+                "fixture": f"{minutes}min",
+                "media_seconds": media_seconds,
+                "wall_s": best["wall_s"],
+                "peak_rss_mb": max((r["peak_rss_mb"] or 0) for r in runs) or None,
+                "throughput_x": round(media_seconds / best["wall_s"], 1) if media_seconds and best["wall_s"] else None,
+                "returncode": best["returncode"],
+            }
+            if best["returncode"] != 0:
+                result["error"] = best["stderr"]
+
+            results.append(result)
+            status = "✅" if best["returncode"] == 0 else "❌"
+            rate = f"{result['throughput_x']}x realtime" if result["throughput_x"] else "-"
+            print(
+                f"  {status} {stage:<10} {minutes:>3}min  "
+                f"{result['wall_s']:>8.2f}s  {result['peak_rss_mb'] or 0:>7.1f} MB  {rate}"
+            )
+
+    return results
+
+
+def compare_results(current: List[dict], previous_path: str, threshold: float) -> bool:
+    """
+    Print per-stage wall time deltas against a previous results file.
+
+    Returns:
+        True if any stage regressed by more than threshold percent
+    """
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+    baseline = {(r["stage"], r["fixture"]): r for r in previous.get("results", [])}
+
+    print(f"\n📊 Comparison with {previous_path}:")
+    regressed = False
+    for result in current:
+        old = baseline.get((result["stage"], result["fixture"]))
+        if not old or not old.get("wall_s"):
+            continue
+        delta = (result["wall_s"] - old["wall_s"]) / old["wall_s"] * 100
+        flag = ""
+        if delta > threshold:
+            flag = "  ⚠️  REGRESSION"
+            regressed = True
+        print(f"  {result['stage']:<10} {result['fixture']:>6}  {old['wall_s']:>8.2f}s → {result['wall_s']:>8.2f}s  ({delta:+.1f}%){flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the tutorial video scripts on synthetic fixtures",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Quick run on the 1-minute fixtures
+  python run-benchmarks.py --sizes 1
+
+  # Full run, saving results
+  python run-benchmarks.py --output bench/results.json
+
+  # Cold-start / import-time regression check only
+  python run-benchmarks.py --stages startup
+
+  # Compare against a previous run (exit code 1 on regression)
+  python run-benchmarks.py --sizes 1,10 --compare bench/baseline.json
+
+Fixtures are cached in --fixtures-dir and reused between runs.
+        """
+    )
+
+    parser.add_argument(
+        "--sizes",
+        default="1,10,60",
+        help="Fixture durations in minutes, comma separated (default: 1,10,60)"
+    )
+
+    parser.add_argument(
+        "--stages",
+        default=",".join(STAGES),
+        help=f"Stages to run, comma separated (default: {','.join(STAGES)})"
+    )
+
+    parser.add_argument(
+        "--fixtures-dir",
+        default=".bench/fixtures",
+        help="Directory for cached fixtures (default: .bench/fixtures)"
+    )
+
+    parser.add_argument(
+        "--resolution",
+        default="1280x720",
+        help="Fixture video resolution (default: 1280x720)"
+    )
+
+    parser.add_argument(
+        "--repeat",
+        "-r",
+        type=int,
+        default=1,
+        help="Runs per stage; the fastest is reported (default: 1)"
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        default=".bench/results.json",
+        help="Results JSON path (default: .bench/results.json)"
+    )
+
+    parser.add_argument(
+        "--compare",
+        help="Previous results JSON to compare against"
+    )
+
+    parser.add_argument(
+        "--regression-threshold",
+        type=float,
+        default=10.0,
+        help="Wall time increase in percent treated as a regression (default: 10)"
+    )
+
+    parser.add_argument(
+        "--worker",
+        nargs="+",
+        help=argparse.SUPPRESS
+    )
+
+    args = parser.parse_args()
+
+    if args.worker:
+        task, *task_args = args.worker
+        if task == "captions":
+            captions_worker(*task_args)
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        print(f"❌ Error: Unknown stages: {', '.join(sorted(unknown))}")
+        return 1
+
+    print(f"🏁 Running benchmarks: stages={','.join(stages)} sizes={args.sizes}min\n")
+
+    try:
+        results = run_suite(sizes, stages, Path(args.fixtures_dir), args.repeat, args.resolution)
+    except subprocess.CalledProcessError as e:
+        print(f"\n❌ Error generating fixtures (is FFmpeg installed?): {e}")
+        return 1
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+    output_file = Path(args.output)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with output_file.open('w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Results saved to: {args.output}")
+
+    if any(r.get("heavy_imports") for r in results):
+        print("❌ Import regression: a CLI imports heavy dependencies on --help")
+        return 1
+    if args.compare and compare_results(results, args.compare, args.regression_threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
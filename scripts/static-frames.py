@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Map the static stretches of a screen recording, frame by frame.
+
+Screen recordings are mostly static: long stretches where nothing
+changes but the caption text. This script decodes the recording at low
+resolution and at the composition frame rate, diffs consecutive frames
+with NumPy, and writes a run-length map of visually identical spans.
+Spans are also split wherever the caption shown by ScreenRecording
+changes, so every frame in a span renders identically. A render driver
+can then render the first frame of each span once and hold it for the
+span's length with FFmpeg instead of rendering every frame.
+
+The map only covers the recording and the captions. The PIP overlay
+animates in "live" and "asset" mode (glow pulse, online indicator), so
+spans are only valid for rendering with pipMode "baked". The first
+--intro-frames frames are always kept separate for the entry animations.
+
+Output (next to the recording unless --output is given):
+    <name>.static.json  - {"fps", "frames", "spans": [[start, length], ...], "stats"}
+
+Requirements:
+    pip install numpy
+    FFmpeg must be installed and in PATH
+
+Usage:
+    python static-frames.py public/assets/screen-recording.mp4 [--captions public/assets/captions.json]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from media_utils import check_ffmpeg, load_captions, require_numpy, stream_video_frames
+
+
+def frame_differs(frames, reference, tolerance: int, min_pixels: int):
+    """True per frame where more than min_pixels pixels differ from reference by more than tolerance."""
+    np = require_numpy()
+    diff = np.abs(frames.astype(np.int16) - reference.astype(np.int16))
+    # Sum over the pixel axes (reshape(len, -1) fails on an empty slice)
+    return (diff > tolerance).sum(axis=tuple(range(1, diff.ndim))) > min_pixels
+
+
+class StaticFrameDetector:
+    """
+    Flag the frames that start a new visual span, one block at a time.
+
+    Each frame is compared with the previous one in a single vectorized
+    diff. Slow fades and scrolling can change less than the tolerance per
+    frame, so frames are also compared with the first frame of their
+    span, and the span is split where they drift apart.
+    """
+
+    def __init__(self, tolerance: int = 8, min_pixels: int = 2):
+        self.tolerance = tolerance
+        self.min_pixels = min_pixels
+        self.previous = None
+        self.reference = None
+        self.blocks = []
+
+    def feed(self, block):
+        np = require_numpy()
+        prior = np.concatenate([block[:1] if self.previous is None else self.previous[None], block[:-1]])
+        changed = frame_differs(block, prior, self.tolerance, self.min_pixels)
+        if self.reference is None:
+            changed[0] = True
+
+        i = 0
+        while i < len(block):
+            if changed[i]:
+                self.reference = block[i]
+            following = np.flatnonzero(changed[i + 1:])
+            end = i + 1 + following[0] if len(following) else len(block)
+            # A span carried over from the previous block checks its first frame too
+            start = i + 1 if changed[i] else i
+            drift = np.flatnonzero(frame_differs(block[start:end], self.reference, self.tolerance, self.min_pixels))
+            if len(drift):
+                i = start + drift[0]
+                changed[i] = True
+            else:
+                i = end
+
+        self.previous = block[-1]
+        self.blocks.append(changed)
+
+    def changes(self):
+        np = require_numpy()
+        return np.concatenate(self.blocks) if self.blocks else np.zeros(0, dtype=bool)
+
+
+def caption_ids(segments, frames: int, fps: float):
+    """
+    Index of the caption ScreenRecording shows on each frame (-1 for none).
+
+    Mirrors getCurrentCaption(): the first caption with
+    start <= frame / fps <= end (end defaults to start + 5).
+    """
+    np = require_numpy()
+    times = np.arange(frames) / fps
+    ids = np.full(frames, -1, dtype=np.int32)
+    # Assign in reverse so the first matching caption wins, like Array.find
+    for index in range(len(segments) - 1, -1, -1):
+        seg = segments[index]
+        start = seg["start"]
+        end = seg.get("end") or start + 5
+        lo = np.searchsorted(times, start, side="left")
+        hi = np.searchsorted(times, end, side="right")
+        ids[lo:hi] = index
+    return ids
+
+
+def static_spans(changes, captions=None, intro_frames: int = 0):
+    """
+    Run-length map of identical frames.
+
+    Returns:
+        Tuple of (spans as [[start, length], ...], frames split only by captions)
+    """
+    np = require_numpy()
+    frames = len(changes)
+    boundaries = changes.copy()
+    boundaries[:min(intro_frames, frames)] = True
+    caption_splits = 0
+    if captions is not None:
+        caption_change = np.concatenate([[True], captions[1:] != captions[:-1]])
+        caption_splits = int((caption_change & ~boundaries).sum())
+        boundaries |= caption_change
+    if frames:
+        boundaries[0] = True
+
+    starts = np.flatnonzero(boundaries)
+    lengths = np.diff(np.append(starts, frames))
+    return [[int(s), int(n)] for s, n in zip(starts, lengths)], caption_splits
+
+
+def analyze_recording(
+    video_path: str,
+    captions_path: str = None,
+    fps: float = 30,
+    size=(240, 135),
+    tolerance: int = 8,
+    min_pixels: int = 2,
+    intro_frames: int = 30
+) -> dict:
+    """
+    Decode the recording once and build its static-span map.
+
+    Args:
+        video_path: Screen recording
+        captions_path: captions.json shown over the recording (None to ignore captions)
+        fps: Composition frame rate
+        size: Analysis resolution (width, height)
+        tolerance: Per-pixel difference (0-255) still treated as identical
+        min_pixels: Changed pixels a frame may have and still be identical
+        intro_frames: Leading frames always rendered individually
+
+    Returns:
+        The map dictionary written to <name>.static.json
+    """
+    np = require_numpy()
+
+    detector = StaticFrameDetector(tolerance, min_pixels)
+    print(f"🎞️  Decoding frames from: {video_path} ({size[0]}x{size[1]} @ {fps}fps)")
+    for block in stream_video_frames(video_path, size[0], size[1], fps):
+        detector.feed(block)
+    changes = detector.changes()
+    frames = len(changes)
+
+    ids = None
+    if captions_path:
+        ids = caption_ids(load_captions(captions_path).get("segments", []), frames, fps)
+    spans, caption_splits = static_spans(changes, ids, intro_frames)
+
+    lengths = np.array([n for _, n in spans]) if spans else np.zeros(0, dtype=int)
+    return {
+        "source": Path(video_path).name,
+        "captions": Path(captions_path).name if captions_path else None,
+        "fps": fps,
+        "frames": frames,
+        "analysis_size": list(size),
+        "tolerance": tolerance,
+        "min_pixels": min_pixels,
+        "intro_frames": intro_frames,
+        "spans": spans,
+        "stats": {
+            "spans": len(spans),
+            "video_changes": int(changes.sum()),
+            "caption_splits": caption_splits,
+            "static_frames": int(lengths[lengths > 1].sum()) if len(lengths) else 0,
+            "longest_span": int(lengths.max()) if len(lengths) else 0,
+            "reduction": round(frames / max(1, len(spans)), 2),
+        },
+    }
+
+
+def parse_size(value: str):
+    width, _, height = value.lower().partition("x")
+    try:
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write a run-length map of visually identical frames in a screen recording",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Map the recording, split at the captions next to it
+  python static-frames.py public/assets/screen-recording.mp4
+
+  # Captions burned in later with export-subtitles.py: ignore them
+  python static-frames.py public/assets/screen-recording.mp4 --captions none
+
+  # Stricter detection (catches a 1px cursor move at full resolution)
+  python static-frames.py public/assets/screen-recording.mp4 --size 480x270 --tolerance 4
+
+Notes:
+  Frame numbers are relative to the screen-recording Sequence. Render with
+  pipMode "baked" (see prepare-pip.py): the live PIP animates every frame.
+        """
+    )
+
+    parser.add_argument(
+        "video",
+        help="Screen recording to analyze"
+    )
+
+    parser.add_argument(
+        "--captions",
+        help="Captions shown over the recording, or 'none' (default: captions.json next to the video)"
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Map path (default: <video>.static.json next to the video)"
+    )
+
+    parser.add_argument(
+        "--fps",
+        type=int,
+        default=30,
+        help="Composition frame rate (default: 30)"
+    )
+
+    parser.add_argument(
+        "--size",
+        type=parse_size,
+        default=(240, 135),
+        help="Analysis resolution (default: 240x135)"
+    )
+
+    parser.add_argument(
+        "--tolerance",
+        type=int,
+        default=8,
+        help="Per-pixel difference (0-255) treated as compression noise (default: 8)"
+    )
+
+    parser.add_argument(
+        "--min-pixels",
+        type=int,
+        default=2,
+        help="Changed pixels allowed in an identical frame (default: 2)"
+    )
+
+    parser.add_argument(
+        "--intro-frames",
+        type=int,
+        default=30,
+        help="Leading frames always rendered individually (default: 30, the PIP entry)"
+    )
+
+    args = parser.parse_args()
+
+    # Check FFmpeg installation
+    if not check_ffmpeg():
+        print("❌ Error: FFmpeg not found.")
+        print("Install FFmpeg: https://ffmpeg.org/download.html")
+        sys.exit(1)
+
+    video = Path(args.video)
+    if not video.exists():
+        print(f"❌ Error: File not found: {args.video}")
+        sys.exit(1)
+
+    if args.captions is None:
+        default = video.with_name("captions.json")
+        captions = str(default) if default.exists() else None
+    elif args.captions.lower() == "none":
+        captions = None
+    else:
+        captions = args.captions
+        if not Path(captions).exists():
+            print(f"❌ Error: File not found: {captions}")
+            sys.exit(1)
+
+    output = Path(args.output) if args.output else video.with_name(f"{video.stem}.static.json")
+
+    try:
+        result = analyze_recording(
+            args.video,
+            captions,
+            fps=args.fps,
+            size=args.size,
+            tolerance=args.tolerance,
+            min_pixels=args.min_pixels,
+            intro_frames=args.intro_frames
+        )
+
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with output.open('w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, separators=(",", ":"))
+
+        stats = result["stats"]
+        print(f"📊 {result['frames']} frames -> {stats['spans']} spans "
+              f"({stats['video_changes']} visual changes, {stats['caption_splits']} caption splits)")
+        print(f"   {stats['static_frames']} frames in static spans, longest {stats['longest_span']} frames "
+              f"({stats['longest_span'] / args.fps:.1f}s)")
+        print(f"⚡ Rendering one frame per span: {stats['reduction']:.1f}x fewer frames")
+        print(f"💾 Map saved to: {output}")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Subtitle writers for captions.json.
+
+Converts the captions data consumed by the Remotion components into
+SRT, WebVTT and ASS. The ASS style mirrors the caption layer in
+ScreenRecording.tsx (bold white 24px PingFang SC with a black outline,
+80px above the bottom, at most 80% of the frame wide) so a video with
+burned-in subtitles looks the same as one rendered with the React layer.
+"""
+
+import re
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Remotion composition size (assets/templates/Root.tsx)
+FRAME_WIDTH = 1920
+FRAME_HEIGHT = 1080
+
+
+def shift_segments(segments: List[dict], offset: float) -> List[dict]:
+    """Move segments onto the final video timeline (e.g. after intro and brand scenes)."""
+    if not offset:
+        return segments
+    return [
+        {**seg, "start": round(seg["start"] + offset, 3), "end": round(seg["end"] + offset, 3)}
+        for seg in segments
+    ]
+
+
+def _split_time(seconds: float, unit: int):
+    total = int(round(max(0.0, seconds) * unit))
+    hours, rest = divmod(total, 3600 * unit)
+    minutes, rest = divmod(rest, 60 * unit)
+    secs, fraction = divmod(rest, unit)
+    return hours, minutes, secs, fraction
+
+
+def srt_timestamp(seconds: float) -> str:
+    """00:01:02,345"""
+    return "%02d:%02d:%02d,%03d" % _split_time(seconds, 1000)
+
+
+def vtt_timestamp(seconds: float) -> str:
+    """00:01:02.345"""
+    return "%02d:%02d:%02d.%03d" % _split_time(seconds, 1000)
+
+
+def ass_timestamp(seconds: float) -> str:
+    """0:01:02.34 (centiseconds)"""
+    return "%d:%02d:%02d.%02d" % _split_time(seconds, 100)
+
+
+def _cues(segments: List[dict]):
+    for seg in segments:
+        text = seg["text"].strip()
+        if text and seg["end"] > seg["start"]:
+            yield seg, text
+
+
+def to_srt(segments: List[dict]) -> str:
+    """Render segments as SubRip."""
+    blocks = []
+    for index, (seg, text) in enumerate(_cues(segments), start=1):
+        blocks.append(f"{index}\n{srt_timestamp(seg['start'])} --> {srt_timestamp(seg['end'])}\n{text}\n")
+    return "\n".join(blocks)
+
+
+def to_vtt(segments: List[dict]) -> str:
+    """Render segments as WebVTT."""
+    blocks = ["WEBVTT\n"]
+    for seg, text in _cues(segments):
+        text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        blocks.append(f"{vtt_timestamp(seg['start'])} --> {vtt_timestamp(seg['end'])}\n{text}\n")
+    return "\n".join(blocks)
+
+
+def to_ass(
+    segments: List[dict],
+    font: str = "PingFang SC",
+    font_size: int = 24,
+    margin_bottom: int = 88
+) -> str:
+    """
+    Render segments as Advanced SubStation Alpha, styled like the React captions.
+
+    Args:
+        segments: Caption segments
+        font: Font family (libass falls back through fontconfig if missing)
+        font_size: Font size in frame pixels
+        margin_bottom: Distance of the text baseline box from the bottom edge
+    """
+    side_margin = FRAME_WIDTH // 10  # maxWidth: 80%
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {FRAME_WIDTH}",
+        f"PlayResY: {FRAME_HEIGHT}",
+        "WrapStyle: 0",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, "
+        "Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+        f"Style: Default,{font},{font_size},&H00FFFFFF,&H00FFFFFF,&H00000000,&H80000000,"
+        f"-1,0,0,0,100,100,0,0,1,1.5,0,2,{side_margin},{side_margin},{margin_bottom},1",
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+    for seg, text in _cues(segments):
+        text = text.replace("\\", "\\\\").replace("{", "\\{").replace("}", "\\}").replace("\n", "\\N")
+        lines.append(f"Dialogue: 0,{ass_timestamp(seg['start'])},{ass_timestamp(seg['end'])},Default,,0,0,0,,{text}")
+    return "\n".join(lines) + "\n"
+
+
+FORMATS: Dict[str, Callable[[List[dict]], str]] = {
+    "srt": to_srt,
+    "vtt": to_vtt,
+    "ass": to_ass,
+}
+
+
+def write_subtitles(captions: dict, output_path: str, fmt: str, offset: float = 0.0) -> int:
+    """
+    Write captions to a subtitle file.
+
+    Args:
+        captions: Captions data with a "segments" list
+        output_path: Destination file
+        fmt: One of FORMATS
+        offset: Seconds added to every timestamp
+
+    Returns:
+        Number of cues written
+    """
+    segments = shift_segments(captions.get("segments", []), offset)
+    output_file = Path(output_path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    output_file.write_text(FORMATS[fmt](segments), encoding="utf-8")
+    return sum(1 for _ in _cues(segments))
+
+
+def escape_filter_path(path: str) -> str:
+    """
+    Escape a file path for use as an FFmpeg filter option value.
+
+    Two levels apply: the option value (\\ : ') and the filtergraph
+    (\\ ' [ ] , ;). Windows separators are turned into forward slashes.
+    """
+    value = re.sub(r"([\\:'])", r"\\\1", path.replace("\\", "/"))
+    return re.sub(r"([\\'\[\],;])", r"\\\1", value)
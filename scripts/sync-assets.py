@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Set up a project's public/assets from a shared content-addressed store.
+
+Copying multi-GB recordings into every project's public/assets is slow
+and doubles disk use. This script hashes each source once into a shared
+store and links it into public/assets with a reflink or hard link (plain
+copy only as a last resort). Sources whose size and mtime are unchanged
+are not re-hashed, and assets that are already in place are skipped.
+
+Usage:
+    python sync-assets.py host-video.mp4=/path/to/host.mp4 screen-recording.mp4=/path/to/rec.mp4 [--defaults]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from asset_store import DEFAULT_STORE, AssetStore, sync_assets
+
+# Default logo/avatar/music shipped with the skill
+EXAMPLE_DIR = Path(__file__).resolve().parent.parent / "assets" / "example"
+DEFAULT_ASSETS = {
+    "logo.jpg": EXAMPLE_DIR / "logo.jpg",
+    "avatar.jpg": EXAMPLE_DIR / "avatar.jpg",
+    "music.mp3": EXAMPLE_DIR / "music.mp3",
+}
+
+
+def parse_source(spec: str):
+    """Parse NAME=PATH (or just PATH, named after the file)."""
+    name, sep, path = spec.partition("=")
+    if not sep:
+        return Path(spec).name, Path(spec)
+    return name, Path(path)
+
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Link assets into public/assets through a shared content-addressed store",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Link recordings (already H.264) and the default logo/avatar/music
+  python sync-assets.py \\
+    host-video.mp4=/path/to/host.mp4 \\
+    screen-recording.mp4=/path/to/recording.mp4 \\
+    --defaults
+
+  # Another project, same recordings: nothing is hashed or copied again
+  python sync-assets.py host-video.mp4=/path/to/host.mp4 --project ../other-project
+
+  # Re-hash everything to check the store and project files
+  python sync-assets.py screen-recording.mp4=/path/to/recording.mp4 --verify
+
+Notes:
+  Hard-linked assets are read-only because they share data with the store.
+  Write converted or processed files to a new name (e.g. with -trimmed.mp4)
+  instead of overwriting them in place. Keep the store on the same volume
+  as your projects, otherwise files are copied instead of linked.
+        """
+    )
+
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        metavar="NAME=PATH",
+        help="Asset name in public/assets and its source file (or just PATH to keep the file name)"
+    )
+
+    parser.add_argument(
+        "--project",
+        "-p",
+        default=".",
+        help="Remotion project directory (default: current directory)"
+    )
+
+    parser.add_argument(
+        "--store",
+        default=str(DEFAULT_STORE),
+        help=f"Shared store directory (default: $ASSET_STORE or {DEFAULT_STORE})"
+    )
+
+    parser.add_argument(
+        "--defaults",
+        action="store_true",
+        help="Also link the example logo, avatar and music when not given"
+    )
+
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Re-hash sources and project files even if size and mtime match"
+    )
+
+    args = parser.parse_args()
+
+    sources = dict(parse_source(spec) for spec in args.sources)
+    if args.defaults:
+        for name, path in DEFAULT_ASSETS.items():
+            sources.setdefault(name, path)
+
+    if not sources:
+        parser.error("no assets given (pass NAME=PATH arguments or --defaults)")
+
+    for name, path in sources.items():
+        if not path.is_file():
+            print(f"❌ Error: File not found: {path} (for {name})")
+            sys.exit(1)
+
+    assets_dir = Path(args.project) / "public" / "assets"
+    print(f"📦 Store: {args.store}")
+    print(f"📁 Project assets: {assets_dir}")
+
+    started = time.time()
+    try:
+        report = sync_assets(sources, assets_dir, AssetStore(Path(args.store)), verify=args.verify)
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+    icons = {"unchanged": "✔️ ", "reflink": "🔗", "hardlink": "🔗", "copy": "📄"}
+    for name, entry in report.items():
+        hashed = ", hashed" if entry["hashed"] else ""
+        print(f"  {icons[entry['action']]} {name:<24} {entry['action']:<9} {format_size(entry['size']):>10}  "
+              f"{entry['sha256'][:12]}{hashed}")
+
+    total = sum(entry["size"] for entry in report.values())
+    copied = sum(entry["size"] for entry in report.values() if entry["action"] == "copy")
+    print(f"\n✅ {len(report)} assets ({format_size(total)}) ready in {time.time() - started:.1f}s, "
+          f"{format_size(copied)} copied")
+    if copied:
+        print("⚠️  Some files were copied: this filesystem supports neither reflinks nor hard links "
+              "between the store and the project")
+
+
+if __name__ == "__main__":
+    main()
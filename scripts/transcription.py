@@ -0,0 +1,881 @@
+#!/usr/bin/env python3
+"""
+Transcription core shared by generate-captions.py and the caption worker.
+
+Wraps faster-whisper transcription and converts the result into the
+captions.json layout consumed by the Remotion components.
+
+Requirements:
+    pip install faster-whisper
+    pip install opencc-python-reimplemented  (optional, Traditional → Simplified)
+"""
+
+import hashlib
+import importlib.util
+import json
+import math
+import os
+import platform
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from instrumentation import count, count_file_bytes, current_rss_mb, peak_rss_mb, span
+from media_utils import CaptionStreamWriter, require_numpy, save_captions, stream_audio
+
+# Sample rate faster-whisper expects for in-memory audio
+WHISPER_SAMPLE_RATE = 16000
+
+# Language detection looks at one Whisper window of audio
+LANGUAGE_PROBE_SECONDS = 30.0
+
+# Detections at or above this probability are trusted and cached
+LANGUAGE_CONFIDENCE = 0.8
+
+# CPU compute types offered on the command line (CTranslate2 names)
+COMPUTE_TYPES = ["int8", "int8_float32", "int8_float16", "int16", "float16", "float32"]
+
+# Settings used when no tuning profile exists (see tune-whisper.py)
+DEFAULT_SETTINGS = {"compute_type": "int8", "cpu_threads": 0, "num_workers": 1}
+
+# Where tune-whisper.py saves the fastest settings for this host;
+# WHISPER_TUNING_PROFILE overrides the path ("none" disables tuning)
+CACHE_DIR = Path.home() / ".cache" / "remotion-tutorial-video"
+DEFAULT_TUNING_PROFILE = CACHE_DIR / "whisper-tuning.json"
+
+# Default language caches live here, one per output directory, so they never
+# land in public/ (Remotion would bundle them into every render)
+LANGUAGE_CACHE_DIR = CACHE_DIR / "languages"
+
+# Decode options of every production transcription; tune-whisper.py
+# benchmarks with the same ones so its speed figures carry over
+TRANSCRIBE_OPTIONS = {"beam_size": 5, "vad_filter": True, "word_timestamps": True}
+
+# Windowed transcription: audio is read in blocks of this many seconds,
+# windows never shrink below MIN_WINDOW_SECONDS, and a segment ending
+# closer than WINDOW_CUT_GUARD to the cut is left to the next window.
+STREAM_BLOCK_SECONDS = 10.0
+MIN_WINDOW_SECONDS = 30.0
+WINDOW_CUT_GUARD = 0.5
+
+# Rough resident cost of one second of window audio (samples, features
+# and decoder temporaries), used to size windows under --max-memory
+WINDOW_MB_PER_SECOND = 0.25
+
+# Refined captions shorter than this after clipping to their window are dropped
+MIN_REFINED_SECONDS = 0.2
+
+# Heavy dependencies (faster-whisper pulls in ctranslate2, tokenizers and
+# onnxruntime) are imported lazily so --help and early exits stay fast.
+FASTER_WHISPER_AVAILABLE = importlib.util.find_spec("faster_whisper") is not None
+OPENCC_AVAILABLE = importlib.util.find_spec("opencc") is not None
+
+_opencc_converter = None
+
+
+def load_whisper_model_class():
+    """Import faster-whisper on first use and return WhisperModel."""
+    with span("import:faster_whisper"):
+        from faster_whisper import WhisperModel
+    return WhisperModel
+
+
+def get_opencc_converter():
+    """Create the Traditional → Simplified converter once and reuse it."""
+    global _opencc_converter
+    if _opencc_converter is None:
+        with span("import:opencc"):
+            import opencc
+            _opencc_converter = opencc.OpenCC('t2s')  # Traditional to Simplified
+    return _opencc_converter
+
+
+def tuning_profile_path() -> Optional[Path]:
+    """Path of the active tuning profile, or None when tuning is disabled."""
+    override = os.environ.get("WHISPER_TUNING_PROFILE")
+    if override:
+        return None if override.lower() == "none" else Path(override)
+    return DEFAULT_TUNING_PROFILE
+
+
+def profile_host_mismatch(profile: dict) -> Optional[str]:
+    """Why a tuning profile was measured on another machine, or None if it matches this one."""
+    cores = os.cpu_count() or 1
+    if "cpu_count" in profile and profile["cpu_count"] != cores:
+        return f"tuned for {profile['cpu_count']} CPUs, this machine has {cores}"
+    if "host" in profile and profile["host"] != platform.node():
+        return f"tuned on {profile['host']}, this is {platform.node()}"
+    return None
+
+
+_ignored_profiles = set()
+
+
+def load_tuning_profile(path: Optional[Path] = None) -> dict:
+    """
+    Read a tuning profile written by tune-whisper.py.
+
+    Returns {} if the profile is missing or unreadable, or was tuned on
+    another host (a shared home directory must not carry one machine's
+    thread and worker counts to another).
+    """
+    path = path or tuning_profile_path()
+    if not path or not path.exists():
+        return {}
+    try:
+        with path.open('r', encoding='utf-8') as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        print(f"Warning: ignoring unreadable tuning profile: {path}")
+        return {}
+    mismatch = profile_host_mismatch(profile)
+    if mismatch:
+        if path not in _ignored_profiles:
+            _ignored_profiles.add(path)
+            print(f"Warning: ignoring tuning profile {path} ({mismatch}); re-run tune-whisper.py here")
+        return {}
+    return profile
+
+
+def tuned_settings(model_size: str, concurrent: bool = False) -> dict:
+    """
+    CPU settings for a model size from the tuning profile.
+
+    Args:
+        model_size: Whisper model size
+        concurrent: Return the throughput-tuned settings for serving
+                    several jobs at once instead of single-job latency
+
+    Returns:
+        Dictionary with compute_type, cpu_threads and num_workers
+    """
+    settings = dict(DEFAULT_SETTINGS)
+    tuned = load_tuning_profile().get("models", {}).get(model_size)
+    if tuned:
+        settings.update({key: tuned[key] for key in DEFAULT_SETTINGS if key in tuned})
+        if concurrent and "concurrent" in tuned:
+            settings.update({key: tuned["concurrent"][key] for key in DEFAULT_SETTINGS if key in tuned["concurrent"]})
+    return settings
+
+
+def load_model(
+    model_size: str = "base",
+    compute_type: Optional[str] = None,
+    cpu_threads: Optional[int] = None,
+    num_workers: Optional[int] = None,
+    concurrent: bool = False
+):
+    """
+    Load a WhisperModel on CPU.
+
+    Settings left as None come from the tuning profile for this model
+    size (see tune-whisper.py), falling back to int8 with CTranslate2's
+    default thread count and a single worker.
+
+    Args:
+        model_size: Whisper model size (tiny, base, small, medium, large)
+        compute_type: Computation type (int8, int8_float32, float32, ...)
+        cpu_threads: Intra-op threads per worker (0 = CTranslate2 default)
+        num_workers: Transcriptions the model can run in parallel
+        concurrent: Prefer the tuning profile's multi-job settings
+
+    Returns:
+        faster_whisper.WhisperModel instance
+    """
+    settings = tuned_settings(model_size, concurrent)
+    for key, value in (("compute_type", compute_type), ("cpu_threads", cpu_threads), ("num_workers", num_workers)):
+        if value is not None:
+            settings[key] = value
+
+    WhisperModel = load_whisper_model_class()
+
+    with span("model_load", model=model_size, **settings):
+        return WhisperModel(
+            model_size,
+            device="cpu",
+            **settings
+        )
+
+
+def convert_traditional_to_simplified(text: str) -> str:
+    """Convert Traditional Chinese to Simplified Chinese using OpenCC."""
+    if not OPENCC_AVAILABLE:
+        return text
+    try:
+        return get_opencc_converter().convert(text)
+    except Exception as e:
+        print(f"Warning: OpenCC conversion failed: {e}")
+        return text
+
+
+def is_chinese(language: Optional[str]) -> bool:
+    """True for zh, zh-CN, zh-TW and friends."""
+    return bool(language and language.lower().startswith("zh"))
+
+
+class LanguageCache:
+    """
+    Detected languages per source file, plus the language of the batch.
+
+    Sources are keyed by absolute path, size and mtime, so an edited file is
+    detected again. Once a file in the batch is detected with high
+    confidence, its language is remembered as the batch language. When
+    path is given the cache is also persisted as JSON.
+    """
+
+    @staticmethod
+    def default_path(output_path: str) -> Path:
+        """Cache file for captions written to output_path's directory (outside the project)."""
+        directory = os.path.abspath(os.path.dirname(output_path) or ".")
+        digest = hashlib.sha256(directory.encode("utf-8")).hexdigest()[:16]
+        return LANGUAGE_CACHE_DIR / f"{digest}.json"
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._data: Dict[str, dict] = {"sources": {}, "batch": None}
+        if self.path and self.path.exists():
+            try:
+                with self.path.open('r', encoding='utf-8') as f:
+                    self._data.update(json.load(f))
+            except (OSError, ValueError):
+                pass
+
+    @staticmethod
+    def source_key(media_path: str) -> str:
+        stat = os.stat(media_path)
+        return f"{os.path.abspath(media_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def get(self, media_path: str) -> Optional[dict]:
+        """Return the cached {"language", "probability"} for a source, if any."""
+        with self._lock:
+            return self._data["sources"].get(self.source_key(media_path))
+
+    @property
+    def batch_language(self) -> Optional[dict]:
+        with self._lock:
+            return self._data["batch"]
+
+    def put(self, media_path: str, language: str, probability: float):
+        """Record a high-confidence detection for a source and the batch."""
+        entry = {"language": language, "probability": round(probability, 4)}
+        with self._lock:
+            self._data["sources"][self.source_key(media_path)] = entry
+            self._data["batch"] = entry
+            if self.path:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(self._data, ensure_ascii=False, indent=2), encoding='utf-8')
+                os.replace(tmp, self.path)
+
+
+def detect_language(model, audio, probe_seconds: float = LANGUAGE_PROBE_SECONDS) -> Tuple[str, float]:
+    """
+    Detect the spoken language from a short probe window.
+
+    The probe starts at the first non-silent audio so long intros of
+    silence do not skew the result.
+
+    Args:
+        model: WhisperModel instance
+        audio: Float32 samples at 16 kHz
+        probe_seconds: Length of the probe window in seconds
+
+    Returns:
+        Tuple of (language code, probability)
+    """
+    np = require_numpy()
+
+    loud = np.flatnonzero(np.abs(audio) > 0.01)
+    start = int(loud[0]) if len(loud) else 0
+    clip = audio[start:start + int(probe_seconds * WHISPER_SAMPLE_RATE)]
+
+    with span("language_detect", seconds=len(clip) / WHISPER_SAMPLE_RATE):
+        if hasattr(model, "detect_language"):
+            language, probability, _ = model.detect_language(audio=clip)
+        else:
+            # Older faster-whisper: transcribe() detects eagerly; segments stay unconsumed
+            _, info = model.transcribe(clip, language=None, beam_size=1)
+            language, probability = info.language, info.language_probability
+    return language, probability
+
+
+def resolve_language(
+    model,
+    media_path: str,
+    audio,
+    language: str = "auto",
+    cache: Optional[LanguageCache] = None,
+    threshold: float = LANGUAGE_CONFIDENCE
+) -> Tuple[Optional[str], Optional[float], str]:
+    """
+    Decide which language to transcribe with.
+
+    Explicit languages are used as-is. With "auto", a cached detection for
+    the same file skips detection; otherwise a probe window is classified
+    and trusted if its probability reaches threshold. If the probe is
+    unsure but the batch already has a confident language, the batch
+    language is used.
+
+    Returns:
+        Tuple of (language or None to let Whisper decide, probability, source),
+        where source is one of "argument", "cache", "probe", "batch", "whisper"
+    """
+    if language != "auto":
+        return language, None, "argument"
+
+    cached = cache.get(media_path) if cache else None
+    if cached:
+        return cached["language"], cached["probability"], "cache"
+
+    detected, probability = detect_language(model, audio)
+    if probability >= threshold:
+        if cache:
+            cache.put(media_path, detected, probability)
+        return detected, probability, "probe"
+
+    batch = cache.batch_language if cache else None
+    if batch:
+        return batch["language"], probability, "batch"
+
+    return None, probability, "whisper"
+
+
+def print_language(language: Optional[str], probability: Optional[float], source: str):
+    """Log the outcome of resolve_language()."""
+    if source == "argument":
+        print(f"🌐 Language: {language}")
+    elif source == "whisper":
+        print(f"🌐 Language probe unsure (probability: {probability:.2f}), letting Whisper decide")
+    else:
+        print(f"🌐 Language: {language} (probability: {probability:.2f}, from {source})")
+
+
+def segment_confidence(segment) -> float:
+    """
+    Estimate how trustworthy a transcribed segment is, from 0 to 1.
+
+    Combines the average token probability (exp of avg_logprob) with the
+    mean word probability as a geometric mean. When Whisper also thinks
+    the window is probably not speech (no_speech_prob > 0.6, its own
+    silence rule), the score is scaled down by (1 - no_speech_prob).
+    """
+    token_prob = min(1.0, math.exp(getattr(segment, "avg_logprob", 0.0)))
+
+    words = getattr(segment, "words", None) or []
+    if words:
+        word_prob = sum(word.probability for word in words) / len(words)
+        confidence = math.sqrt(token_prob * word_prob)
+    else:
+        confidence = token_prob
+
+    no_speech_prob = getattr(segment, "no_speech_prob", 0.0)
+    if no_speech_prob > 0.6:
+        confidence *= 1.0 - no_speech_prob
+
+    return round(max(0.0, min(1.0, confidence)), 4)
+
+
+def segment_to_caption(
+    segment,
+    caption_id: int,
+    convert_to_simplified: bool = False,
+    offset: float = 0.0
+) -> dict:
+    """
+    Convert a faster-whisper segment into a caption dict.
+
+    Args:
+        segment: faster-whisper Segment
+        caption_id: 1-based caption id
+        convert_to_simplified: Run OpenCC Traditional → Simplified conversion
+        offset: Seconds added to the timestamps (for clips cut from the source)
+
+    Returns:
+        Caption dictionary in captions.json layout
+    """
+    text = segment.text.strip()
+    words = getattr(segment, "words", None) or []
+
+    # Convert Traditional Chinese to Simplified Chinese if enabled
+    if convert_to_simplified:
+        with span("opencc"):
+            text = convert_traditional_to_simplified(text)
+
+    caption = {
+        "id": caption_id,
+        "start": round(segment.start + offset, 3),
+        "end": round(segment.end + offset, 3),
+        "text": text,
+        "confidence": segment_confidence(segment),
+        "avg_logprob": round(getattr(segment, "avg_logprob", 0.0), 4),
+        "no_speech_prob": round(getattr(segment, "no_speech_prob", 0.0), 4)
+    }
+
+    if words:
+        caption["words"] = [
+            {
+                "start": round(word.start + offset, 3),
+                "end": round(word.end + offset, 3),
+                "word": convert_traditional_to_simplified(word.word) if convert_to_simplified else word.word,
+                "probability": round(word.probability, 4)
+            }
+            for word in words
+        ]
+
+    return caption
+
+
+def generate_captions(
+    video_path: str,
+    output_path: str = "captions.json",
+    model_size: str = "base",
+    language: str = "auto",
+    compute_type: Optional[str] = None,
+    convert_to_simplified: bool = True,
+    model=None,
+    on_segment: Optional[Callable[[dict], None]] = None,
+    language_cache: Optional[LanguageCache] = None
+) -> dict:
+    """
+    Generate captions from video file.
+
+    Args:
+        video_path: Path to video file
+        output_path: Path to output JSON file
+        model_size: Whisper model size (tiny, base, small, medium, large)
+        language: Language code (en, es, zh, fr, etc.) or 'auto' for auto-detect
+        compute_type: Computation type (default: tuning profile or int8)
+        convert_to_simplified: Convert Traditional Chinese to Simplified (default: True)
+        model: Already loaded WhisperModel to reuse (default: load model_size)
+        on_segment: Callback invoked with each caption as it is produced
+        language_cache: Detected languages shared across a batch (auto only)
+
+    Returns:
+        Dictionary with caption segments
+    """
+    # Initialize Whisper model
+    if model is None:
+        print(f"🎬 Loading model: {model_size}")
+        model = load_model(model_size, compute_type)
+
+    print(f"🎵 Processing audio from: {video_path}")
+    count_file_bytes("bytes_read", video_path)
+
+    # Decode once; the same samples feed language detection and transcription
+    audio = decode_whisper_audio(video_path)
+
+    chosen, probability, source = resolve_language(model, video_path, audio, language, language_cache)
+    print_language(chosen, probability, source)
+
+    # Transcribe audio (runs VAD; inference is lazy)
+    with span("decode_vad"):
+        segments, info = model.transcribe(
+            audio,
+            language=chosen,
+            **TRANSCRIBE_OPTIONS
+        )
+    count("audio_seconds", info.duration)
+
+    detected_lang = chosen or info.language
+    if source == "whisper" and language_cache and info.language_probability >= LANGUAGE_CONFIDENCE:
+        language_cache.put(video_path, info.language, info.language_probability)
+
+    # Convert to Remotion caption format
+    captions = []
+    segment_count = 0
+
+    # Decide on the detected language, so auto-detected Chinese is converted too
+    convert = convert_to_simplified and is_chinese(detected_lang)
+
+    with span("inference"):
+        for segment in segments:
+            segment_count += 1
+            caption = segment_to_caption(segment, segment_count, convert)
+            captions.append(caption)
+            if on_segment:
+                on_segment(caption)
+            print(f"  [{segment_count}] {caption['start']:.2f}s - {caption['end']:.2f}s: {caption['text']}")
+
+    print(f"\n📝 Language: {detected_lang}")
+    print(f"✅ Generated {len(captions)} caption segments")
+
+    # Prepare output data
+    output_data = {
+        "language": detected_lang,
+        "segments": captions
+    }
+
+    # Write to JSON file
+    with span("json_write"):
+        save_captions(output_data, output_path)
+    count_file_bytes("bytes_written", output_path)
+
+    print(f"💾 Saved captions to: {output_path}")
+
+    return output_data
+
+
+def generate_captions_windowed(
+    video_path: str,
+    output_path: str = "captions.json",
+    model_size: str = "base",
+    language: str = "auto",
+    compute_type: Optional[str] = None,
+    convert_to_simplified: bool = True,
+    model=None,
+    window: float = 300.0,
+    overlap: float = 15.0,
+    max_memory_mb: Optional[float] = None,
+    language_cache: Optional[LanguageCache] = None
+) -> dict:
+    """
+    Generate captions with bounded memory, one audio window at a time.
+
+    Audio is streamed from FFmpeg, so only the current window (plus the
+    overlap carried over from the previous one) is held in memory, and
+    captions are written to the output as they are produced instead of
+    being collected first. Windows overlap so a sentence cut at a window
+    boundary is transcribed whole by the next window; captions already
+    written from the overlap are skipped.
+
+    With max_memory_mb, the window is sized to fit the budget left after
+    the model is loaded, halved whenever resident memory goes over the
+    limit, and the run stops with an error if even the smallest window
+    does not fit, instead of being OOM-killed.
+
+    Args:
+        video_path: Path to video file
+        output_path: Path to output JSON file
+        model_size: Whisper model size (tiny, base, small, medium, large)
+        language: Language code or 'auto' to detect from the first window
+        compute_type: Computation type (default: tuning profile or int8)
+        convert_to_simplified: Convert Traditional Chinese to Simplified
+        model: Already loaded WhisperModel to reuse (default: load model_size)
+        window: Window length in seconds
+        overlap: Seconds shared by consecutive windows
+        max_memory_mb: Resident memory limit in MB (default: unlimited)
+        language_cache: Detected languages shared across a batch (auto only)
+
+    Returns:
+        Summary dictionary with language, segments, windows and peak_rss_mb
+    """
+    np = require_numpy()
+
+    if model is None:
+        print(f"🎬 Loading model: {model_size}")
+        model = load_model(model_size, compute_type)
+
+    if max_memory_mb:
+        baseline = current_rss_mb()
+        if baseline is not None:
+            if baseline >= max_memory_mb:
+                raise RuntimeError(f"Model alone uses {baseline:.0f} MB, over the {max_memory_mb:.0f} MB limit; "
+                                   f"try a smaller model or --compute-type int8")
+            fitting = (max_memory_mb - baseline) / WINDOW_MB_PER_SECOND - overlap
+            window = max(MIN_WINDOW_SECONDS, min(window, fitting))
+            print(f"🧮 Memory limit {max_memory_mb:.0f} MB (model {baseline:.0f} MB): {window:.0f}s windows")
+
+    print(f"🎵 Streaming audio from: {video_path} ({window:.0f}s windows, {overlap:.0f}s overlap)")
+    count_file_bytes("bytes_read", video_path)
+
+    sample_rate = WHISPER_SAMPLE_RATE
+    blocks = stream_audio(video_path, STREAM_BLOCK_SECONDS, sample_rate)
+    tail = np.zeros(0, dtype=np.float32)
+    position = 0.0  # End of the audio read so far, in seconds
+    last_end = 0.0  # End of the last caption written
+    writer = None
+    chosen = None
+    convert = False
+    caption_count = 0
+    window_count = 0
+    exhausted = False
+    lookahead = next(blocks, None)
+
+    try:
+        while not exhausted:
+            pending = []
+            pending_samples = 0
+            while lookahead is not None and pending_samples < window * sample_rate:
+                pending.append(lookahead)
+                pending_samples += len(lookahead)
+                lookahead = next(blocks, None)
+            # Peek ahead so the last window is known as such even when it fills exactly
+            exhausted = lookahead is None
+            if not pending:
+                break
+
+            audio = np.concatenate([tail, *pending])
+            del pending
+            window_start = position - len(tail) / sample_rate
+            window_end = position + pending_samples / sample_rate
+            window_count += 1
+
+            if writer is None:
+                chosen, probability, source = resolve_language(model, video_path, audio, language, language_cache)
+                print_language(chosen, probability, source)
+
+            with span("window", start=window_start, end=window_end):
+                segments, info = model.transcribe(
+                    audio,
+                    language=chosen,
+                    **TRANSCRIBE_OPTIONS
+                )
+
+                if writer is None:
+                    # Later windows reuse the first window's language
+                    if chosen is None:
+                        chosen = info.language
+                        if language_cache and info.language_probability >= LANGUAGE_CONFIDENCE:
+                            language_cache.put(video_path, chosen, info.language_probability)
+                    convert = convert_to_simplified and is_chinese(chosen)
+                    writer = CaptionStreamWriter(output_path, chosen)
+
+                carry_from = window_end - overlap
+                written = 0
+                for segment in segments:
+                    start = segment.start + window_start
+                    end = segment.end + window_start
+                    if (start + end) / 2 < last_end:
+                        continue  # Already written from the previous window's overlap
+                    if not exhausted and end > window_end - WINDOW_CUT_GUARD and start > window_start:
+                        # Possibly cut off: carry audio back to its start so the next window has it whole
+                        carry_from = min(carry_from, start)
+                        break
+                    caption_count += 1
+                    caption = segment_to_caption(segment, caption_count, convert, offset=window_start)
+                    writer.write(caption)
+                    last_end = caption["end"]
+                    written += 1
+
+            position = window_end
+            carry = int(round((window_end - carry_from) * sample_rate))
+            tail = audio[len(audio) - carry:] if carry > 0 and not exhausted else tail[:0]
+            del audio, segments
+
+            rss = current_rss_mb()
+            rss_note = f", RSS {rss:.0f} MB" if rss is not None else ""
+            print(f"  [window {window_count}] {window_start:8.1f}s - {window_end:8.1f}s: "
+                  f"{written} segments{rss_note}")
+
+            if max_memory_mb and rss is not None and rss > max_memory_mb:
+                if window <= MIN_WINDOW_SECONDS:
+                    raise RuntimeError(f"Resident memory {rss:.0f} MB exceeds the {max_memory_mb:.0f} MB limit "
+                                       f"even with {MIN_WINDOW_SECONDS:.0f}s windows")
+                window = max(MIN_WINDOW_SECONDS, window / 2)
+                print(f"⚠️  Over the memory limit, shrinking windows to {window:.0f}s")
+
+        if writer is None:
+            raise RuntimeError(f"No audio decoded from: {video_path}")
+        writer.close()
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        blocks.close()
+        raise
+
+    count("caption_segments", caption_count)
+    count_file_bytes("bytes_written", output_path)
+
+    peak = peak_rss_mb()
+    print(f"\n📝 Language: {chosen}")
+    print(f"✅ Generated {caption_count} caption segments in {window_count} windows")
+    if peak is not None:
+        print(f"📊 Peak RSS: {peak:.0f} MB" + (f" (limit {max_memory_mb:.0f} MB)" if max_memory_mb else ""))
+    print(f"💾 Saved captions to: {output_path}")
+
+    return {
+        "language": chosen,
+        "segments": caption_count,
+        "windows": window_count,
+        "peak_rss_mb": round(peak, 1) if peak is not None else None,
+    }
+
+
+def caption_confidence(caption: dict) -> float:
+    """
+    Confidence of a stored caption.
+
+    Files written before confidence was computed from avg_logprob stored
+    no_speech_prob in this field, which is inverted; such captions score 0
+    so they are always re-checked.
+    """
+    if "avg_logprob" not in caption:
+        return 0.0
+    return caption.get("confidence", 0.0)
+
+
+def low_confidence_windows(
+    segments: List[dict],
+    threshold: float,
+    score: Callable[[dict], float] = caption_confidence,
+    max_gap: float = 0.5
+) -> List[Tuple[float, float, List[int]]]:
+    """
+    Group consecutive low-confidence captions into re-transcription windows.
+
+    Args:
+        segments: Caption segments
+        threshold: Captions scoring below this are re-transcribed
+        score: Function returning a 0-1 confidence for a caption
+        max_gap: Adjacent low-confidence captions closer than this are merged
+
+    Returns:
+        List of (start, end, segment indices) windows
+    """
+    windows = []
+    for i, seg in enumerate(segments):
+        if score(seg) >= threshold:
+            continue
+        if windows and windows[-1][2][-1] == i - 1 and seg["start"] - windows[-1][1] <= max_gap:
+            start, _, indices = windows[-1]
+            windows[-1] = (start, seg["end"], indices + [i])
+        else:
+            windows.append((seg["start"], seg["end"], [i]))
+    return windows
+
+
+def refine_captions(
+    captions: dict,
+    audio,
+    model,
+    threshold: float,
+    score: Callable[[dict], float] = caption_confidence,
+    beam_size: int = 5,
+    convert_to_simplified: bool = True,
+    padding: float = 0.3
+) -> Tuple[dict, dict]:
+    """
+    Re-transcribe only low-confidence windows and splice the results in.
+
+    A window's new captions replace the old ones only if their mean score
+    is higher; otherwise the originals are kept and the window is counted
+    as rejected.
+
+    Args:
+        captions: Captions data with "language" and "segments"
+        audio: Full source audio as float32 samples at 16 kHz
+        model: WhisperModel used for the refinement pass
+        threshold: Captions scoring below this are re-transcribed
+        score: Function returning a 0-1 confidence for a caption
+        beam_size: Beam size for the refinement pass
+        convert_to_simplified: Run OpenCC on refined Chinese text
+        padding: Seconds of audio context added on each side of a window
+
+    Returns:
+        Tuple of (refined captions, stats dictionary)
+    """
+    segments = captions["segments"]
+    language = captions.get("language")
+    convert = convert_to_simplified and is_chinese(language)
+    windows = low_confidence_windows(segments, threshold, score)
+
+    replacements = {}
+    rejected = 0
+    refined_seconds = 0.0
+    total_seconds = len(audio) / WHISPER_SAMPLE_RATE
+
+    for start, end, indices in windows:
+        clip_start = max(0.0, start - padding)
+        clip_end = min(total_seconds, end + padding)
+        clip = audio[int(clip_start * WHISPER_SAMPLE_RATE):int(clip_end * WHISPER_SAMPLE_RATE)]
+        refined_seconds += clip_end - clip_start
+
+        with span("refine_window", start=start, end=end):
+            new_segments, _ = model.transcribe(
+                clip,
+                language=language,
+                beam_size=beam_size,
+                vad_filter=False,
+                word_timestamps=True,
+                condition_on_previous_text=False
+            )
+            new_captions = [
+                segment_to_caption(seg, 0, convert, offset=clip_start)
+                for seg in new_segments
+                if seg.text.strip()
+            ]
+
+        # Captions heard only in the padding belong to the neighbours: drop them rather
+        # than clamping them into zero-length or duplicate captions at the window edge
+        kept = []
+        for caption in new_captions:
+            if not start <= (caption["start"] + caption["end"]) / 2 <= end:
+                continue
+            # Keep refined captions inside the original window so neighbours never overlap
+            caption["start"] = round(min(max(caption["start"], start), end), 3)
+            caption["end"] = round(min(max(caption["end"], caption["start"]), end), 3)
+            if caption["end"] - caption["start"] < MIN_REFINED_SECONDS:
+                continue
+            caption["refined"] = True
+            kept.append(caption)
+
+        if not kept:
+            continue
+
+        # A recheck can come out worse: only splice it in if it scores higher on average
+        old_score = sum(score(segments[i]) for i in indices) / len(indices)
+        new_score = sum(score(caption) for caption in kept) / len(kept)
+        if new_score <= old_score:
+            rejected += 1
+            continue
+        replacements[indices[0]] = (indices, kept)
+
+    merged = []
+    skip = set()
+    for i, seg in enumerate(segments):
+        if i in skip:
+            continue
+        if i in replacements:
+            indices, new_captions = replacements[i]
+            skip.update(indices)
+            merged.extend(new_captions)
+        else:
+            merged.append(seg)
+
+    for caption_id, caption in enumerate(merged, start=1):
+        caption["id"] = caption_id
+
+    count("refined_audio_seconds", refined_seconds)
+    stats = {
+        "windows": len(windows),
+        "replaced_segments": sum(len(indices) for indices, _ in replacements.values()),
+        "rejected_windows": rejected,
+        "refined_seconds": round(refined_seconds, 2),
+        "audio_seconds": round(total_seconds, 2),
+    }
+    return {**captions, "segments": merged}, stats
+
+
+def decode_whisper_audio(video_path: str):
+    """Decode a media file to 16 kHz mono float32 with faster-whisper's decoder."""
+    with span("decode_audio"):
+        from faster_whisper import decode_audio
+        return decode_audio(video_path, sampling_rate=WHISPER_SAMPLE_RATE)
+
+
+def synthetic_clip(seconds: float, seed: int = 0):
+    """
+    Build a deterministic speech-like clip: voiced syllables at ~4 Hz.
+
+    Each syllable is a gliding harmonic tone with a noise burst, shaped by
+    a raised-cosine envelope and separated by short pauses, so the encoder
+    and decoder see realistic work without shipping an audio fixture.
+    """
+    np = require_numpy()
+
+    rng = np.random.default_rng(seed)
+    sr = WHISPER_SAMPLE_RATE
+    audio = np.zeros(int(seconds * sr), dtype=np.float32)
+    pos = 0
+    while pos < len(audio):
+        length = int(rng.uniform(0.12, 0.3) * sr)
+        t = np.arange(length) / sr
+        f0 = rng.uniform(110, 220) * (1 + 0.2 * t / t[-1])
+        phase = 2 * np.pi * np.cumsum(f0) / sr
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+        syllable = (voiced + 0.3 * rng.standard_normal(length)) * np.hanning(length)
+        end = min(len(audio), pos + length)
+        audio[pos:end] = 0.2 * syllable[: end - pos]
+        pos = end + int(rng.uniform(0.03, 0.25) * sr)
+    return audio
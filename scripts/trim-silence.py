@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+Detect and cut dead air from screen recordings.
+
+Long pauses in a screen recording inflate TUTORIAL_DURATION, and render
+time grows linearly with the number of frames. This script finds silences
+longer than a threshold, removes them in a single FFmpeg pass and shifts
+the caption timestamps so they stay in sync with the trimmed video.
+Cut edges are snapped to the recording's own frame timestamps (which
+need not be evenly spaced in variable frame rate screen recordings), so
+each kept span is exactly as long in video as in audio and captions.
+
+Silences are detected either from the caption segments (which come from
+faster-whisper's VAD-filtered transcription) or from a vectorized audio
+energy scan when no captions are available.
+
+Requirements:
+    pip install numpy
+    FFmpeg must be installed and in PATH
+
+Usage:
+    python trim-silence.py <video-file> [--captions captions.json] [--min-silence 1.0] [--output trimmed.mp4]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import List, Tuple
+
+from instrumentation import run_subprocess
+from media_utils import (
+    check_ffmpeg,
+    decode_audio,
+    load_captions,
+    probe_duration,
+    require_numpy,
+    save_captions,
+    speech_intervals,
+)
+
+Interval = Tuple[float, float]
+
+
+def detect_silences_from_energy(
+    video_path: str,
+    threshold_db: float = -40.0,
+    window: float = 0.02,
+    sample_rate: int = 16000
+) -> List[Interval]:
+    """
+    Find silent spans with a vectorized RMS energy scan.
+
+    Args:
+        video_path: Path to input video
+        threshold_db: Windows quieter than this (dBFS) count as silence
+        window: Analysis window length in seconds
+        sample_rate: Decode sample rate in Hz
+
+    Returns:
+        List of (start, end) silent spans in seconds
+    """
+    np = require_numpy()
+
+    print(f"🎵 Scanning audio energy (threshold {threshold_db} dBFS)...")
+    samples = decode_audio(video_path, sample_rate=sample_rate)
+
+    win = max(1, int(sample_rate * window))
+    count = len(samples) // win
+    if count == 0:
+        return []
+
+    frames = samples[: count * win].reshape(count, win)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    db = 20.0 * np.log10(rms + 1e-10)
+
+    # Run boundaries of the silent mask
+    silent = np.concatenate(([False], db < threshold_db, [False]))
+    edges = np.flatnonzero(np.diff(silent.astype(np.int8)))
+    starts, ends = edges[0::2], edges[1::2]
+
+    return [(s * win / sample_rate, e * win / sample_rate) for s, e in zip(starts, ends)]
+
+
+def detect_silences_from_captions(captions: dict, duration: float) -> List[Interval]:
+    """
+    Derive silent spans from the gaps between caption segments.
+
+    Args:
+        captions: Captions data with a "segments" list
+        duration: Total media duration in seconds
+
+    Returns:
+        List of (start, end) silent spans in seconds
+    """
+    silences = []
+    cursor = 0.0
+    for start, end in speech_intervals(captions):
+        if start > cursor:
+            silences.append((cursor, start))
+        cursor = max(cursor, end)
+    if duration > cursor:
+        silences.append((cursor, duration))
+    return silences
+
+
+def build_cut_list(
+    silences: List[Interval],
+    min_silence: float,
+    padding: float
+) -> List[Interval]:
+    """
+    Turn silent spans into cuts, keeping some padding around speech.
+
+    Args:
+        silences: Silent spans in seconds
+        min_silence: Only silences at least this long are cut
+        padding: Seconds of silence kept on each side of a cut
+
+    Returns:
+        Sorted, non-overlapping list of (start, end) cuts in seconds
+    """
+    cuts = []
+    for start, end in silences:
+        if end - start < min_silence:
+            continue
+        cut_start, cut_end = start + padding, end - padding
+        if cut_end > cut_start:
+            cuts.append((round(cut_start, 3), round(cut_end, 3)))
+    return cuts
+
+
+def probe_streams(video_path: str) -> dict:
+    """Whether the file has video and audio streams, and the container start time."""
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=start_time:stream=codec_type",
+        "-of", "json",
+        video_path
+    ]
+    result = run_subprocess(cmd, capture_output=True, text=True, check=True)
+    info = json.loads(result.stdout)
+    types = {stream.get("codec_type") for stream in info.get("streams", [])}
+    start = info.get("format", {}).get("start_time", "0")
+    return {
+        "has_video": "video" in types,
+        "has_audio": "audio" in types,
+        "start_time": float(start) if start not in ("", "N/A") else 0.0,
+    }
+
+
+def video_frame_times(video_path: str, start_time: float = 0.0) -> List[float]:
+    """
+    Presentation times of every frame of the first video stream.
+
+    Read from packet timestamps, so the file is only demuxed, not decoded.
+    Times are relative to the container start, as FFmpeg filters see them.
+    """
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time",
+        "-of", "csv=p=0",
+        video_path
+    ]
+    result = run_subprocess(cmd, capture_output=True, text=True, check=True)
+    times = [float(line) - start_time for line in result.stdout.split() if line not in ("", "N/A")]
+    return sorted(times)
+
+
+def snap_cuts(cuts: List[Interval], frame_times: List[float], duration: float) -> List[Interval]:
+    """
+    Move cut edges to the nearest frame start.
+
+    trim keeps the frames from a span's start up to (not including) its
+    end, so with frame-aligned edges a kept span lasts exactly end - start
+    in video as well as in audio. Cuts that snap to nothing are dropped.
+    """
+    if not frame_times:
+        return cuts
+
+    def snap(t: float) -> float:
+        i = bisect_left(frame_times, t)
+        candidates = [frame_times[j] for j in (i - 1, i) if 0 <= j < len(frame_times)]
+        return round(min(candidates, key=lambda c: abs(c - t)), 6)
+
+    snapped = []
+    for start, end in cuts:
+        # A cut running to the end of the file keeps its end
+        start, end = snap(start), (end if end >= duration else snap(end))
+        if end > start:
+            snapped.append((start, end))
+    return snapped
+
+
+def keep_intervals(cuts: List[Interval], duration: float) -> List[Interval]:
+    """Return the complement of the cut list within [0, duration]."""
+    keeps = []
+    cursor = 0.0
+    for start, end in cuts:
+        if start > cursor:
+            keeps.append((cursor, start))
+        cursor = end
+    if duration > cursor:
+        keeps.append((cursor, duration))
+    return keeps
+
+
+def make_time_mapper(cuts: List[Interval]):
+    """
+    Build a function mapping original timestamps onto the trimmed timeline.
+
+    Timestamps that fall inside a cut snap to the point where the cut was made.
+    """
+    cut_starts = [start for start, _ in cuts]
+    removed_before = [0.0]
+    for start, end in cuts:
+        removed_before.append(removed_before[-1] + (end - start))
+
+    def shift(t: float) -> float:
+        i = bisect_right(cut_starts, t)
+        if i == 0:
+            return t
+        start, end = cuts[i - 1]
+        if t < end:
+            return round(start - removed_before[i - 1], 3)
+        return round(t - removed_before[i], 3)
+
+    return shift
+
+
+def shift_captions(captions: dict, cuts: List[Interval]) -> dict:
+    """
+    Shift caption (and word) timestamps to match the trimmed video.
+
+    Args:
+        captions: Captions data with a "segments" list
+        cuts: Cut list in original-timeline seconds
+
+    Returns:
+        New captions dict with shifted timestamps
+    """
+    shift = make_time_mapper(cuts)
+
+    segments = []
+    for seg in captions.get("segments", []):
+        new_seg = dict(seg)
+        new_seg["start"] = shift(seg["start"])
+        new_seg["end"] = max(new_seg["start"], shift(seg["end"]))
+        if "words" in seg:
+            new_seg["words"] = [
+                {**word, "start": shift(word["start"]), "end": shift(word["end"])}
+                for word in seg["words"]
+            ]
+        segments.append(new_seg)
+
+    return {**captions, "segments": segments}
+
+
+def cut_filter_graph(keeps: List[Interval], has_video: bool = True, has_audio: bool = True) -> str:
+    """
+    Filter graph keeping only the given spans, joined end to end.
+
+    Each span is cut with trim/atrim and restarted at zero, then concat
+    lines them up. Video and audio use the same span times, so the
+    streams cannot drift apart, and frames keep their own timestamps
+    (variable frame rate recordings stay in sync).
+    """
+    n = len(keeps)
+    chains = []
+    pads = []
+    if has_video:
+        chains.append(f"[0:v]split={n}" + "".join(f"[vs{i}]" for i in range(n)))
+    if has_audio:
+        chains.append(f"[0:a]asplit={n}" + "".join(f"[as{i}]" for i in range(n)))
+    for i, (start, end) in enumerate(keeps):
+        if has_video:
+            chains.append(f"[vs{i}]trim=start={start:.6f}:end={end:.6f},setpts=PTS-STARTPTS[v{i}]")
+            pads.append(f"[v{i}]")
+        if has_audio:
+            chains.append(f"[as{i}]atrim=start={start:.6f}:end={end:.6f},asetpts=PTS-STARTPTS[a{i}]")
+            pads.append(f"[a{i}]")
+    outputs = ("[v]" if has_video else "") + ("[a]" if has_audio else "")
+    chains.append(f"{''.join(pads)}concat=n={n}:v={int(has_video)}:a={int(has_audio)}{outputs}")
+    return ";\n".join(chains)
+
+
+def apply_cuts(video_path: str, keeps: List[Interval], output_path: str,
+               has_video: bool = True, has_audio: bool = True):
+    """
+    Cut the video down to the kept intervals in a single FFmpeg pass.
+
+    Files without an audio (or video) stream get a graph for the other
+    stream only.
+    """
+    if not keeps:
+        raise RuntimeError("Nothing left after cutting; lower --min-silence or raise --padding")
+    print(f"✂️  Trimming video ({len(keeps)} kept spans)...")
+
+    graph = cut_filter_graph(keeps, has_video, has_audio)
+
+    # Long cut lists exceed command-line limits, so pass the graph as a file
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+        f.write(graph)
+        graph_file = f.name
+
+    cmd = [
+        "ffmpeg",
+        "-i", video_path,
+        "-filter_complex_script", graph_file,
+        *(["-map", "[v]", "-c:v", "libx264", "-preset", "fast", "-pix_fmt", "yuv420p"] if has_video else []),
+        *(["-map", "[a]", "-c:a", "aac", "-b:a", "192k"] if has_audio else []),
+        "-movflags", "+faststart",
+        "-y",  # Overwrite
+        output_path
+    ]
+
+    try:
+        result = run_subprocess(cmd, capture_output=True, text=True)
+    finally:
+        os.unlink(graph_file)
+
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg trim failed: {result.stderr}")
+
+    print(f"✅ Trimmed video saved to: {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Detect and cut long silences from screen recordings",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Use caption timing (from generate-captions.py) as the speech map
+  python trim-silence.py screen-recording.mp4 --captions captions.json
+
+  # Energy scan only, cut silences longer than 1.5s
+  python trim-silence.py screen-recording.mp4 --min-silence 1.5
+
+  # Preview the cut list without rendering
+  python trim-silence.py screen-recording.mp4 --captions captions.json --dry-run
+
+  # Trim in place for the Remotion project
+  python trim-silence.py public/assets/screen-recording.mp4 \\
+    --captions public/assets/captions.json \\
+    --output public/assets/screen-recording-trimmed.mp4 \\
+    --captions-output public/assets/captions.json
+        """
+    )
+
+    parser.add_argument(
+        "video",
+        help="Path to input video file"
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Path for trimmed video (default: <input>-trimmed.mp4)"
+    )
+
+    parser.add_argument(
+        "--captions",
+        "-c",
+        help="Captions JSON to use as speech map and to shift (default: energy scan only)"
+    )
+
+    parser.add_argument(
+        "--captions-output",
+        help="Path for shifted captions (default: <captions>-trimmed.json)"
+    )
+
+    parser.add_argument(
+        "--min-silence",
+        type=float,
+        default=1.0,
+        help="Minimum silence length in seconds to cut (default: 1.0)"
+    )
+
+    parser.add_argument(
+        "--padding",
+        type=float,
+        default=0.25,
+        help="Seconds of silence kept on each side of a cut (default: 0.25)"
+    )
+
+    parser.add_argument(
+        "--threshold-db",
+        type=float,
+        default=-40.0,
+        help="Energy scan silence threshold in dBFS (default: -40.0)"
+    )
+
+    parser.add_argument(
+        "--fps",
+        type=int,
+        default=30,
+        help="Composition frame rate used to report frames saved (default: 30)"
+    )
+
+    parser.add_argument(
+        "--cuts-output",
+        help="Write the cut list to this JSON file"
+    )
+
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only print the cut list, do not write video or captions"
+    )
+
+    args = parser.parse_args()
+
+    # Check FFmpeg installation
+    if not check_ffmpeg():
+        print("❌ Error: FFmpeg not found.")
+        print("Install FFmpeg: https://ffmpeg.org/download.html")
+        sys.exit(1)
+
+    # Validate input file
+    input_path = Path(args.video)
+    if not input_path.exists():
+        print(f"❌ Error: Video file not found: {args.video}")
+        sys.exit(1)
+
+    output_path = args.output or str(input_path.parent / f"{input_path.stem}-trimmed.mp4")
+
+    try:
+        duration = probe_duration(args.video)
+        streams = probe_streams(args.video)
+        captions = None
+
+        if args.captions:
+            captions = load_captions(args.captions)
+            print(f"📝 Using caption timing as speech map: {args.captions}")
+            silences = detect_silences_from_captions(captions, duration)
+        else:
+            silences = detect_silences_from_energy(args.video, threshold_db=args.threshold_db)
+
+        cuts = build_cut_list(silences, args.min_silence, args.padding)
+        if streams["has_video"]:
+            # The same frame-aligned cuts drive the trim and the caption shift
+            cuts = snap_cuts(cuts, video_frame_times(args.video, streams["start_time"]), duration)
+        removed = sum(end - start for start, end in cuts)
+        new_duration = duration - removed
+
+        print(f"\n🔍 Found {len(cuts)} silences longer than {args.min_silence}s")
+        for start, end in cuts:
+            print(f"  {start:8.2f}s - {end:8.2f}s  ({end - start:.2f}s)")
+
+        if args.cuts_output:
+            Path(args.cuts_output).write_text(
+                json.dumps({"duration": duration, "cuts": cuts}, indent=2),
+                encoding="utf-8"
+            )
+            print(f"💾 Cut list saved to: {args.cuts_output}")
+
+        if not cuts:
+            print("✅ Nothing to trim")
+            return
+
+        if not args.dry_run:
+            apply_cuts(args.video, keep_intervals(cuts, duration), output_path,
+                       has_video=streams["has_video"], has_audio=streams["has_audio"])
+
+            if captions is not None:
+                captions_output = args.captions_output or str(
+                    Path(args.captions).parent / f"{Path(args.captions).stem}-trimmed.json"
+                )
+                save_captions(shift_captions(captions, cuts), captions_output)
+                print(f"💾 Shifted captions saved to: {captions_output}")
+
+        frames_saved = int(duration * args.fps) - int(new_duration * args.fps)
+        print(f"\n📉 Removed {removed:.2f}s of silence ({removed / duration * 100:.1f}%)")
+        print(f"   Duration: {duration:.2f}s → {new_duration:.2f}s")
+        print(f"   Frames saved: {frames_saved} @ {args.fps}fps")
+        print(f"   const TUTORIAL_DURATION = {int(new_duration * args.fps)}; // {new_duration:.2f}s @ {args.fps}fps")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
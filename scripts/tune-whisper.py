@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Find the fastest CPU settings for faster-whisper on this machine.
+
+WhisperModel otherwise runs with CTranslate2's default thread count, one
+worker and whatever compute type was passed on the command line. This
+script benchmarks compute types, thread counts and worker counts on a
+short clip and saves the fastest combination per model size to a tuning
+profile that generate-captions.py and caption-worker.py load by default.
+
+The search is coordinate-wise to keep it short: compute types at all
+cores, then thread counts with the fastest compute type, then worker
+counts (threads split between workers) for the caption worker's
+multi-job throughput.
+
+Requirements:
+    pip install faster-whisper
+
+Usage:
+    python tune-whisper.py [--model base] [--clip sample.mp4] [--threads 2 4 8] [--workers 1 2]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from transcription import (
+    COMPUTE_TYPES,
+    FASTER_WHISPER_AVAILABLE,
+    TRANSCRIBE_OPTIONS,
+    WHISPER_SAMPLE_RATE,
+    decode_whisper_audio,
+    load_model,
+    profile_host_mismatch,
+    synthetic_clip,
+    tuning_profile_path,
+)
+
+
+def supported_compute_types():
+    """CPU compute types CTranslate2 supports here (all choices if unknown)."""
+    try:
+        import ctranslate2
+        supported = ctranslate2.get_supported_compute_types("cpu")
+        return [ctype for ctype in COMPUTE_TYPES if ctype in supported]
+    except Exception:
+        return ["int8", "int8_float32", "float32"]
+
+
+def time_transcription(model, clip, jobs: int = 1, repeat: int = 2) -> float:
+    """
+    Best wall time of `jobs` concurrent transcriptions of clip.
+
+    Uses the production decode options (beam search, VAD, word
+    timestamps) so the ranking and speed match real caption runs. Only
+    temperature fallback is turned off, so every configuration does the
+    same work.
+    """
+    def run():
+        segments, _ = model.transcribe(
+            clip,
+            temperature=0.0,
+            **TRANSCRIBE_OPTIONS
+        )
+        for _ in segments:
+            pass
+
+    best = float("inf")
+    for _ in range(repeat):
+        threads = [threading.Thread(target=run) for _ in range(jobs)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure(model_size, clip, compute_type, cpu_threads, num_workers, repeat, results):
+    """Benchmark one configuration and record it; returns audio seconds per wall second."""
+    model = load_model(model_size, compute_type, cpu_threads, num_workers)
+    time_transcription(model, clip[: 5 * WHISPER_SAMPLE_RATE], repeat=1)  # Warm-up
+    wall = time_transcription(model, clip, jobs=num_workers, repeat=repeat)
+    del model
+
+    clip_seconds = len(clip) / WHISPER_SAMPLE_RATE
+    throughput = num_workers * clip_seconds / wall
+    results.append({
+        "compute_type": compute_type,
+        "cpu_threads": cpu_threads,
+        "num_workers": num_workers,
+        "wall_s": round(wall, 3),
+        "speed": round(throughput, 2),
+    })
+    print(f"  {compute_type:<13} threads={cpu_threads:<3} workers={num_workers}  "
+          f"{wall:6.2f}s  {throughput:6.1f}x realtime")
+    return throughput
+
+
+def tune_model(model_size, clip, compute_types, thread_counts, worker_counts, repeat) -> dict:
+    """Run the coordinate search for one model size and return its profile entry."""
+    cores = os.cpu_count() or 1
+    results = []
+
+    print(f"\n🔧 Tuning {model_size}: compute types ({cores} threads)")
+    speeds = {ctype: measure(model_size, clip, ctype, cores, 1, repeat, results) for ctype in compute_types}
+    compute_type = max(speeds, key=speeds.get)
+
+    print(f"🔧 Tuning {model_size}: threads ({compute_type})")
+    speeds = {cores: speeds[compute_type]}
+    for threads in thread_counts:
+        if threads not in speeds:
+            speeds[threads] = measure(model_size, clip, compute_type, threads, 1, repeat, results)
+    cpu_threads = max(speeds, key=speeds.get)
+    single_speed = speeds[cpu_threads]
+
+    print(f"🔧 Tuning {model_size}: workers ({compute_type})")
+    concurrent = {"cpu_threads": cpu_threads, "num_workers": 1}
+    concurrent_speed = single_speed
+    for workers in worker_counts:
+        if workers <= 1:
+            continue
+        threads = max(1, cores // workers)
+        speed = measure(model_size, clip, compute_type, threads, workers, repeat, results)
+        if speed > concurrent_speed:
+            concurrent, concurrent_speed = {"cpu_threads": threads, "num_workers": workers}, speed
+
+    print(f"✅ {model_size}: {compute_type}, {cpu_threads} threads ({single_speed:.1f}x realtime); "
+          f"caption worker: {concurrent['num_workers']} x {concurrent['cpu_threads']} threads "
+          f"({concurrent_speed:.1f}x)")
+
+    return {
+        "compute_type": compute_type,
+        "cpu_threads": cpu_threads,
+        "num_workers": 1,
+        "speed": round(single_speed, 2),
+        "concurrent": {**concurrent, "speed": round(concurrent_speed, 2)},
+        "results": results,
+    }
+
+
+def main():
+    cores = os.cpu_count() or 1
+    default_threads = sorted({t for t in (1, 2, 4, 8, 16, 32) if t < cores} | {cores})
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark faster-whisper CPU settings and save the fastest profile",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Examples:
+  # Tune the default model on a synthetic 30s clip
+  python tune-whisper.py
+
+  # Tune the models you use, on a real recording
+  python tune-whisper.py --model base --model medium --clip public/assets/screen-recording.mp4
+
+  # Only try some settings, print without saving
+  python tune-whisper.py --compute-types int8 float32 --threads 4 8 --dry-run
+
+The profile is saved to $WHISPER_TUNING_PROFILE or
+~/.cache/remotion-tutorial-video/whisper-tuning.json, and used by
+generate-captions.py and caption-worker.py unless a setting is given
+explicitly. This machine has {cores} CPU threads.
+        """
+    )
+
+    parser.add_argument(
+        "--model",
+        "-m",
+        action="append",
+        choices=["tiny", "base", "small", "medium", "large"],
+        help="Model size to tune (repeatable, default: base)"
+    )
+
+    parser.add_argument(
+        "--clip",
+        help="Audio or video file to benchmark on (default: synthetic speech-like clip)"
+    )
+
+    parser.add_argument(
+        "--clip-seconds",
+        type=float,
+        default=30.0,
+        help="Benchmark clip length in seconds (default: 30)"
+    )
+
+    parser.add_argument(
+        "--compute-types",
+        nargs="+",
+        choices=COMPUTE_TYPES,
+        help="Compute types to try (default: those CTranslate2 supports on this CPU)"
+    )
+
+    parser.add_argument(
+        "--threads",
+        nargs="+",
+        type=int,
+        default=default_threads,
+        help=f"Thread counts to try (default: {' '.join(map(str, default_threads))})"
+    )
+
+    parser.add_argument(
+        "--workers",
+        nargs="+",
+        type=int,
+        default=[1, 2],
+        help="Worker counts to try for the caption worker (default: 1 2)"
+    )
+
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=2,
+        help="Timed runs per configuration, best is kept (default: 2)"
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Profile path (default: $WHISPER_TUNING_PROFILE or the user cache directory)"
+    )
+
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print results without saving the profile"
+    )
+
+    args = parser.parse_args()
+
+    if not FASTER_WHISPER_AVAILABLE:
+        print("Error: faster-whisper not installed.")
+        print("Install with: pip install faster-whisper")
+        sys.exit(1)
+
+    if args.clip and not Path(args.clip).exists():
+        print(f"❌ Error: File not found: {args.clip}")
+        sys.exit(1)
+
+    output = Path(args.output) if args.output else tuning_profile_path()
+    if output is None and not args.dry_run:
+        print("❌ Error: WHISPER_TUNING_PROFILE is 'none'; pass --output or --dry-run")
+        sys.exit(1)
+
+    try:
+        if args.clip:
+            print(f"🎵 Benchmark clip: {args.clip} (first {args.clip_seconds:g}s)")
+            clip = decode_whisper_audio(args.clip)[: int(args.clip_seconds * WHISPER_SAMPLE_RATE)]
+        else:
+            print(f"🎵 Benchmark clip: synthetic, {args.clip_seconds:g}s")
+            clip = synthetic_clip(args.clip_seconds)
+
+        compute_types = args.compute_types or supported_compute_types()
+
+        profile = {}
+        if output and output.exists():
+            with output.open('r', encoding='utf-8') as f:
+                profile = json.load(f)
+            if profile_host_mismatch(profile):
+                # Other models' settings were measured on another machine
+                profile = {}
+        profile.update({
+            "host": platform.node(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": cores,
+            "decode_options": TRANSCRIBE_OPTIONS,
+            "tuned_at": datetime.now().isoformat(timespec="seconds"),
+        })
+        models = profile.setdefault("models", {})
+
+        for model_size in args.model or ["base"]:
+            models[model_size] = tune_model(
+                model_size, clip, compute_types, args.threads, args.workers, args.repeat
+            )
+
+        if args.dry_run:
+            print("\n(dry run, profile not saved)")
+            return
+
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with output.open('w', encoding='utf-8') as f:
+            json.dump(profile, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Tuning profile saved to: {output}")
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()